@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# CREATED DATE: Mon Oct 19 11:41:08 2026
+"""
+出版物记录的持久化去重索引
+
+记录键优先使用 (filename, dbname)，没有文件名时退回 (title, authors, source, date)。
+索引保存在SQLite中，抽取结果在写入NDJSON之前先经过索引过滤。
+"""
+
+import sqlite3
+import threading
+
+
+def record_key(pub):
+    """
+    生成出版物记录的去重键
+
+    参数:
+    pub (dict): 出版物信息
+
+    返回:
+    str: 去重键
+    """
+    filename = pub.get("filename") or ""
+    if filename:
+        return "f\x1f%s\x1f%s" % (filename, pub.get("dbname") or "")
+    return "t\x1f" + "\x1f".join(
+        str(pub.get(k) or "") for k in ("title", "authors", "source", "date")
+    )
+
+
+class KeyIndex:
+    """
+    基于SQLite的记录键索引
+
+    参数:
+    index_file (str): 索引文件路径
+    """
+
+    def __init__(self, index_file):
+        self.index_file = index_file
+        self._lock = threading.Lock()
+        # 流水线中保存阶段在后台线程运行
+        self._conn = sqlite3.connect(index_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS record_keys (key TEXT PRIMARY KEY)")
+        # 抽取到了记录但全部重复的页面，没有写入NDJSON，靠这里记录已抓取
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS done_pages (category TEXT, page INTEGER, PRIMARY KEY (category, page))"
+        )
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM record_keys").fetchone()[0]
+
+    def filter_new(self, publications):
+        """
+        过滤出索引中没有的记录，并把它们的键加入当前事务
+
+        写入成功后调用 commit，失败时调用 rollback
+
+        参数:
+        publications (list): 出版物信息列表
+
+        返回:
+        tuple: (新记录列表, 重复记录数)
+        """
+        new_publications = []
+        with self._lock:
+            for pub in publications:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO record_keys (key) VALUES (?)", (record_key(pub),)
+                )
+                if cursor.rowcount == 1:
+                    new_publications.append(pub)
+        return new_publications, len(publications) - len(new_publications)
+
+    def add(self, publications):
+        """把记录的键加入索引并提交"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO record_keys (key) VALUES (?)",
+                ((record_key(pub),) for pub in publications),
+            )
+            self._conn.commit()
+
+    def mark_page(self, category_code, page):
+        """在当前事务中记录某分类某页已抓取，随 commit 一起提交"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO done_pages (category, page) VALUES (?, ?)",
+                (category_code, int(page)),
+            )
+
+    def has_page(self, category_code, page):
+        """某分类某页是否已记录为已抓取"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM done_pages WHERE category = ? AND page = ?",
+                (category_code, int(page)),
+            ).fetchone() is not None
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+
+    def rollback(self):
+        with self._lock:
+            self._conn.rollback()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
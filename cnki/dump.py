@@ -20,6 +20,10 @@ import urllib3
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from dedup_index import record_key
+from ndjson_segment import load_segment_entries, read_segment_entry
+from state_store import SqliteStateStore, state_db_path
+
 # 禁用 SSL 警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -39,7 +43,7 @@ PAPER_KEYS = [
     "source",
     "url",
 ]
-STATE_KEYS = ["ndjson", "downloaded"]
+STATE_KEYS = ["key", "ndjson", "downloaded"]
 
 
 def custom_date_parser(date_str):
@@ -61,15 +65,70 @@ def custom_date_parser(date_str):
             return pd.to_datetime("19700101", format="%Y%m%d")
 
 
+DATE_ISO_PATTERN = r"\d{4}-\d{2}-\d{2}"
+DATE_COMPACT_PATTERN = r"\d{8}"
+
+
+def normalize_dates(dates):
+    """
+    按列解析日期，结果与逐个调用 custom_date_parser 相同
+
+    YYYY-MM-DD 和 YYYYMMDD 两种常见格式按固定格式整列解析，
+    其余的值(YYYYMM、N/A、其他写法以及上面解析失败的)按不同的值逐个交给 custom_date_parser，
+    所以每个不同的写法只解析一次
+
+    参数:
+    dates (Series): 日期字符串列
+
+    返回:
+    Series: datetime64 列，索引与输入相同
+    """
+    result = pd.Series(pd.NaT, index=dates.index, dtype="datetime64[ns]")
+    text = dates.where(dates.map(lambda x: isinstance(x, str)))
+    rest = text.notna()
+
+    for pattern, fmt in [(DATE_ISO_PATTERN, "%Y-%m-%d"), (DATE_COMPACT_PATTERN, "%Y%m%d")]:
+        mask = rest & text.str.fullmatch(pattern, na=False).astype(bool)
+        if mask.any():
+            result[mask] = pd.to_datetime(text[mask], format=fmt, errors="coerce")
+            rest &= ~(mask & result.notna())
+
+    # 非空的非字符串值(如整数)也交给 custom_date_parser，与逐个解析保持一致
+    rest |= dates.notna() & text.isna()
+    if rest.any():
+        parsed = {value: custom_date_parser(value) for value in dates[rest].unique()}
+        result[rest] = pd.to_datetime(dates[rest].map(parsed))
+    return result
+
+
+def resolve_duplicates(df):
+    """
+    同一记录键有多行时按 upsert_records 的规则保留一行:
+    下载状态值较小的优先(已下载的-1优先于待下载的1，待下载的1优先于失败的记录)，
+    状态值相同时以较新的ndjson为准
+    """
+    if df.index.is_unique:
+        return df
+    df = df.sort_values(["downloaded", "ndjson"], ascending=[True, False], kind="stable")
+    return df[~df.index.duplicated(keep="first")]
+
+
 def load_state(state_file):
-    """加载或创建状态DataFrame"""
+    """
+    加载或创建状态DataFrame，以记录键为索引
+
+    合并新ndjson时只把变化的记录追加到状态文件末尾，同一记录键可能有多行，加载时按下载状态合并
+    """
     if os.path.exists(state_file):
-        df = pd.read_json(state_file, lines=True, orient="records")[
-            PAPER_KEYS + STATE_KEYS
-        ]
+        df = pd.read_json(state_file, lines=True, orient="records", dtype={"key": str})
+        if "key" not in df.columns:
+            # 旧状态文件没有记录键，补上
+            df["key"] = [record_key(row) for row in df[PAPER_KEYS].to_dict("records")]
+        df = df[PAPER_KEYS + STATE_KEYS]
         df["date"] = pd.to_datetime(df["date"], unit="ms")
-        return df
-    return pd.DataFrame(columns=PAPER_KEYS + STATE_KEYS)
+        df = df.set_index("key", drop=False)
+        return resolve_duplicates(df)
+    return pd.DataFrame(columns=PAPER_KEYS + STATE_KEYS).set_index("key", drop=False)
 
 
 def save_state(df_state, state_file):
@@ -77,59 +136,200 @@ def save_state(df_state, state_file):
     df_state.to_json(state_file, lines=True, orient="records", force_ascii=False)
 
 
-def process_ndjson_files(df_state, ndjson_dir, state_file):
-    """处理ndjson文件并更新状态"""
-    # 获取已处理文件
-    exist_ndjson_files = set(df_state["ndjson"].unique())
+def append_state(df_rows, state_file):
+    """
+    把新增和更新的记录追加到状态文件末尾，写入量只和变化的记录数相关
+
+    参数:
+    df_rows (DataFrame): 新增和更新的记录
+    state_file (str): 状态文件路径
+    """
+    if len(df_rows) == 0:
+        return
+    data = df_rows[PAPER_KEYS + STATE_KEYS].to_json(
+        lines=True, orient="records", force_ascii=False
+    )
+    if not data.endswith("\n"):
+        data += "\n"
+    with open(state_file, "a+b") as f:
+        # 旧版本 pandas 写出的最后一行没有换行符
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        f.write(data.encode("utf-8"))
+
+
+def load_ingested_names(df_state, state_file):
+    """
+    读取已经合并进状态的处理单元名称(单页文件名或分段中的页名称)
+
+    名称单独记录在 state_file.ingested 中，没有该文件时从状态的ndjson列初始化
+    """
+    ingested_file = state_file + ".ingested"
+    if os.path.exists(ingested_file):
+        with open(ingested_file, "r", encoding="utf-8") as f:
+            return set(line.strip() for line in f if line.strip())
+    names = set(df_state["ndjson"].dropna().unique())
+    # 第一次创建时写入完整的名称集合，之后只追加
+    save_ingested_names(sorted(names), state_file)
+    return names
+
+
+def save_ingested_names(names, state_file):
+    """追加记录已合并的处理单元名称"""
+    with open(state_file + ".ingested", "a", encoding="utf-8") as f:
+        for name in names:
+            f.write(name + "\n")
+
+
+def iter_ndjson_file(ndjson_file):
+    """逐行读取ndjson文件中的记录"""
+    with open(ndjson_file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def upsert_records(df_state, df_update):
+    """
+    按记录键把新记录合并进状态
+
+    同一记录以下载状态值较小的为准(已下载的-1优先于待下载的1)，状态值相同时以较新的ndjson为准；
+    新记录的状态值为1，因此失败的记录再次出现时会重新进入下载队列。
+
+    参数:
+    df_state (DataFrame): 以记录键为索引的状态
+    df_update (DataFrame): 以记录键为索引、键不重复的新记录
+
+    返回:
+    tuple: (合并后的状态, 新增和更新的记录, 新增记录数, 更新记录数)
+    """
+    # get_indexer 复用状态索引的哈希表，只和新数据的规模相关
+    positions = df_state.index.get_indexer(df_update.index)
+    exists = positions >= 0
+
+    df_common = df_update[exists]
+    df_replace = df_common.iloc[0:0]
+    if len(df_common) > 0:
+        old_downloaded = df_state["downloaded"].iloc[positions[exists]].values
+        old_ndjson = df_state["ndjson"].iloc[positions[exists]].values
+        replace = (old_downloaded > 1) | (
+            (old_downloaded == 1) & (df_common["ndjson"].values > old_ndjson)
+        )
+        df_replace = df_common[replace]
+        if len(df_replace) > 0:
+            df_state.loc[df_replace.index, PAPER_KEYS + STATE_KEYS] = df_replace[
+                PAPER_KEYS + STATE_KEYS
+            ]
+
+    df_added = df_update[~exists]
+    if len(df_added) > 0:
+        df_state = pd.concat([df_state, df_added[PAPER_KEYS + STATE_KEYS]])
+    df_changed = pd.concat([df_added, df_replace]) if len(df_replace) > 0 else df_added
+    return df_state, df_changed, len(df_added), len(df_replace)
+
+
+def read_new_records(exist_ndjson_files, ndjson_dir):
+    """
+    读取还没有合并进状态的ndjson文件和分段页
 
+    参数:
+    exist_ndjson_files (set): 已合并的处理单元名称
+    ndjson_dir (str): ndjson目录
+
+    返回:
+    tuple: (新处理单元名称列表, 以记录键为索引的新记录DataFrame，没有新记录时为None)
+    """
     # 查找所有新ndjson文件
     input_ndjson_files = [f for f in glob.glob(os.path.join(ndjson_dir, "*.json"))]
     update_ndjson_files = [
         f for f in input_ndjson_files if Path(f).name not in exist_ndjson_files
     ]
 
-    # 处理新文件
-    if len(update_ndjson_files) == 0:
-        return df_state
-    df_update = pd.concat(
-        [
-            pd.read_json(f, lines=True, orient="records", convert_dates=False).assign(
-                ndjson=Path(f).name
-            )
-            for f in update_ndjson_files
-        ],
-        ignore_index=True,
-    )
-    df_update["date"] = df_update["date"].apply(custom_date_parser)
+    # 分段文件中的每一页和单页文件一样按名称记录是否已处理
+    input_names = set(Path(f).name for f in input_ndjson_files)
+    update_segment_entries = [
+        e
+        for e in load_segment_entries(ndjson_dir)
+        if e["name"] not in exist_ndjson_files and e["name"] not in input_names
+    ]
 
-    df_update = df_update.sort_values(
-        ["title", "authors", "source", "date", "ndjson"]
-    ).drop_duplicates(["title", "authors", "source", "date"], keep="last")
-    df_update["downloaded"] = 1
+    units = [(Path(f).name, iter_ndjson_file(f)) for f in update_ndjson_files] + [
+        (e["name"], read_segment_entry(ndjson_dir, e)) for e in update_segment_entries
+    ]
 
-    if len(df_state) > 0:
-        if len(df_update) > 0:
-            df_state = (
-                pd.concat([df_state, df_update], ignore_index=True)
-                .sort_values(
-                    ["title", "authors", "source", "date", "downloaded", "ndjson"],
-                    ascending=[True, True, True, True, False, True],
-                )
-                .drop_duplicates(["title", "authors", "source", "date"], keep="last")
-            )
-            save_state(df_state, state_file)
-            print(f"MERGED {len(df_update)}条新记录")
-        else:
-            pass
-    else:
-        if len(df_update) > 0:
-            save_state(df_update, state_file)
-            return df_update.copy()
+    # 逐个读入新记录，同一批次内同一记录保留ndjson较新的
+    updates = {}
+    for name, records in units:
+        for record in records:
+            key = record_key(record)
+            if key not in updates or name >= updates[key]["ndjson"]:
+                row = {k: record.get(k) for k in PAPER_KEYS}
+                row.update({"key": key, "ndjson": name, "downloaded": 1})
+                updates[key] = row
+
+    if not updates:
+        return [name for name, _ in units], None
+
+    df_update = pd.DataFrame.from_records(
+        list(updates.values()), columns=PAPER_KEYS + STATE_KEYS
+    ).set_index("key", drop=False)
+    df_update["date"] = normalize_dates(df_update["date"])
+    return [name for name, _ in units], df_update
+
+
+def process_ndjson_files(df_state, ndjson_dir, state_file):
+    """处理新的ndjson文件，按记录键增量合并进状态"""
+    # 获取已处理文件
+    exist_ndjson_files = load_ingested_names(df_state, state_file)
+    names, df_update = read_new_records(exist_ndjson_files, ndjson_dir)
+
+    if df_update is not None:
+        if len(df_state) > 0:
+            df_state, df_changed, num_added, num_updated = upsert_records(df_state, df_update)
         else:
-            return df_state
+            df_state, df_changed, num_added, num_updated = df_update, df_update, len(df_update), 0
+        # 只追加变化的记录，不重写整个状态文件
+        append_state(df_changed, state_file)
+        print(f"MERGED {num_added}条新记录, 更新{num_updated}条记录")
 
+    if names:
+        save_ingested_names(names, state_file)
     return df_state
 
+
+def open_state_store(state_file):
+    """
+    打开SQLite状态存储，第一次创建时导入已有的ndjson状态文件
+
+    参数:
+    state_file (str): 配置中的状态文件路径
+
+    返回:
+    SqliteStateStore: 状态存储
+    """
+    store = SqliteStateStore(state_db_path(state_file))
+    if store.is_empty() and os.path.exists(state_file):
+        df_state = load_state(state_file)
+        store.insert(df_state)
+        store.add_ingested(load_ingested_names(df_state, state_file))
+        print(f"从 {state_file} 导入了 {len(df_state)} 条记录")
+    return store
+
+
+def ingest_ndjson_files(store, ndjson_dir):
+    """处理新的ndjson文件，按记录键增量合并进SQLite状态存储"""
+    names, df_update = read_new_records(store.ingested_names(), ndjson_dir)
+    if df_update is not None:
+        num_added, num_updated = store.upsert(df_update)
+        print(f"MERGED {num_added}条新记录, 更新{num_updated}条记录")
+    if names:
+        store.add_ingested(names)
+
+
 def extract_pdf_url_site3_or_8(url, cookies, proxy=None):
     try:
         json_url = url.replace("download.php", "download2.php")
@@ -161,9 +361,53 @@ def extract_pdf_url_site3_or_8(url, cookies, proxy=None):
             raise Exception("OVERLOAD", json_response.text)
         raise Exception("UNKNOWN", json_response.text)
 
-def gen_safe_filepath(file_dir, title, authors, date):
+class OutputIndex:
+    """
+    输出目录 output_dir/category/month 中已有文件的内存索引
+
+    启动时用 os.scandir 扫描一次，之后检查文件是否存在、创建目录都不再访问文件系统，
+    避免网络文件系统上每条记录两次元数据请求。
 
-    os.makedirs(file_dir, exist_ok=True)
+    参数:
+    output_dir (str): PDF输出目录
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        # 目录 -> 目录中的文件名集合
+        self.files = {}
+        if os.path.isdir(output_dir):
+            for category in os.scandir(output_dir):
+                if not category.is_dir():
+                    continue
+                for month in os.scandir(category.path):
+                    if month.is_dir():
+                        self.files[os.path.normpath(month.path)] = set(
+                            e.name for e in os.scandir(month.path) if e.is_file()
+                        )
+
+    def __len__(self):
+        return sum(len(names) for names in self.files.values())
+
+    def exists(self, file_path):
+        """文件在索引中是否存在"""
+        file_dir, name = os.path.split(os.path.normpath(file_path))
+        return name in self.files.get(file_dir, ())
+
+    def ensure_dir(self, file_dir):
+        """创建目录，每个目录只创建一次"""
+        file_dir = os.path.normpath(file_dir)
+        if file_dir not in self.files:
+            os.makedirs(file_dir, exist_ok=True)
+            self.files[file_dir] = set()
+
+    def add(self, file_path):
+        """记录新写入的文件"""
+        file_dir, name = os.path.split(os.path.normpath(file_path))
+        self.files.setdefault(file_dir, set()).add(name)
+
+
+def gen_safe_filepath(file_dir, title, authors, date):
 
     # 解码URL编码的字符串
     file_name = (
@@ -360,8 +604,26 @@ def exec_dump_task(config_file, sleep_interval=10):
     proxy = config["proxy"]
 
     # 加载状态
+    store = None
+    if config.get("state_store") == "sqlite":
+        # SQLite状态存储只加载待下载的记录，状态按行更新
+        store = open_state_store(state_file)
+        ingest_ndjson_files(store, ndjson_dir)
+        df_state = store.load_pending()
+    else:
+        df_state = process_ndjson_files(load_state(state_file), ndjson_dir, state_file)
+
+    def set_downloaded(url_idx, downloaded):
+        df_state.loc[url_idx, "downloaded"] = downloaded
+        if store is not None:
+            store.set_downloaded(url_idx, downloaded)
 
-    df_state = process_ndjson_files(load_state(state_file), ndjson_dir, state_file)
+    def checkpoint():
+        if store is None:
+            save_state(df_state, state_file)
+
+    output_index = OutputIndex(output_dir)
+    print(f"输出目录中已有 {len(output_index)} 个文件")
 
     to_download_mask = (
         (df_state["downloaded"] == 1)
@@ -387,35 +649,36 @@ def exec_dump_task(config_file, sleep_interval=10):
         file_dir = os.path.join(output_dir, category, month)
         file_path = gen_safe_filepath(file_dir, title, authors, date)
         
-        if os.path.exists(file_path):
+        if output_index.exists(file_path):
             print("PDF 已存在!")
-            df_state.loc[url_idx, "downloaded"] = -1
+            set_downloaded(url_idx, -1)
             continue 
 
         try:
+            output_index.ensure_dir(file_dir)
             downloaded = download_pdf(url, cookies, file_path, proxy)
+            if downloaded == -1:
+                output_index.add(file_path)
             # 更新状态
             if downloaded == -1 or downloaded == 0:
-                df_state.loc[url_idx, "downloaded"] = downloaded
+                set_downloaded(url_idx, downloaded)
 
             elif downloaded == 1:
-                df_state.loc[url_idx, "downloaded"] = (
-                    df_state.loc[url_idx, "downloaded"] + downloaded
-                )
+                set_downloaded(url_idx, df_state.loc[url_idx, "downloaded"] + downloaded)
             elif downloaded in [1000, 2000, 3000, 4000, 6000, 8000, 9000]:
-                df_state.loc[url_idx, "downloaded"] = downloaded
+                set_downloaded(url_idx, downloaded)
             elif downloaded in [7000]:
                 config = read_config(config_file, update_proxy=True)
                 proxy = config["proxy"]
             elif downloaded in [5000]: 
                 break
             else:
-                save_state(df_state, state_file)
+                checkpoint()
                 assert False
 
             if count % 10 == 0:
                 cookies = reload_cookies(config_file)
-                save_state(df_state, state_file)
+                checkpoint()
                 print("COOKIES RELOADED /STATE SAVED, %s" % cookies)
 
             if count % 30 == 0:
@@ -426,12 +689,14 @@ def exec_dump_task(config_file, sleep_interval=10):
             time.sleep(delay)
 
         except Exception as e:
-            save_state(df_state, state_file)
+            checkpoint()
             print("Unknown Error:", e)
             # breakpoint()
 
     if len(df_state) > 0:
-        save_state(df_state, state_file)
+        checkpoint()
+    if store is not None:
+        store.close()
 
 
 def extract_pdf_url_site2(url, cookies=None):
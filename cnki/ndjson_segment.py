@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+# CREATED DATE: Mon Oct 19 10:12:37 2026
+"""
+分段追加写入的NDJSON存储
+
+每一页搜索结果作为一个批次追加到滚动的分段文件 segment_XXXXXX.ndjson(.zst) 中，
+分段文件超过 segment_max_bytes 后切换到下一个分段。每个分段有一个同名的 .idx
+旁路索引文件，每行记录一个批次的名称、分类号、页码、偏移量、长度和记录数。
+
+批次名称沿用单页文件的命名 cnki_{code}_p{page}_{ts}.json，下游(dump.py)可以把
+分段中的批次和单页文件当作同一种处理单元。
+"""
+
+import argparse
+import fcntl
+import glob
+import json
+import os
+import re
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SEGMENT_PREFIX = "segment_"
+SEGMENT_SUFFIX = ".ndjson"
+ZSTD_SUFFIX = ".zst"
+INDEX_SUFFIX = ".idx"
+LOCK_FILE = ".segment.lock"
+DEFAULT_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+# 同一秒内保存的同一页带有 _1、_2 之类的后缀，见 gen_page_name 和 search.save_to_ndjson
+PAGE_FILE_PATTERN = re.compile(r"^cnki_(?P<category>.+)_p(?P<page>\d+)_[\d\-]+(?:_\d+)?\.json$")
+
+
+def gen_page_name(category_code, page, existing=()):
+    """
+    生成与单页文件相同格式的批次名称
+
+    参数:
+    category_code (str): 分类号
+    page (int): 页码
+    existing (set): 已有的名称，同一秒内重复时加上 _1、_2 后缀
+
+    返回:
+    str: 批次名称
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+    name = f"cnki_{category_code}_p{page}_{timestamp}.json"
+    suffix = 1
+    while name in existing:
+        name = f"cnki_{category_code}_p{page}_{timestamp}_{suffix}.json"
+        suffix += 1
+    return name
+
+
+def list_segment_files(ndjson_dir):
+    """按序号返回目录中的所有分段文件"""
+    pattern = os.path.join(ndjson_dir, f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}*")
+    return sorted(
+        f for f in glob.glob(pattern) if not f.endswith(INDEX_SUFFIX)
+    )
+
+
+def read_segment_index(segment_file):
+    """
+    读取一个分段的旁路索引
+
+    参数:
+    segment_file (str): 分段文件路径
+
+    返回:
+    list: 索引条目列表，每个条目是一个字典
+    """
+    index_file = segment_file + INDEX_SUFFIX
+    entries = []
+    if not os.path.exists(index_file):
+        return entries
+
+    with open(index_file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # 写入中断留下的半行
+                continue
+            entry["segment"] = os.path.basename(segment_file)
+            entries.append(entry)
+    return entries
+
+
+def load_segment_entries(ndjson_dir):
+    """按写入顺序返回目录中所有分段的索引条目"""
+    entries = []
+    for segment_file in list_segment_files(ndjson_dir):
+        entries.extend(read_segment_index(segment_file))
+    return entries
+
+
+def read_segment_entry(ndjson_dir, entry):
+    """
+    根据索引条目读取一个批次的记录
+
+    参数:
+    ndjson_dir (str): 分段文件所在目录
+    entry (dict): 索引条目
+
+    返回:
+    list: 记录列表
+    """
+    segment_file = os.path.join(ndjson_dir, entry["segment"])
+    with open(segment_file, "rb") as f:
+        f.seek(entry["offset"])
+        data = f.read(entry["length"])
+
+    if segment_file.endswith(ZSTD_SUFFIX):
+        if zstandard is None:
+            raise RuntimeError("读取 .zst 分段需要安装 zstandard")
+        data = zstandard.ZstdDecompressor().decompress(data)
+
+    records = []
+    for line in data.decode("utf-8").splitlines():
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return records
+
+
+class SegmentStore:
+    """
+    分段NDJSON存储，负责追加写入、分段滚动和按页查询
+    """
+
+    def __init__(self, ndjson_dir, max_bytes=DEFAULT_SEGMENT_MAX_BYTES, compress=False):
+        if compress and zstandard is None:
+            raise RuntimeError("segment_compress 需要安装 zstandard: pip install zstandard")
+
+        self.ndjson_dir = ndjson_dir
+        self.max_bytes = max_bytes
+        self.compress = compress
+        os.makedirs(ndjson_dir, exist_ok=True)
+
+        # (分类号, 页码) -> 最新的索引条目
+        self.pages = {}
+        # 已写入的批次名称
+        self.names = set()
+        for entry in load_segment_entries(ndjson_dir):
+            self._remember(entry)
+
+    def _remember(self, entry):
+        self.pages[(entry["category"], int(entry["page"]))] = entry
+        self.names.add(entry["name"])
+
+    def _segment_name(self, seq):
+        suffix = SEGMENT_SUFFIX + (ZSTD_SUFFIX if self.compress else "")
+        return f"{SEGMENT_PREFIX}{seq:06d}{suffix}"
+
+    def _tail_segment(self):
+        """
+        返回当前可追加的分段文件以及其有效长度
+
+        索引之后多出来的字节是写入中断留下的，直接截断
+        """
+        segment_files = list_segment_files(self.ndjson_dir)
+        if not segment_files:
+            return os.path.join(self.ndjson_dir, self._segment_name(1)), 0, 1
+
+        tail_file = segment_files[-1]
+        seq = int(os.path.basename(tail_file)[len(SEGMENT_PREFIX):].split(".")[0])
+        entries = read_segment_index(tail_file)
+        for entry in entries:
+            if entry["name"] not in self.names:
+                self._remember(entry)
+
+        end = max((e["offset"] + e["length"] for e in entries), default=0)
+        if os.path.getsize(tail_file) > end:
+            with open(tail_file, "r+b") as f:
+                f.truncate(end)
+
+        # 压缩设置变化或分段已满时开新分段
+        if tail_file.endswith(ZSTD_SUFFIX) != self.compress or end >= self.max_bytes:
+            return os.path.join(self.ndjson_dir, self._segment_name(seq + 1)), 0, seq + 1
+        return tail_file, end, seq
+
+    def append(self, publications, category_code, page, name=None):
+        """
+        追加一页记录
+
+        参数:
+        publications (list): 出版物信息列表
+        category_code (str): 分类号
+        page (int): 页码
+        name (str): 批次名称，默认按单页文件格式生成
+
+        返回:
+        dict: 写入的索引条目
+        """
+        data = "".join(
+            json.dumps(pub, ensure_ascii=False) + "\n" for pub in publications
+        ).encode("utf-8")
+        if self.compress:
+            # 每个批次是独立的zstd帧，可以按偏移量单独解压
+            data = zstandard.ZstdCompressor(level=3).compress(data)
+
+        # 同一目录可能有多个进程写入
+        with open(os.path.join(self.ndjson_dir, LOCK_FILE), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            segment_file, offset, seq = self._tail_segment()
+            if offset > 0 and offset + len(data) > self.max_bytes:
+                segment_file, offset = os.path.join(self.ndjson_dir, self._segment_name(seq + 1)), 0
+
+            with open(segment_file, "ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+            entry = {
+                "name": name or gen_page_name(category_code, page, self.names),
+                "category": category_code,
+                "page": int(page),
+                "offset": offset,
+                "length": len(data),
+                "count": len(publications),
+            }
+            # 数据落盘后再写索引，索引中的条目总是完整的
+            with open(segment_file + INDEX_SUFFIX, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        entry["segment"] = os.path.basename(segment_file)
+        self._remember(entry)
+        return entry
+
+    def find(self, category_code, page):
+        """返回某分类某页最新的索引条目，不存在时返回None"""
+        return self.pages.get((category_code, int(page)))
+
+    def read(self, entry):
+        """读取一个索引条目对应的记录"""
+        return read_segment_entry(self.ndjson_dir, entry)
+
+
+def compact_page_files(store, remove=False):
+    """
+    把目录中已有的单页文件合并到分段存储中
+
+    参数:
+    store (SegmentStore): 分段存储
+    remove (bool): 合并后是否删除单页文件
+
+    返回:
+    tuple: (合并的文件数, 合并的记录数)
+    """
+    page_files = sorted(glob.glob(os.path.join(store.ndjson_dir, "cnki_*_p*_*.json")))
+    num_files, num_records = 0, 0
+    for page_file in page_files:
+        name = os.path.basename(page_file)
+        match = PAGE_FILE_PATTERN.match(name)
+        if not match:
+            print(f"跳过无法识别的文件: {name}")
+            continue
+
+        if name not in store.names:
+            publications = []
+            with open(page_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        publications.append(json.loads(line.strip()))
+                    except json.JSONDecodeError:
+                        continue
+            store.append(publications, match["category"], int(match["page"]), name=name)
+            num_files += 1
+            num_records += len(publications)
+
+        if remove:
+            os.remove(page_file)
+
+    return num_files, num_records
+
+
+def open_segment_store(config):
+    """根据配置创建分段存储"""
+    return SegmentStore(
+        config["ndjson_dir"],
+        max_bytes=int(config.get("segment_max_bytes", DEFAULT_SEGMENT_MAX_BYTES)),
+        compress=config.get("segment_compress", False),
+    )
+
+
+def main():
+    # 创建命令行参数解析器
+    parser = argparse.ArgumentParser(description="把ndjson_dir中的单页文件合并为分段文件")
+    parser.add_argument("-c", "--config", required=True, help="指定JSON配置文件的路径")
+    parser.add_argument("--remove", action="store_true", help="合并后删除单页文件")
+
+    # 解析命令行参数
+    args = parser.parse_args()
+
+    from search import read_config
+
+    config = read_config(args.config)
+    store = open_segment_store(config)
+    num_files, num_records = compact_page_files(store, args.remove)
+    print(f"合并了 {num_files} 个文件, {num_records} 条记录到 {store.ndjson_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# CREATED DATE: Mon Oct 19 11:03:52 2026
+"""
+搜索抓取流水线
+
+抓取、解析、保存分为三个阶段:
+    抓取: 调用线程按每个目标主机的令牌桶限速发送请求
+    解析: 多个后台线程解析HTML
+    保存: 一个后台线程按顺序写入NDJSON
+
+解析和保存不再占用请求间隔，请求频率只由令牌桶决定。
+"""
+
+import queue
+import threading
+import time
+import traceback
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶
+
+    参数:
+    rate (float): 每秒生成的令牌数
+    burst (int): 桶容量，即允许的最大突发请求数
+    """
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate 必须大于0")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        取一个令牌，不足时阻塞等待
+
+        返回:
+        float: 实际等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # 先预留令牌再等待，多个线程排队时总速率不会超过 rate
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """按目标主机分配令牌桶"""
+
+    def __init__(self, rate_per_min, burst=1):
+        self.rate = rate_per_min / 60.0
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            bucket = self._buckets[host]
+        return bucket.acquire()
+
+
+class SearchPipeline:
+    """
+    抓取/解析/保存流水线
+
+    参数:
+    limiter (HostRateLimiter): 请求限速器
+    load_cached (callable): (task) -> 已缓存的出版物列表，未缓存返回None
+    fetch (callable): (task) -> HTML
+    parse (callable): (task, html) -> 出版物列表
+    store (callable): (task, publications) -> None
+    workers (int): 解析线程数
+    """
+
+    def __init__(self, limiter, load_cached, fetch, parse, store, workers=2):
+        self.limiter = limiter
+        self.load_cached = load_cached
+        self.fetch = fetch
+        self.parse = parse
+        self.store = store
+        self.workers = max(1, workers)
+
+        self._parse_queue = queue.Queue(maxsize=self.workers * 2)
+        self._store_queue = queue.Queue(maxsize=self.workers * 2)
+        self._cond = threading.Condition()
+        self._done = 0
+        self._in_flight = 0
+
+    def _finish(self, publications):
+        with self._cond:
+            self._in_flight -= 1
+            if publications:
+                self._done += 1
+            self._cond.notify_all()
+
+    def _parse_worker(self):
+        while True:
+            item = self._parse_queue.get()
+            if item is None:
+                break
+            task, html = item
+            try:
+                publications = self.parse(task, html)
+            except Exception as e:
+                print(f"解析出错 {task}: {e}")
+                print(traceback.format_exc())
+                publications = []
+            self._store_queue.put((task, publications))
+
+    def _store_worker(self):
+        while True:
+            item = self._store_queue.get()
+            if item is None:
+                break
+            task, publications = item
+            try:
+                self.store(task, publications)
+            except Exception as e:
+                print(f"保存出错 {task}: {e}")
+                print(traceback.format_exc())
+            self._finish(publications)
+            print(f"总进度: {self._done}/{self._num_pages}")
+
+    def run(self, tasks, url, num_pages):
+        """
+        运行流水线，直到有 num_pages 页抓到了记录
+
+        参数:
+        tasks (iterator): 产生抓取任务的迭代器
+        url (str): 目标地址，用于选择限速的主机
+        num_pages (int): 需要抓取的页数
+
+        返回:
+        int: 抓到记录的页数
+        """
+        self._num_pages = num_pages
+        parse_threads = [
+            threading.Thread(target=self._parse_worker, daemon=True)
+            for _ in range(self.workers)
+        ]
+        store_thread = threading.Thread(target=self._store_worker, daemon=True)
+        for t in parse_threads + [store_thread]:
+            t.start()
+
+        try:
+            for task in tasks:
+                with self._cond:
+                    # 在途的页面足够完成目标时，等结果出来再决定是否继续请求
+                    while self._done < num_pages and self._done + self._in_flight >= num_pages:
+                        self._cond.wait()
+                    if self._done >= num_pages:
+                        break
+
+                cached = self.load_cached(task)
+                if cached is not None:
+                    with self._cond:
+                        if cached:
+                            self._done += 1
+                    print(f"总进度: {self._done}/{num_pages}")
+                    continue
+
+                with self._cond:
+                    self._in_flight += 1
+                self.limiter.acquire(url)
+                try:
+                    html = self.fetch(task)
+                except Exception as e:
+                    print(f"请求出错 {task}: {e}")
+                    self._finish([])
+                    continue
+                self._parse_queue.put((task, html))
+        finally:
+            for _ in parse_threads:
+                self._parse_queue.put(None)
+            for t in parse_threads:
+                t.join()
+            self._store_queue.put(None)
+            store_thread.join()
+
+        return self._done
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# CREATED DATE: Mon Oct 19 12:20:44 2026
+"""
+用进程池批量重新抽取已保存的搜索结果页面
+
+遍历原始页面缓存(配置 raw_cache_dir)或指定的HTML目录，在多个进程中运行
+extract_publications，结果按顺序写入NDJSON存储(单页文件或分段文件)。重新抽取的记录不经过
+去重索引过滤，全部写入，dump.py 合并时按记录键用新结果覆盖旧记录。
+每处理完一个页面就把页面键记入目录中的 .reextract_done，中断后重新运行会跳过已完成的页面。
+
+python reextract.py -c config/3.1.json -s 3 -j 8
+python reextract.py -c config/3.1.json -s 3 --html-dir ../site3/html
+"""
+
+import argparse
+import glob
+import gzip
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from search import extract_publications, read_config, store_page
+
+DONE_FILE = ".reextract_done"
+HTML_FILE_PATTERN = re.compile(r"^cnki_(?P<category>.+)_p(?P<page>\d+)_.*\.html(\.gz)?$")
+# 文件名中没有分类号时只取页码
+PAGE_NUMBER_PATTERN = re.compile(r"_p(?P<page>\d+)[_.]")
+
+
+def page_key(html_file):
+    """页面键即文件名"""
+    return os.path.basename(html_file)
+
+
+def list_html_files(html_dir):
+    """按文件名顺序返回目录中的HTML页面"""
+    return sorted(
+        glob.glob(os.path.join(html_dir, "*.html"))
+        + glob.glob(os.path.join(html_dir, "*.html.gz"))
+    )
+
+
+def load_done_keys(html_dir):
+    """读取已完成的页面键"""
+    done_file = os.path.join(html_dir, DONE_FILE)
+    if not os.path.exists(done_file):
+        return set()
+    with open(done_file, "r", encoding="utf-8") as f:
+        return set(line.strip() for line in f if line.strip())
+
+
+def parse_page_name(html_file, default_category=None):
+    """
+    从文件名中解析分类号和页码
+
+    参数:
+    html_file (str): HTML文件路径
+    default_category (str): 文件名中没有分类号时使用的分类号
+
+    返回:
+    tuple: (分类号, 页码)，无法确定时对应的值为None
+    """
+    name = os.path.basename(html_file)
+    match = HTML_FILE_PATTERN.match(name)
+    if match:
+        return match["category"], int(match["page"])
+    match = PAGE_NUMBER_PATTERN.search(name)
+    return default_category, int(match["page"]) if match else None
+
+
+def extract_file(args):
+    """
+    在子进程中抽取一个页面
+
+    参数:
+    args (tuple): (站点ID, HTML文件路径, 默认分类号)
+
+    返回:
+    tuple: (页面键, 分类号, 页码, 出版物信息列表)
+    """
+    site_id, html_file, default_category = args
+    category_code, page = parse_page_name(html_file, default_category)
+
+    opener = gzip.open if html_file.endswith(".gz") else open
+    with opener(html_file, "rt", encoding="utf-8") as f:
+        html_content = f.read()
+
+    return page_key(html_file), category_code, page, extract_publications(
+        site_id, html_content, category_code
+    )
+
+
+def reextract(site_id, config, html_dir, jobs=None, default_category=None):
+    """
+    批量重新抽取页面并写入NDJSON存储
+
+    参数:
+    site_id (str): 站点ID
+    config (dict): 配置信息
+    html_dir (str): HTML页面目录
+    jobs (int): 进程数，默认为CPU核数
+    default_category (str): 文件名中没有分类号时使用的分类号
+
+    返回:
+    tuple: (处理的页面数, 抽取的记录数)
+    """
+    done_keys = load_done_keys(html_dir)
+    html_files = []
+    skipped = []
+    for html_file in list_html_files(html_dir):
+        if page_key(html_file) in done_keys:
+            continue
+        category_code, page = parse_page_name(html_file, default_category)
+        if not category_code:
+            print(f"跳过无法识别分类号的文件: {html_file}")
+            skipped.append(html_file)
+            continue
+        if page is None:
+            print(f"跳过无法识别页码的文件: {html_file}")
+            skipped.append(html_file)
+            continue
+        html_files.append(html_file)
+
+    print(f"共 {len(html_files)} 个页面待处理, 已完成 {len(done_keys)} 个, 跳过 {len(skipped)} 个")
+
+    num_pages, num_records = 0, 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor, open(
+        os.path.join(html_dir, DONE_FILE), "a", encoding="utf-8"
+    ) as done_file:
+        results = executor.map(
+            extract_file,
+            [(site_id, f, default_category) for f in html_files],
+            chunksize=8,
+        )
+        # 保存在主进程中按顺序进行，写入成功后才记录页面键
+        for key, category_code, page, publications in results:
+            store_page(publications, category_code, page, config, dedup=False)
+            done_file.write(key + "\n")
+            done_file.flush()
+            num_pages += 1
+            num_records += len(publications)
+            print(f"总进度: {num_pages}/{len(html_files)}")
+
+    return num_pages, num_records
+
+
+def main():
+    # 创建命令行参数解析器
+    parser = argparse.ArgumentParser(description="用进程池批量重新抽取已保存的搜索结果页面")
+    parser.add_argument("-c", "--config", required=True, help="指定JSON配置文件的路径")
+    parser.add_argument("-s", "--site-id", required=True, help="site_tag")
+    parser.add_argument(
+        "-d", "--html-dir", default=None, help="HTML页面目录，默认为配置中的 raw_cache_dir"
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="进程数，默认为CPU核数")
+    parser.add_argument(
+        "-C", "--category-code", default=None, help="文件名中没有分类号时使用的分类号"
+    )
+
+    # 解析命令行参数
+    args = parser.parse_args()
+
+    # 读取配置文件
+    config = read_config(args.config)
+    html_dir = args.html_dir or config.get("raw_cache_dir")
+    if not html_dir:
+        print("错误: 请指定 --html-dir 或在配置中设置 raw_cache_dir")
+        sys.exit(1)
+
+    num_pages, num_records = reextract(
+        args.site_id, config, html_dir, args.jobs, args.category_code
+    )
+    print(f"处理了 {num_pages} 个页面, 抽取了 {num_records} 条记录")
+
+
+if __name__ == "__main__":
+    main()
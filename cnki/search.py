@@ -24,6 +24,10 @@ import base64
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad
 
+from dedup_index import KeyIndex
+from ndjson_segment import load_segment_entries, open_segment_store, read_segment_entry
+from pipeline import HostRateLimiter, SearchPipeline
+
 # 禁用 SSL 警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -92,6 +96,15 @@ def read_config(config_file, update_proxy=False):
             config["state_file"] = str(
                 Path(os.path.join(CNF_DIR, config["state_file"])).resolve()
             )
+            if config.get("raw_cache_dir"):
+                config["raw_cache_dir"] = str(
+                    Path(os.path.join(CNF_DIR, config["raw_cache_dir"])).resolve()
+                )
+            # dedup_index 可以是索引文件路径，也可以是 true/false
+            if isinstance(config.get("dedup_index"), str):
+                config["dedup_index"] = str(
+                    Path(os.path.join(CNF_DIR, config["dedup_index"])).resolve()
+                )
         
             # 创建必要的目录
             os.makedirs(config["ndjson_dir"], exist_ok=True)
@@ -404,6 +417,13 @@ def save_to_ndjson(publications, ndjson_dir, category_code, page):
     filename = os.path.join(
         ndjson_dir, f"cnki_{category_code}_p{page}_{timestamp}.json"
     )
+    # 同一秒内重复保存同一页（如重新抽取）时不覆盖已有文件，dump按文件名记录是否已合并
+    suffix = 1
+    while os.path.exists(filename):
+        filename = os.path.join(
+            ndjson_dir, f"cnki_{category_code}_p{page}_{timestamp}_{suffix}.json"
+        )
+        suffix += 1
 
     # 写入NDJSON文件
     with open(filename, "w", encoding="utf-8") as f:
@@ -414,6 +434,63 @@ def save_to_ndjson(publications, ndjson_dir, category_code, page):
     return filename
 
 
+def get_segment_store(config):
+    """
+    返回配置对应的分段存储，未开启 use_segments 时返回None
+
+    参数:
+    config (dict): 配置信息
+
+    返回:
+    SegmentStore: 分段存储，同一配置内复用
+    """
+    if not config.get("use_segments", False):
+        return None
+    if "segment_store" not in config:
+        config["segment_store"] = open_segment_store(config)
+    return config["segment_store"]
+
+
+def get_key_index(config):
+    """
+    返回配置对应的记录去重索引，配置 "dedup_index": false 时返回None
+
+    索引默认保存在 ndjson_dir/keys.sqlite，第一次创建时用目录中已有的记录初始化
+
+    参数:
+    config (dict): 配置信息
+
+    返回:
+    KeyIndex: 去重索引，同一配置内复用
+    """
+    if config.get("dedup_index", True) is False:
+        return None
+    if "key_index" in config:
+        return config["key_index"]
+
+    ndjson_dir = get_ndjson_dir(config)
+    index_file = config.get("dedup_index")
+    if not isinstance(index_file, str):
+        index_file = os.path.join(ndjson_dir, "keys.sqlite")
+    index = KeyIndex(index_file)
+    if len(index) == 0:
+        for page_file in glob.glob(os.path.join(ndjson_dir, "cnki_*_p*_*.json")):
+            with open(page_file, "r", encoding="utf-8") as f:
+                records = []
+                for line in f:
+                    try:
+                        records.append(json.loads(line.strip()))
+                    except json.JSONDecodeError:
+                        continue
+            index.add(records)
+        for entry in load_segment_entries(ndjson_dir):
+            index.add(read_segment_entry(ndjson_dir, entry))
+        print(f"去重索引初始化完成: {len(index)} 条记录")
+
+    config["key_index"] = index
+    return index
+
+
 def check_existing_file(ndjson_dir, category_code, page):
     """
     检查是否已存在符合条件的文件
@@ -460,27 +537,38 @@ def check_existing_file(ndjson_dir, category_code, page):
     return True, matching_files, valid_records
 
 
-def search_and_save(
-    site_id, category_code, config, sci_only=True, page=1, page_size=50
-):
+def get_ndjson_dir(config):
+    """返回配置中的ndjson目录，确保ndjson_dir是目录而不是通配符模式"""
+    ndjson_dir = config.get("ndjson_dir", "./")
+    return os.path.dirname(ndjson_dir) if "*" in ndjson_dir else ndjson_dir
+
+
+def load_cached_page(category_code, page, config):
     """
-    按分类号搜索CNKI并保存结果
+    读取已保存的某分类某页的记录
 
     参数:
-    category_code (str): 分类号，例如 'V'
-    config (dict): 配置信息
-    sci_only (bool): 是否只搜索SCI收录的文献
+    category_code (str): 分类号
     page (int): 页码
-    page_size (int): 每页结果数
+    config (dict): 配置信息
 
     返回:
-    tuple: (出版物信息列表, 是否实际发送了请求)
+    list: 已有有效记录时返回出版物信息列表，否则返回None
     """
-    # 获取ndjson目录
-    ndjson_dir = config.get("ndjson_dir", "./")
-
-    # 确保ndjson_dir是目录而不是通配符模式
-    ndjson_dir = os.path.dirname(ndjson_dir) if "*" in ndjson_dir else ndjson_dir
+    ndjson_dir = get_ndjson_dir(config)
+
+    # 分段存储模式下从索引中查找
+    store = get_segment_store(config)
+    if store is not None:
+        entry = store.find(category_code, page)
+        if entry:
+            publications = store.read(entry)
+            valid_records = sum(1 for record in publications if record.get("url"))
+            if valid_records > 0:
+                print(
+                    f"分类 {category_code} 第 {page} 页: 已存在 {valid_records} 条有效记录，跳过请求"
+                )
+                return publications
 
     # 检查是否已存在符合条件的文件
     file_exists, matching_files, valid_records = check_existing_file(
@@ -502,8 +590,24 @@ def search_and_save(
                     publications.append(record)
                 except json.JSONDecodeError:
                     continue
-        return publications, False  # 返回数据和"未发送请求"标志
+        return publications
 
+    # 记录全部重复的页面没有写入NDJSON，由去重索引记录已抓取
+    index = get_key_index(config)
+    if index is not None and index.has_page(category_code, page):
+        print(f"分类 {category_code} 第 {page} 页: 已抓取过，记录全部重复，跳过请求")
+        return []
+
+    return None
+
+
+def fetch_page(site_id, category_code, config, sci_only=True, page=1, page_size=50):
+    """
+    使用配置中的cookies请求某分类某页的搜索结果
+
+    返回:
+    str: HTML格式的搜索结果
+    """
     # 从配置中获取cookies
     cookies_str = config.get("search_cookies", "")
     cookies = {}
@@ -519,15 +623,110 @@ def search_and_save(
         site_id, category_code, page, page_size, sci_only, cookies
     )
 
-    # 提取出版物信息
-    publications = extract_publications(site_id, html_content, category_code)
+    # 保存原始页面，供 reextract.py 重新抽取
+    if html_content and config.get("raw_cache_dir"):
+        save_raw_page(html_content, config["raw_cache_dir"], category_code, page)
 
-    # 保存为NDJSON
-    if publications:
-        save_to_ndjson(publications, ndjson_dir, category_code, page)
-        print(f"分类 {category_code} 第 {page} 页: 成功找到 {len(publications)} 条记录")
-    else:
+    return html_content
+
+
+def save_raw_page(html_content, raw_cache_dir, category_code, page):
+    """
+    保存原始搜索结果页面
+
+    参数:
+    html_content (str): HTML格式的搜索结果
+    raw_cache_dir (str): 原始页面保存目录
+    category_code (str): 分类号
+    page (int): 页码
+
+    返回:
+    str: 保存的文件名
+    """
+    os.makedirs(raw_cache_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+    filename = os.path.join(
+        raw_cache_dir, f"cnki_{category_code}_p{page}_{timestamp}.html"
+    )
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(html_content)
+    return filename
+
+
+def store_page(publications, category_code, page, config, dedup=True):
+    """
+    保存某分类某页的出版物信息
+
+    参数:
+    publications (list): 出版物信息列表
+    category_code (str): 分类号
+    page (int): 页码
+    config (dict): 配置信息
+    dedup (bool): 是否跳过去重索引中已有的记录，重新抽取时为False，
+        全部写入，下游按记录键用新结果覆盖旧记录
+    """
+    if not publications:
         print(f"分类 {category_code} 第 {page} 页: 未找到匹配的出版物")
+        return
+
+    # 只保存去重索引中没有的记录
+    index = get_key_index(config)
+    new_publications = publications
+    if index is not None:
+        new_publications, num_duplicates = index.filter_new(publications)
+        print(
+            f"分类 {category_code} 第 {page} 页: 新记录 {len(new_publications)} 条, 重复 {num_duplicates} 条"
+        )
+        if not dedup:
+            # 新记录的键仍然加入索引
+            new_publications = publications
+
+    # 保存为NDJSON
+    try:
+        if new_publications:
+            store = get_segment_store(config)
+            if store is not None:
+                entry = store.append(new_publications, category_code, page)
+                print(f"保存了 {len(new_publications)} 条记录到 {entry['segment']}")
+            else:
+                save_to_ndjson(new_publications, get_ndjson_dir(config), category_code, page)
+        elif index is not None:
+            # 没有新记录时不写文件，记下这一页已抓取，之后不再重复请求
+            index.mark_page(category_code, page)
+    except Exception:
+        if index is not None:
+            index.rollback()
+        raise
+    if index is not None:
+        index.commit()
+    print(f"分类 {category_code} 第 {page} 页: 成功找到 {len(publications)} 条记录")
+
+
+def search_and_save(
+    site_id, category_code, config, sci_only=True, page=1, page_size=50
+):
+    """
+    按分类号搜索CNKI并保存结果
+
+    参数:
+    category_code (str): 分类号，例如 'V'
+    config (dict): 配置信息
+    sci_only (bool): 是否只搜索SCI收录的文献
+    page (int): 页码
+    page_size (int): 每页结果数
+
+    返回:
+    tuple: (出版物信息列表, 是否实际发送了请求)
+    """
+    publications = load_cached_page(category_code, page, config)
+    if publications is not None:
+        return publications, False  # 返回数据和"未发送请求"标志
+
+    html_content = fetch_page(site_id, category_code, config, sci_only, page, page_size)
+
+    # 提取出版物信息
+    publications = extract_publications(site_id, html_content, category_code)
+    store_page(publications, category_code, page, config)
 
     return publications, True  # 返回数据和"已发送请求"标志
 
@@ -721,8 +920,22 @@ def convert_download_url_site_2(
 
 
 def random_page(
-    site_id, num_pages, config, page_size=50, sci_only=True, metadata="./metadata.json"
+    site_id,
+    num_pages,
+    config,
+    page_size=50,
+    sci_only=True,
+    metadata="./metadata.json",
+    rate_per_min=None,
+    workers=2,
 ):
+    """
+    按分类大小加权随机抽取页面，通过抓取/解析/保存流水线抓取
+
+    参数:
+    rate_per_min (float): 每个目标主机每分钟的请求数，默认读取配置 search_rate_per_min
+    workers (int): 解析线程数
+    """
     # 读取数据并计算总数
     categories_data, total_count = read_metadata(metadata)
 
@@ -756,39 +969,39 @@ def random_page(
             f"{i}. {category_code}: {category_info['name']} - {category_info['size']}篇 (权重: {weight:.4f})"
         )
 
-    # 总页数计数器
-    num_pages_feteched = 0
+    def random_tasks():
+        while True:
+            # 使用权重随机选择一个分类
+            random_category_idx = np.random.choice(len(categories), p=weights)
+            category_code, category_info = categories[random_category_idx]
 
-    # 当尚未达到总页数要求时，继续抓取
-    while num_pages_feteched < num_pages:
-        # 使用权重随机选择一个分类
-        random_category_idx = np.random.choice(len(categories), p=weights)
-        category_code, category_info = categories[random_category_idx]
-
-        print(
-            f"\n随机选择分类: {category_code}: {category_info['name']} (权重: {weights[random_category_idx]:.4f})"
-        )
-
-        # 计算该分类的最大页数（每页50条记录） 随机选择一个页码
-        random_page = random.randint(1, min((category_info['size'] + page_size - 1) // page_size, 300))
-        
-        print(f"开始抓取分类 {category_code} ({category_info['name']}) 第 {random_page} 页")
-        
-        # 搜索并保存，获取是否实际发送了请求的标志
-        publications, not_cached = search_and_save(
-            site_id, category_code, config, sci_only, random_page, page_size
-        )
-
-        # 增加计数器
-        if len(publications) > 0:
-            num_pages_feteched += 1
-            print(f"总进度: {num_pages_feteched}/{num_pages}")
+            print(
+                f"\n随机选择分类: {category_code}: {category_info['name']} (权重: {weights[random_category_idx]:.4f})"
+            )
 
-        # 延迟，避免请求过于频繁
-        if not_cached and num_pages_feteched < num_pages and len(publications) > 0:
-            delay = random.uniform(2, 5)  # 随机延迟2-5秒
-            print(f"等待 {delay:.2f} 秒后继续...")
-            time.sleep(delay)
+            # 计算该分类的最大页数（每页50条记录） 随机选择一个页码
+            random_page = random.randint(1, min((category_info['size'] + page_size - 1) // page_size, 300))
+
+            print(f"开始抓取分类 {category_code} ({category_info['name']}) 第 {random_page} 页")
+            yield category_code, random_page
+
+    # 默认速率与原来每次请求后随机等待2-5秒相当
+    if rate_per_min is None:
+        rate_per_min = float(config.get("search_rate_per_min", 17))
+
+    pipeline = SearchPipeline(
+        HostRateLimiter(rate_per_min, burst=int(config.get("search_burst", 1))),
+        load_cached=lambda task: load_cached_page(task[0], task[1], config),
+        fetch=lambda task: fetch_page(
+            site_id, task[0], config, sci_only, task[1], page_size
+        ),
+        parse=lambda task, html: extract_publications(site_id, html, task[0]),
+        store=lambda task, publications: store_page(
+            publications, task[0], task[1], config
+        ),
+        workers=workers,
+    )
+    return pipeline.run(random_tasks(), SEARCH_TARGET_URLS[site_id], num_pages)
 
 
 # 示例使用
@@ -845,13 +1058,31 @@ def main():
         help="指定总共要抓取的页数，默认为None，表示由pages-per-category决定",
     )
 
+    parser.add_argument(
+        "-r",
+        "--rate",
+        type=float,
+        default=None,
+        help="每个目标主机每分钟的请求数，默认读取配置 search_rate_per_min，未配置时为17",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=2, help="解析线程数，默认为2"
+    )
+
     # 解析命令行参数
     args = parser.parse_args()
 
     # 读取配置文件
     config = read_config(args.config)
     random_page(
-        args.site_id, args.total_pages, config, args.page_size, args.sci, args.metadata
+        args.site_id,
+        args.total_pages,
+        config,
+        args.page_size,
+        args.sci,
+        args.metadata,
+        args.rate,
+        args.workers,
     )
     # publications, not_cached = search_and_save(args.site_id, "N1", config, False, 1, 50)
 
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# CREATED DATE: Mon Oct 19 13:05:19 2026
+"""
+基于SQLite的下载状态存储
+
+每条记录一行，以记录键为主键，downloaded 列上有索引。下载状态按行更新并立即提交，
+不再整表重写状态文件；启动时只读取仍需下载(downloaded > 0)的记录。
+
+在配置中设置 "state_store": "sqlite" 启用，数据库文件为 state_file 去掉扩展名加 .sqlite，
+第一次创建时会导入已有的ndjson状态文件。
+"""
+
+import os
+import sqlite3
+
+import pandas as pd
+
+PAPER_COLUMNS = [
+    "title",
+    "authors",
+    "date",
+    "category",
+    "filename",
+    "dbname",
+    "source",
+    "url",
+]
+STATE_COLUMNS = ["key", "ndjson", "downloaded"]
+
+
+def state_db_path(state_file):
+    """状态数据库路径"""
+    return os.path.splitext(state_file)[0] + ".sqlite"
+
+
+def _to_ms(value):
+    if value is None or pd.isna(value):
+        return None
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+
+class SqliteStateStore:
+    """
+    SQLite状态存储
+
+    参数:
+    db_file (str): 数据库文件路径
+    """
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self._conn = sqlite3.connect(db_file)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS papers (
+                key TEXT PRIMARY KEY,
+                title TEXT,
+                authors TEXT,
+                date INTEGER,
+                category TEXT,
+                filename TEXT,
+                dbname TEXT,
+                source TEXT,
+                url TEXT,
+                ndjson TEXT,
+                downloaded INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_papers_downloaded ON papers (downloaded);
+            CREATE TABLE IF NOT EXISTS ingested (name TEXT PRIMARY KEY);
+            """
+        )
+        self._conn.commit()
+
+    def is_empty(self):
+        return self._conn.execute("SELECT 1 FROM papers LIMIT 1").fetchone() is None
+
+    def _max_rowid(self):
+        return self._conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM papers").fetchone()[0]
+
+    def _rows(self, df):
+        for row in df[PAPER_COLUMNS + STATE_COLUMNS].itertuples(index=False):
+            row = row._asdict()
+            row["date"] = _to_ms(row["date"])
+            row["downloaded"] = int(row["downloaded"])
+            yield row
+
+    def upsert(self, df_update):
+        """
+        按记录键合并新记录，规则与 dump.upsert_records 相同:
+        下载状态值较小的为准，相同时以较新的ndjson为准
+
+        参数:
+        df_update (DataFrame): 键不重复的新记录
+
+        返回:
+        tuple: (新增记录数, 更新记录数)
+        """
+        columns = PAPER_COLUMNS + STATE_COLUMNS
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "key")
+        sql = (
+            f"INSERT INTO papers ({', '.join(columns)}) "
+            f"VALUES ({', '.join(':' + c for c in columns)}) "
+            f"ON CONFLICT (key) DO UPDATE SET {updates} "
+            "WHERE papers.downloaded > 1 "
+            "OR (papers.downloaded = 1 AND excluded.ndjson > papers.ndjson)"
+        )
+        max_rowid = self._max_rowid()
+        changes = self._conn.total_changes
+        with self._conn:
+            self._conn.executemany(sql, self._rows(df_update))
+        num_changed = self._conn.total_changes - changes
+        num_added = self._max_rowid() - max_rowid
+        return num_added, num_changed - num_added
+
+    def insert(self, df_state):
+        """原样导入已有状态，用于从ndjson状态文件迁移"""
+        columns = PAPER_COLUMNS + STATE_COLUMNS
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO papers ({', '.join(columns)}) "
+                f"VALUES ({', '.join(':' + c for c in columns)})",
+                self._rows(df_state),
+            )
+
+    def load_pending(self):
+        """
+        读取仍需下载的记录
+
+        返回:
+        DataFrame: 以记录键为索引的待下载记录
+        """
+        df = pd.read_sql_query(
+            "SELECT * FROM papers WHERE downloaded > 0", self._conn
+        )
+        df["date"] = pd.to_datetime(df["date"], unit="ms")
+        return df.set_index("key", drop=False)
+
+    def set_downloaded(self, key, downloaded):
+        """更新一条记录的下载状态"""
+        with self._conn:
+            self._conn.execute(
+                "UPDATE papers SET downloaded = ? WHERE key = ?", (int(downloaded), key)
+            )
+
+    def ingested_names(self):
+        """已经合并进状态的处理单元名称"""
+        return set(r[0] for r in self._conn.execute("SELECT name FROM ingested"))
+
+    def add_ingested(self, names):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO ingested (name) VALUES (?)", ((n,) for n in names)
+            )
+
+    def close(self):
+        self._conn.close()
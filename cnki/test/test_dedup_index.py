@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# CREATED DATE: Mon Oct 19 15:21:37 2026
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import search
+from dedup_index import KeyIndex, record_key
+
+
+def make_pub(i, filename=True):
+    return {
+        "title": f"title-{i}",
+        "authors": "a,b",
+        "source": "journal",
+        "date": "2025-01-01",
+        "url": f"http://example/{i}",
+        "filename": f"F{i}" if filename else "",
+        "dbname": "CJFQ",
+    }
+
+
+class TestKeyIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index_file = os.path.join(self.tmp_dir.name, "keys.sqlite")
+        self.index = KeyIndex(self.index_file)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    def test_record_key(self):
+        self.assertEqual(record_key(make_pub(1)), record_key(dict(make_pub(1), title="other")))
+        self.assertNotEqual(record_key(make_pub(1, False)), record_key(dict(make_pub(1, False), title="other")))
+
+    def test_filter_new(self):
+        new, num_duplicates = self.index.filter_new([make_pub(1), make_pub(2), make_pub(1)])
+        self.assertEqual((new, num_duplicates), ([make_pub(1), make_pub(2)], 1))
+        self.index.commit()
+
+        new, num_duplicates = self.index.filter_new([make_pub(2), make_pub(3)])
+        self.assertEqual((new, num_duplicates), ([make_pub(3)], 1))
+        self.index.commit()
+
+        reopened = KeyIndex(self.index_file)
+        self.assertEqual(len(reopened), 3)
+        reopened.close()
+
+    def test_rollback(self):
+        self.index.add([make_pub(1)])
+        new, _ = self.index.filter_new([make_pub(1), make_pub(2)])
+        self.assertEqual(new, [make_pub(2)])
+        # 写入失败时回滚，下次仍然当作新记录
+        self.index.rollback()
+        self.assertEqual(len(self.index), 1)
+        new, _ = self.index.filter_new([make_pub(2)])
+        self.assertEqual(new, [make_pub(2)])
+
+    def test_done_pages(self):
+        self.index.mark_page("V1", 3)
+        self.index.rollback()
+        self.assertFalse(self.index.has_page("V1", 3))
+        self.index.mark_page("V1", 3)
+        self.index.commit()
+        self.assertTrue(self.index.has_page("V1", "3"))
+        self.assertFalse(self.index.has_page("V1", 4))
+
+
+class TestStorePage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config = {"ndjson_dir": self.tmp_dir.name}
+
+    def tearDown(self):
+        if "key_index" in self.config:
+            self.config["key_index"].close()
+        self.tmp_dir.cleanup()
+
+    def test_duplicates_not_saved(self):
+        search.store_page([make_pub(1), make_pub(2)], "V1", 1, self.config)
+        search.store_page([make_pub(2), make_pub(3)], "V1", 2, self.config)
+        pages = sorted(f for f in os.listdir(self.tmp_dir.name) if f.endswith(".json"))
+        with open(os.path.join(self.tmp_dir.name, pages[1]), "r", encoding="utf-8") as f:
+            self.assertEqual([json.loads(line) for line in f], [make_pub(3)])
+
+    def test_duplicate_page_not_fetched_again(self):
+        search.store_page([make_pub(1)], "V1", 1, self.config)
+        self.assertIsNone(search.load_cached_page("V1", 2, self.config))
+        search.store_page([make_pub(1)], "V1", 2, self.config)
+        # 全部重复的页面没有文件，但不再请求
+        self.assertEqual(search.load_cached_page("V1", 2, self.config), [])
+
+    def test_failed_store_rolls_back(self):
+        self.config["use_segments"] = True
+        with mock.patch.object(search, "get_segment_store") as get_store:
+            get_store.return_value.append.side_effect = OSError("disk full")
+            with self.assertRaises(OSError):
+                search.store_page([make_pub(1)], "V1", 1, self.config)
+        self.assertEqual(len(self.config["key_index"]), 0)
+
+    def test_dedup_disabled(self):
+        self.config["dedup_index"] = False
+        search.store_page([make_pub(1)], "V1", 1, self.config)
+        search.store_page([make_pub(1)], "V1", 2, self.config)
+        self.assertEqual(len([f for f in os.listdir(self.tmp_dir.name) if f.endswith(".json")]), 2)
+
+
+class TestReadConfig(unittest.TestCase):
+
+    def test_dedup_index_option(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config_file = os.path.join(tmp_dir, "1.json")
+            for value, expected in [
+                (True, True),
+                (False, False),
+                ("index/keys.sqlite", os.path.join(os.path.realpath(tmp_dir), "index", "keys.sqlite")),
+            ]:
+                with open(config_file, "w", encoding="utf-8") as f:
+                    json.dump({"ndjson_dir": "ndjson", "output_dir": "output",
+                               "state_file": "state.json", "dedup_index": value}, f)
+                self.assertEqual(search.read_config(config_file)["dedup_index"], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# CREATED DATE: Mon Oct 19 16:02:45 2026
+
+import json
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+import dump
+from dedup_index import record_key
+
+
+def make_pub(i, **kwargs):
+    pub = {
+        "title": f"title-{i}",
+        "authors": "a,b",
+        "date": "2025-01-01",
+        "category": "V1",
+        "filename": f"F{i}",
+        "dbname": "CJFQ",
+        "source": "journal",
+        "url": f"http://example/{i}",
+    }
+    pub.update(kwargs)
+    return pub
+
+
+class TestNdjsonStateIngest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ndjson_dir = os.path.join(self.tmp_dir.name, "ndjson")
+        os.makedirs(self.ndjson_dir)
+        self.state_file = os.path.join(self.tmp_dir.name, "state.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_page(self, name, pubs):
+        with open(os.path.join(self.ndjson_dir, name), "w", encoding="utf-8") as f:
+            for pub in pubs:
+                f.write(json.dumps(pub, ensure_ascii=False) + "\n")
+
+    def ingest(self):
+        return dump.process_ndjson_files(dump.load_state(self.state_file), self.ndjson_dir, self.state_file)
+
+    def count_state_lines(self):
+        with open(self.state_file, "r", encoding="utf-8") as f:
+            return sum(1 for _ in f)
+
+    def test_resume_across_runs(self):
+        self.write_page("cnki_V1_p1_2025-01-01-00-00-00.json", [make_pub(1), make_pub(2)])
+        df_state = self.ingest()
+        self.assertEqual(len(df_state), 2)
+
+        # 第二次运行只合并新的页面，已有记录只追加变化的行
+        self.write_page("cnki_V1_p2_2025-01-02-00-00-00.json", [make_pub(2, title="new"), make_pub(3)])
+        df_state = self.ingest()
+        self.assertEqual(len(df_state), 3)
+        self.assertEqual(df_state.loc[record_key(make_pub(2)), "title"], "new")
+        self.assertEqual(self.count_state_lines(), 4)
+
+        # 没有新页面时不写入
+        df_state = self.ingest()
+        self.assertEqual(self.count_state_lines(), 4)
+
+        reloaded = dump.load_state(self.state_file)
+        self.assertEqual(len(reloaded), 3)
+        self.assertEqual(reloaded.loc[record_key(make_pub(2)), "title"], "new")
+        self.assertEqual(reloaded.loc[record_key(make_pub(1)), "date"], pd.Timestamp("2025-01-01"))
+
+    def test_downloaded_not_replaced(self):
+        self.write_page("cnki_V1_p1_2025-01-01-00-00-00.json", [make_pub(1), make_pub(2)])
+        df_state = self.ingest()
+        df_state.loc[record_key(make_pub(1)), "downloaded"] = -1
+        df_state.loc[record_key(make_pub(2)), "downloaded"] = 2000
+        dump.save_state(df_state, self.state_file)
+
+        self.write_page("cnki_V1_p2_2025-01-02-00-00-00.json", [make_pub(1), make_pub(2)])
+        self.ingest()
+        reloaded = dump.load_state(self.state_file)
+        # 已下载的保持不变，失败的重新进入下载队列
+        self.assertEqual(reloaded.loc[record_key(make_pub(1)), "downloaded"], -1)
+        self.assertEqual(reloaded.loc[record_key(make_pub(2)), "downloaded"], 1)
+
+    def test_legacy_state_without_ingested_file(self):
+        # 旧状态文件: 没有 key 列，没有 .ingested，同一记录有多行
+        legacy_name = "cnki_V1_p1_2025-01-01-00-00-00.json"
+        self.write_page(legacy_name, [make_pub(1), make_pub(2)])
+        rows = [
+            dict(make_pub(1), ndjson=legacy_name, downloaded=-1),
+            dict(make_pub(1), ndjson=legacy_name, downloaded=1),
+            dict(make_pub(2), ndjson=legacy_name, downloaded=1),
+        ]
+        df_legacy = pd.DataFrame(rows)
+        df_legacy["date"] = pd.to_datetime(df_legacy["date"])
+        df_legacy.to_json(self.state_file, lines=True, orient="records", force_ascii=False)
+
+        df_state = self.ingest()
+        self.assertEqual(len(df_state), 2)
+        self.assertEqual(df_state.loc[record_key(make_pub(1)), "downloaded"], -1)
+
+        # 第二次运行不会重新合并旧的ndjson
+        with open(self.state_file + ".ingested", "r", encoding="utf-8") as f:
+            self.assertEqual(f.read().split(), [legacy_name])
+        self.write_page("cnki_V1_p2_2025-01-02-00-00-00.json", [make_pub(3)])
+        lines = self.count_state_lines()
+        df_state = self.ingest()
+        self.assertEqual(self.count_state_lines(), lines + 1)
+        self.assertEqual(df_state.loc[record_key(make_pub(1)), "downloaded"], -1)
+
+    def test_resolve_duplicates(self):
+        df = pd.DataFrame(
+            [
+                {"key": "a", "downloaded": 1, "ndjson": "p2"},
+                {"key": "a", "downloaded": -1, "ndjson": "p1"},
+                {"key": "b", "downloaded": 1, "ndjson": "p1"},
+                {"key": "b", "downloaded": 1, "ndjson": "p3"},
+                {"key": "c", "downloaded": 2000, "ndjson": "p3"},
+                {"key": "c", "downloaded": 1, "ndjson": "p1"},
+            ]
+        ).set_index("key", drop=False)
+        resolved = dump.resolve_duplicates(df)
+        self.assertEqual(resolved.loc["a", "downloaded"], -1)
+        self.assertEqual(resolved.loc["b", "ndjson"], "p3")
+        self.assertEqual(resolved.loc["c", "downloaded"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# CREATED DATE: Mon Oct 19 15:02:11 2026
+
+import json
+import os
+import tempfile
+import unittest
+
+from ndjson_segment import (
+    INDEX_SUFFIX,
+    SegmentStore,
+    compact_page_files,
+    list_segment_files,
+    load_segment_entries,
+)
+
+
+def make_pubs(prefix, n):
+    return [{"title": f"{prefix}-{i}", "filename": f"{prefix}{i}", "dbname": "CJFQ"} for i in range(n)]
+
+
+class TestSegmentStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ndjson_dir = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_append_and_find(self):
+        store = SegmentStore(self.ndjson_dir)
+        store.append(make_pubs("a", 3), "V1", 1)
+        store.append(make_pubs("b", 2), "V1", 2)
+
+        entry = store.find("V1", 2)
+        self.assertEqual(entry["count"], 2)
+        self.assertEqual(store.read(entry), make_pubs("b", 2))
+        self.assertIsNone(store.find("V1", 3))
+
+        # 重新打开后从旁路索引恢复
+        reopened = SegmentStore(self.ndjson_dir)
+        self.assertEqual(reopened.read(reopened.find("V1", 1)), make_pubs("a", 3))
+        self.assertEqual(len(load_segment_entries(self.ndjson_dir)), 2)
+
+    def test_roll_over(self):
+        store = SegmentStore(self.ndjson_dir, max_bytes=200)
+        for page in range(1, 5):
+            store.append(make_pubs(f"p{page}", 3), "V1", page)
+        self.assertGreater(len(list_segment_files(self.ndjson_dir)), 1)
+        for page in range(1, 5):
+            self.assertEqual(store.read(store.find("V1", page)), make_pubs(f"p{page}", 3))
+
+    def test_truncate_interrupted_write(self):
+        store = SegmentStore(self.ndjson_dir)
+        entry = store.append(make_pubs("a", 2), "V1", 1)
+        segment_file = os.path.join(self.ndjson_dir, entry["segment"])
+        # 数据写了一半，索引没有写入
+        with open(segment_file, "ab") as f:
+            f.write(b'{"title": "half')
+
+        reopened = SegmentStore(self.ndjson_dir)
+        reopened.append(make_pubs("b", 1), "V1", 2)
+        self.assertEqual(reopened.read(reopened.find("V1", 2)), make_pubs("b", 1))
+        self.assertEqual(reopened.read(reopened.find("V1", 1)), make_pubs("a", 2))
+
+    def test_compressed(self):
+        store = SegmentStore(self.ndjson_dir, compress=True)
+        store.append(make_pubs("a", 3), "V1", 1)
+        self.assertTrue(list_segment_files(self.ndjson_dir)[0].endswith(".zst"))
+        self.assertEqual(store.read(store.find("V1", 1)), make_pubs("a", 3))
+
+    def test_compact_page_files(self):
+        names = ["cnki_V1_p1_2025-01-01-00-00-00.json", "cnki_V2_p3_2025-01-02-00-00-00.json"]
+        for name, prefix in zip(names, ("a", "b")):
+            with open(os.path.join(self.ndjson_dir, name), "w", encoding="utf-8") as f:
+                for pub in make_pubs(prefix, 2):
+                    f.write(json.dumps(pub, ensure_ascii=False) + "\n")
+
+        store = SegmentStore(self.ndjson_dir)
+        self.assertEqual(compact_page_files(store, remove=True), (2, 4))
+        self.assertFalse(any(os.path.exists(os.path.join(self.ndjson_dir, n)) for n in names))
+        self.assertEqual(store.find("V2", 3)["name"], names[1])
+        self.assertEqual(store.read(store.find("V1", 1)), make_pubs("a", 2))
+
+        # 再次合并不会重复写入
+        self.assertEqual(compact_page_files(SegmentStore(self.ndjson_dir)), (0, 0))
+        index_files = [f for f in os.listdir(self.ndjson_dir) if f.endswith(INDEX_SUFFIX)]
+        self.assertEqual(len(index_files), 1)
+
+    def test_same_second_names_unique(self):
+        store = SegmentStore(self.ndjson_dir)
+        first = store.append(make_pubs("a", 1), "V1", 1)
+        second = store.append(make_pubs("b", 1), "V1", 1)
+        self.assertNotEqual(first["name"], second["name"])
+        self.assertEqual(store.find("V1", 1)["name"], second["name"])
+
+    def test_compact_suffixed_page_file(self):
+        # 重新抽取时同一秒保存的同一页
+        names = ["cnki_V1_p1_2025-01-01-00-00-00.json", "cnki_V1_p1_2025-01-01-00-00-00_1.json"]
+        for name, prefix in zip(names, ("a", "b")):
+            with open(os.path.join(self.ndjson_dir, name), "w", encoding="utf-8") as f:
+                for pub in make_pubs(prefix, 2):
+                    f.write(json.dumps(pub, ensure_ascii=False) + "\n")
+
+        store = SegmentStore(self.ndjson_dir)
+        self.assertEqual(compact_page_files(store, remove=True), (2, 4))
+        self.assertEqual(os.listdir(self.ndjson_dir).count(names[1]), 0)
+        # 带后缀的是较新的文件
+        self.assertEqual(store.find("V1", 1)["name"], names[1])
+        self.assertEqual(store.read(store.find("V1", 1)), make_pubs("b", 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
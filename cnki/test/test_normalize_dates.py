@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# CREATED DATE: Mon Oct 19 16:41:08 2026
+
+import random
+import unittest
+
+import pandas as pd
+
+import dump
+
+
+def parse_each(dates):
+    return pd.to_datetime(dates.apply(dump.custom_date_parser))
+
+
+class TestNormalizeDates(unittest.TestCase):
+
+    def assert_same(self, values):
+        dates = pd.Series(values, dtype=object)
+        pd.testing.assert_series_equal(dump.normalize_dates(dates), parse_each(dates), check_dtype=False)
+
+    def test_known_formats(self):
+        self.assert_same(
+            [
+                "2025-01-01",
+                "20250101",
+                "199912",
+                "201001",
+                "201212",
+                "N/A",
+                "",
+                None,
+                "2025/01/02",
+                "2012-3-4",
+                "  2025-01-01",
+                "2025-13-01",
+                "2020-02-30",
+                "abc",
+            ]
+        )
+
+    def test_random_samples(self):
+        rng = random.Random(20261019)
+        values = []
+        for _ in range(2000):
+            year, month, day = rng.randint(1950, 2030), rng.randint(1, 12), rng.randint(1, 28)
+            values.append(
+                rng.choice(
+                    [
+                        f"{year}-{month:02d}-{day:02d}",
+                        f"{year}{month:02d}{day:02d}",
+                        f"{year}{month:02d}",
+                        f"{year}/{month}/{day}",
+                        "N/A",
+                    ]
+                )
+            )
+        self.assert_same(values)
+
+    def test_invalid_compact_date_raises(self):
+        # custom_date_parser 对无效的 YYYYMMDD 抛出异常，按列解析也一样
+        dates = pd.Series(["20250101", "20161329"], dtype=object)
+        with self.assertRaises(ValueError):
+            parse_each(dates)
+        with self.assertRaises(ValueError):
+            dump.normalize_dates(dates)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# CREATED DATE: Mon Oct 19 16:55:12 2026
+
+import os
+import tempfile
+import unittest
+
+from dump import OutputIndex
+
+
+class TestOutputIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def touch(self, *parts):
+        path = os.path.join(self.output_dir, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "wb").close()
+        return path
+
+    def test_scan_existing_files(self):
+        a = self.touch("V1", "2025-01", "a.pdf")
+        b = self.touch("V1", "2025-02", "b.pdf")
+        # 分类目录下的文件和更深的目录不计入
+        self.touch("V1", "stray.pdf")
+        self.touch("V1", "2025-01", "sub", "c.pdf")
+
+        index = OutputIndex(self.output_dir)
+        self.assertEqual(len(index), 2)
+        self.assertTrue(index.exists(a))
+        self.assertTrue(index.exists(os.path.join(self.output_dir, "V1", ".", "2025-02", "b.pdf")))
+        self.assertTrue(index.exists(b))
+        self.assertFalse(index.exists(os.path.join(self.output_dir, "V1", "2025-01", "b.pdf")))
+        self.assertFalse(index.exists(os.path.join(self.output_dir, "V2", "2025-01", "a.pdf")))
+
+    def test_missing_output_dir(self):
+        index = OutputIndex(os.path.join(self.output_dir, "missing"))
+        self.assertEqual(len(index), 0)
+
+    def test_ensure_dir_and_add(self):
+        index = OutputIndex(self.output_dir)
+        file_dir = os.path.join(self.output_dir, "V2", "2025-03")
+        index.ensure_dir(file_dir)
+        self.assertTrue(os.path.isdir(file_dir))
+
+        file_path = os.path.join(file_dir, "d.pdf")
+        self.assertFalse(index.exists(file_path))
+        index.add(file_path)
+        self.assertTrue(index.exists(file_path))
+        self.assertEqual(len(index), 1)
+
+        # 已经索引的目录不会再创建
+        os.rmdir(file_dir)
+        index.ensure_dir(file_dir)
+        self.assertFalse(os.path.exists(file_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
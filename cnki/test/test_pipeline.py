@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# CREATED DATE: Mon Oct 19 15:10:42 2026
+
+import threading
+import time
+import unittest
+
+from pipeline import HostRateLimiter, SearchPipeline, TokenBucket
+
+
+class NoLimit:
+    def acquire(self, url):
+        return 0.0
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_rate(self):
+        bucket = TokenBucket(rate=50, burst=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        # 第一个请求用掉初始令牌，之后每个间隔 1/50 秒
+        self.assertGreaterEqual(time.monotonic() - start, 5 / 50 - 0.01)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
+
+    def test_buckets_per_host(self):
+        limiter = HostRateLimiter(rate_per_min=60)
+        self.assertEqual(limiter.acquire("http://a.example/x"), 0.0)
+        self.assertEqual(limiter.acquire("http://b.example/x"), 0.0)
+        self.assertGreater(limiter.acquire("http://a.example/y"), 0.5)
+
+
+class TestSearchPipeline(unittest.TestCase):
+
+    def run_pipeline(self, tasks, num_pages, cached=None, fail=()):
+        cached = cached or {}
+        self.fetched, self.stored = [], []
+        store_threads = set()
+
+        def fetch(task):
+            if task in fail:
+                raise RuntimeError("fetch error")
+            self.fetched.append(task)
+            return f"<html>{task}</html>"
+
+        def store(task, publications):
+            store_threads.add(threading.current_thread().name)
+            self.stored.append((task, publications))
+
+        pipeline = SearchPipeline(
+            NoLimit(),
+            load_cached=lambda task: cached.get(task),
+            fetch=fetch,
+            parse=lambda task, html: [] if task == "empty" else [html],
+            store=store,
+            workers=3,
+        )
+        done = pipeline.run(iter(tasks), "http://a.example/", num_pages)
+        # 保存只在一个线程中进行
+        self.assertLessEqual(len(store_threads), 1)
+        return done
+
+    def test_stop_after_num_pages(self):
+        done = self.run_pipeline([f"t{i}" for i in range(20)], 5)
+        self.assertEqual(done, 5)
+        self.assertEqual(len(self.stored), 5)
+        # 在途的页面足够时不再多发请求
+        self.assertEqual(sorted(task for task, _ in self.stored), sorted(self.fetched))
+
+    def test_cached_pages_skip_fetch(self):
+        done = self.run_pipeline(["c1", "t1", "c2", "t2"], 3, cached={"c1": ["x"], "c2": []})
+        self.assertEqual(done, 3)
+        self.assertNotIn("c1", self.fetched)
+        self.assertNotIn("c2", self.fetched)
+
+    def test_failed_and_empty_pages_not_counted(self):
+        done = self.run_pipeline(["bad", "empty", "t1", "t2"], 2, fail={"bad"})
+        self.assertEqual(done, 2)
+        self.assertEqual(self.fetched, ["empty", "t1", "t2"])
+
+    def test_tasks_exhausted(self):
+        self.assertEqual(self.run_pipeline(["t1", "t2"], 10), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
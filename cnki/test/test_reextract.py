@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# CREATED DATE: Mon Oct 19 15:40:18 2026
+
+import glob
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+import reextract
+import search
+
+ROW = (
+    '<tr><td class="name"><a class="fz14" href="http://kns.example/abstract?v={i}">标题{i}</a></td>'
+    '<td class="author"><a class="KnowledgeNetLink">作者{i}</a></td>'
+    '<td class="source"><a>期刊</a></td><td class="date">2025-01-0{i}</td>'
+    '<td class="operat"><a class="downloadlink" href="http://download.example/{i}">下载</a>'
+    '<a class="icon-collect" data-dbname="CJFQ" data-filename="F{i}"></a></td></tr>'
+)
+
+
+def make_page(ids):
+    return "<table>" + "".join(ROW.format(i=i) for i in ids) + "</table>"
+
+
+class TestReextract(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.html_dir = os.path.join(self.tmp_dir.name, "html")
+        self.config = {"ndjson_dir": os.path.join(self.tmp_dir.name, "ndjson"), "raw_cache_dir": self.html_dir}
+        os.makedirs(self.config["ndjson_dir"])
+
+    def tearDown(self):
+        if "key_index" in self.config:
+            self.config["key_index"].close()
+        self.tmp_dir.cleanup()
+
+    def write_html(self, name, html, compress=False):
+        os.makedirs(self.html_dir, exist_ok=True)
+        opener = gzip.open if compress else open
+        with opener(os.path.join(self.html_dir, name), "wt", encoding="utf-8") as f:
+            f.write(html)
+
+    def read_records(self):
+        records = []
+        for page_file in sorted(glob.glob(os.path.join(self.config["ndjson_dir"], "*.json"))):
+            with open(page_file, "r", encoding="utf-8") as f:
+                records.extend(json.loads(line) for line in f)
+        return records
+
+    def test_parse_page_name(self):
+        self.assertEqual(reextract.parse_page_name("cnki_V1_p12_2025.html"), ("V1", 12))
+        self.assertEqual(reextract.parse_page_name("/x/page_p3_2025.html.gz", "V2"), ("V2", 3))
+        self.assertEqual(reextract.parse_page_name("page.html", "V2"), ("V2", None))
+        self.assertEqual(reextract.parse_page_name("page_p3_2025.html"), (None, 3))
+
+    def test_reextract_pages_already_in_index(self):
+        # 抓取时已经保存过，记录键都在去重索引中
+        html = make_page([1, 2])
+        search.store_page(search.extract_publications("5", html, "V1"), "V1", 1, self.config)
+        self.write_html("cnki_V1_p1_2025-01-01-00-00-00.html", html)
+        self.write_html("cnki_V1_p2_2025-01-01-00-00-01.html.gz", make_page([3]), compress=True)
+
+        num_pages, num_records = reextract.reextract("5", self.config, self.html_dir, jobs=1)
+        self.assertEqual((num_pages, num_records), (2, 3))
+        titles = [record["title"] for record in self.read_records()]
+        # 抓取时的2条和重新抽取的3条
+        self.assertEqual(sorted(titles), ["标题1", "标题1", "标题2", "标题2", "标题3"])
+        self.assertEqual(len(self.config["key_index"]), 3)
+
+        # 再次运行跳过已完成的页面
+        self.assertEqual(reextract.reextract("5", self.config, self.html_dir, jobs=1), (0, 0))
+
+    def test_skip_unknown_names(self):
+        self.write_html("random.html", make_page([1]))
+        self.write_html("page_p2_x.html", make_page([2]))
+        self.assertEqual(reextract.reextract("5", self.config, self.html_dir, jobs=1), (0, 0))
+
+        # 指定分类号后只处理有页码的文件
+        self.assertEqual(reextract.reextract("5", self.config, self.html_dir, jobs=1, default_category="V3"), (1, 1))
+        self.assertEqual([r["category"] for r in self.read_records()], ["V3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
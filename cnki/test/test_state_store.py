@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# CREATED DATE: Mon Oct 19 16:20:37 2026
+
+import json
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+import dump
+from dedup_index import record_key
+from state_store import SqliteStateStore, state_db_path
+from test.test_dump_state import make_pub
+
+
+def make_update(pubs, ndjson):
+    df = pd.DataFrame(pubs)
+    df["date"] = pd.to_datetime(df["date"])
+    df["key"] = [record_key(pub) for pub in pubs]
+    df["ndjson"] = ndjson
+    df["downloaded"] = 1
+    return df.set_index("key", drop=False)
+
+
+class TestSqliteStateStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.tmp_dir.name, "state.json")
+        self.store = SqliteStateStore(state_db_path(self.state_file))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_upsert_rules(self):
+        key1, key2, key3 = (record_key(make_pub(i)) for i in (1, 2, 3))
+        self.assertEqual(self.store.upsert(make_update([make_pub(1), make_pub(2), make_pub(3)], "p1")), (3, 0))
+        self.store.set_downloaded(key1, -1)
+        self.store.set_downloaded(key2, 2000)
+
+        update = make_update([make_pub(i, title="new") for i in (1, 2, 3)], "p2")
+        # 已下载的不变，失败的和待下载的由新记录替换
+        self.assertEqual(self.store.upsert(update), (0, 2))
+        # 较旧的ndjson不覆盖
+        self.assertEqual(self.store.upsert(make_update([make_pub(3, title="old")], "p0")), (0, 0))
+
+        df_pending = self.store.load_pending()
+        self.assertEqual(sorted(df_pending.index), sorted([key2, key3]))
+        self.assertEqual(df_pending.loc[key2, "downloaded"], 1)
+        self.assertEqual(df_pending.loc[key3, "title"], "new")
+        self.assertEqual(df_pending.loc[key3, "date"], pd.Timestamp("2025-01-01"))
+
+    def test_ingested_names(self):
+        self.assertEqual(self.store.ingested_names(), set())
+        self.store.add_ingested(["a.json", "b.json"])
+        self.store.add_ingested(["b.json"])
+        self.assertEqual(self.store.ingested_names(), {"a.json", "b.json"})
+
+
+class TestOpenStateStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.ndjson_dir = os.path.join(self.tmp_dir.name, "ndjson")
+        os.makedirs(self.ndjson_dir)
+        self.state_file = os.path.join(self.tmp_dir.name, "state.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_page(self, name, pubs):
+        with open(os.path.join(self.ndjson_dir, name), "w", encoding="utf-8") as f:
+            for pub in pubs:
+                f.write(json.dumps(pub, ensure_ascii=False) + "\n")
+
+    def test_migrate_and_ingest(self):
+        # 先用ndjson状态文件合并并下载一条
+        self.write_page("cnki_V1_p1_2025-01-01-00-00-00.json", [make_pub(1), make_pub(2)])
+        df_state = dump.process_ndjson_files(dump.load_state(self.state_file), self.ndjson_dir, self.state_file)
+        df_state.loc[record_key(make_pub(1)), "downloaded"] = -1
+        dump.save_state(df_state, self.state_file)
+
+        store = dump.open_state_store(self.state_file)
+        try:
+            self.assertEqual(list(store.load_pending().index), [record_key(make_pub(2))])
+            self.assertEqual(store.ingested_names(), {"cnki_V1_p1_2025-01-01-00-00-00.json"})
+
+            # 导入后只合并新的ndjson
+            self.write_page("cnki_V1_p2_2025-01-02-00-00-00.json", [make_pub(1), make_pub(3)])
+            dump.ingest_ndjson_files(store, self.ndjson_dir)
+            self.assertEqual(
+                sorted(store.load_pending().index), sorted([record_key(make_pub(2)), record_key(make_pub(3))])
+            )
+        finally:
+            store.close()
+
+        # 再次打开不会重复导入
+        store = dump.open_state_store(self.state_file)
+        try:
+            self.assertEqual(len(store.load_pending()), 2)
+            self.assertEqual(len(store.ingested_names()), 2)
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+ZhihuExtractor 的性能基准
+
+在 benchmark/fixtures 下构造的接口响应和页面上运行提取器的每个方法，输出每秒提取的记录数，
+和 baseline.json 中保存的基准比较，任何一项下降超过阈值时以非0状态退出。
+基准和机器相关，基准文件中记录了生成时的机器、Python和JSON实现，和当前环境不同时只提示不比较，
+换机器或者确认性能变化之后用 --update-baseline 重新生成。
+
+在 zhihu 目录下运行:
+    python -m benchmark.bench_extractor
+    python -m benchmark.bench_extractor --threshold 0.2
+    python -m benchmark.bench_extractor --update-baseline
+"""
+import argparse
+import os
+import platform
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+from tools import json_codec, utils
+from media_platform.zhihu.help import ZhihuExtractor
+from model.m_zhihu import ZhihuContent
+
+from .bench_json_codec import FIXTURES_DIR, load_fixture
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def read_page(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def build_cases(extractor: ZhihuExtractor) -> Dict[str, Tuple[Callable[[], List], int]]:
+    """
+    每个提取方法对应 (调用一次的函数, 每次调用提取的记录数)
+    Args:
+        extractor:
+
+    Returns:
+
+    """
+    search_result = json_codec.loads(load_fixture("search_result.json"))
+    comments = json_codec.loads(load_fixture("root_comment.json"))["data"]
+    creator_answers = json_codec.loads(load_fixture("creator_answers.json"))["data"]
+    answer_page = read_page("answer_page.html")
+    article_page = read_page("article_page.html")
+    zvideo_page = read_page("zvideo_page.html")
+    creator_page = read_page("creator_page.html")
+    content = ZhihuContent(content_id="3100000000", content_type="answer")
+
+    funcs: Dict[str, Callable] = {
+        "extract_contents_from_search": lambda: extractor.extract_contents_from_search(search_result),
+        "extract_comments": lambda: extractor.extract_comments(content, comments),
+        "extract_content_list_from_creator": lambda: extractor.extract_content_list_from_creator(creator_answers),
+        "extract_creator": lambda: [extractor.extract_creator("user-3", creator_page)],
+        "extract_answer_content_from_html": lambda: [extractor.extract_answer_content_from_html(answer_page)],
+        "extract_article_content_from_html": lambda: [extractor.extract_article_content_from_html(article_page)],
+        "extract_zvideo_content_from_html": lambda: [extractor.extract_zvideo_content_from_html(zvideo_page)],
+    }
+    cases = {}
+    for name, func in funcs.items():
+        records = [record for record in func() if record]
+        if not records:
+            raise ValueError(f"{name} extracted nothing from the fixtures")
+        cases[name] = (func, len(records))
+    return cases
+
+
+def run_cases(min_seconds: float = 0.2, repeat: int = 7) -> Dict[str, float]:
+    """
+    运行所有用例
+    Args:
+        min_seconds: 每轮至少运行的时间
+        repeat: 轮数，取最快的一轮
+
+    Returns:
+        每个方法每秒提取的记录数
+    """
+    results = {}
+    for name, (func, record_count) in build_cases(ZhihuExtractor()).items():
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        number = max(number, int(number * min_seconds / 0.2))
+        seconds = min(timer.repeat(number=number, repeat=repeat))
+        results[name] = number * record_count / seconds
+    return results
+
+
+def compare_with_baseline(results: Dict[str, float], baseline: Dict[str, float],
+                          threshold: float) -> List[str]:
+    """
+    和基准比较
+    Args:
+        results: 本次结果
+        baseline: 基准结果
+        threshold: 允许下降的比例
+
+    Returns:
+        下降超过阈值的方法
+    """
+    return [
+        name for name, rate in results.items()
+        if name in baseline and rate < baseline[name] * (1 - threshold)
+    ]
+
+
+def environment() -> Dict[str, str]:
+    """影响结果的运行环境：机器、Python解释器和版本、JSON实现"""
+    return {
+        "machine": f"{platform.machine()} {platform.processor() or platform.system()}",
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "json_codec": json_codec.BACKEND,
+    }
+
+
+def environment_mismatch(baseline: Dict[str, Any]) -> List[str]:
+    """
+    基准和当前运行环境不同的项
+    Args:
+        baseline: 基准文件的内容
+
+    Returns:
+        不同的项，例如 "json_codec: orjson != json"
+    """
+    return [
+        f"{key}: {baseline.get(key)} != {value}"
+        for key, value in environment().items()
+        if baseline.get(key) != value
+    ]
+
+
+def load_baseline() -> Dict[str, Any]:
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE, "rb") as f:
+        return json_codec.loads(f.read())
+
+
+def save_baseline(results: Dict[str, float]):
+    baseline = {
+        **environment(),
+        "results": {name: round(rate, 1) for name, rate in results.items()},
+    }
+    with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+        f.write(json_codec.dumps(baseline, pretty=True) + "\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="ZhihuExtractor benchmark")
+    parser.add_argument("--threshold", type=float, default=0.3, help="allowed slowdown ratio against the baseline")
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="minimum run time of each round")
+    parser.add_argument("--update-baseline", action="store_true", help="save the results as the new baseline")
+    args = parser.parse_args()
+
+    results = run_cases(min_seconds=args.min_seconds)
+    baseline_file = load_baseline()
+    baseline = baseline_file.get("results", {})
+    mismatch = environment_mismatch(baseline_file) if baseline else []
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+
+    print(f"{'method':<36}{'records/s':>14}{'baseline':>14}{'change':>10}")
+    for name, rate in results.items():
+        base = baseline.get(name)
+        change = f"{rate / base - 1:+.1%}" if base else "new"
+        flag = "  SLOWER" if name in regressions else ""
+        print(f"{name:<36}{rate:>14,.0f}{base or 0:>14,.0f}{change:>10}{flag}")
+
+    if args.update_baseline:
+        save_baseline(results)
+        print(f"baseline saved to {BASELINE_FILE}")
+        return 0
+    if regressions and mismatch:
+        # 基准是在别的环境中生成的，结果没有可比性，只提示不失败
+        utils.logger.warning(
+            f"[bench_extractor] Baseline was recorded in a different environment ({'; '.join(mismatch)}), "
+            f"skip the regression check. Run with --update-baseline on this machine"
+        )
+        return 0
+    if regressions:
+        utils.logger.error(f"[bench_extractor] Throughput dropped more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
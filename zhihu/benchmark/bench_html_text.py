@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+HTML转文本的性能对比
+
+在搜索结果的回答/文章正文上比较之前两次正则替换的实现和现在的单次替换实现，
+再比较两者在未闭合标签这类异常输入上的耗时。
+在 zhihu 目录下运行: python -m benchmark.bench_html_text
+"""
+import re
+import time
+import timeit
+from typing import List
+
+from tools import json_codec, utils
+
+from .bench_json_codec import load_fixture
+
+
+def legacy_extract_text_from_html(html: str) -> str:
+    """之前的实现，先去掉script/style再去掉其他标签，不解码实体"""
+    if not html:
+        return ""
+    clean_html = re.sub(r'<(script|style)[^>]*>.*?</\1>', '', html, flags=re.DOTALL)
+    return re.sub(r'<[^>]+>', '', clean_html).strip()
+
+
+def answer_html_list() -> List[str]:
+    data = json_codec.loads(load_fixture("search_result.json"))["data"]
+    return [item["object"]["content"] for item in data if item.get("object", {}).get("content")]
+
+
+PATHOLOGICAL_INPUTS = {
+    "unclosed script x2000": "<script>" * 2000 + "a" * 20000,
+    "'<' x20000": "<" * 20000,
+    "'<a ' x20000": "<a " * 20000,
+}
+
+
+def main(number: int = 200):
+    html_list = answer_html_list()
+    total_kib = sum(len(html) for html in html_list) / 1024
+    print(f"{len(html_list)} answers, {total_kib:.1f} KiB")
+    print(f"{'implementation':<32}{'us/answer':>12}")
+    for func in (legacy_extract_text_from_html, utils.extract_text_from_html):
+        seconds = min(timeit.repeat(lambda: [func(html) for html in html_list], number=number, repeat=5))
+        print(f"{func.__name__:<32}{seconds / number / len(html_list) * 1e6:>12.1f}")
+
+    print(f"\n{'input':<24}{'legacy s':>12}{'current s':>12}")
+    for name, html in PATHOLOGICAL_INPUTS.items():
+        costs = []
+        for func in (legacy_extract_text_from_html, utils.extract_text_from_html):
+            start = time.perf_counter()
+            func(html)
+            costs.append(time.perf_counter() - start)
+        print(f"{name:<24}{costs[0]:>12.3f}{costs[1]:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
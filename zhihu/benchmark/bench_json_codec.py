@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+JSON编解码的性能对比
+
+在按知乎搜索和评论接口的结构构造的匿名数据(benchmark/fixtures)上比较各个可用实现的解码速度，
+以及JSON存储写文件时的编码速度。
+在 zhihu 目录下运行: python -m benchmark.bench_json_codec
+"""
+import os
+import timeit
+from typing import Dict, List
+
+from tools import json_codec
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+PAYLOADS = ["search_result.json", "root_comment.json"]
+
+
+def load_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def bench(func, number: int) -> float:
+    """返回每次调用的平均耗时，单位微秒，取5轮中最快的一轮"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main(number: int = 200):
+    print(f"available codecs: {', '.join(json_codec.CODECS)}, default: {json_codec.BACKEND}")
+    for name in PAYLOADS:
+        raw = load_fixture(name)
+        data = json_codec.loads(raw)
+        # JSON存储每次写入的是记录列表
+        records: List[Dict] = data["data"]
+        print(f"\n{name} ({len(raw) / 1024:.1f} KiB, {len(records)} records)")
+        print(f"{'codec':<10}{'loads us':>12}{'dumps us':>12}{'speedup':>10}")
+        baseline = None
+        for codec_name, (loads, dumps) in reversed(list(json_codec.CODECS.items())):
+            loads_us = bench(lambda: loads(raw), number)
+            dumps_us = bench(lambda: dumps(records, pretty=True), number)
+            if baseline is None:
+                baseline = loads_us + dumps_us
+            print(f"{codec_name:<10}{loads_us:>12.1f}{dumps_us:>12.1f}{baseline / (loads_us + dumps_us):>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+知乎记录类型的性能对比
+
+按提取器的用法(创建空记录、逐个字段赋值、转换成dict保存)比较 __slots__ 记录和同样字段的pydantic模型，
+同时比较保存大量评论记录时占用的内存。
+在 zhihu 目录下运行: python -m benchmark.bench_models
+"""
+import timeit
+import tracemalloc
+from typing import Any, Dict, List, Type
+
+from pydantic import BaseModel, Field, create_model
+
+from model.m_zhihu import CompactRecord, ZhihuComment, ZhihuContent, ZhihuCreator
+from tools import json_codec
+
+from .bench_json_codec import load_fixture
+
+
+def make_pydantic_model(record_class: Type[CompactRecord]) -> Type[BaseModel]:
+    """用记录的字段声明生成等价的pydantic模型，作为对比的基准"""
+    fields = {
+        name: (type(default), Field(default=default, description=description))
+        for name, default, description in record_class.FIELDS
+    }
+    return create_model(f"Pydantic{record_class.__name__}", **fields)
+
+
+def comment_values() -> List[Dict[str, Any]]:
+    """从评论接口的响应中取出每条评论要赋值的字段"""
+    comments = json_codec.loads(load_fixture("root_comment.json"))["data"]
+    return [
+        {
+            "comment_id": comment["id"],
+            "content": comment["content"],
+            "publish_time": comment["created_time"],
+            "like_count": comment["like_count"],
+            "sub_comment_count": comment["child_comment_count"],
+            "user_nickname": comment["author"]["name"],
+            "user_avatar": comment["author"]["avatar_url"],
+        }
+        for comment in comments
+    ]
+
+
+def build(model_class, values: List[Dict[str, Any]]) -> List[Any]:
+    records = []
+    for item in values:
+        record = model_class()
+        for name, value in item.items():
+            setattr(record, name, value)
+        records.append(record)
+    return records
+
+
+def measure_memory(model_class, values: List[Dict[str, Any]], copies: int) -> float:
+    """保存 copies 份评论记录占用的内存，单位 MiB"""
+    tracemalloc.start()
+    records = build(model_class, values * copies)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return size / 1024 / 1024
+
+
+def main(number: int = 500, copies: int = 5000):
+    values = comment_values()
+    print(f"{'model':<28}{'build+dump rec/s':>18}{'speedup':>10}{'memory MiB':>12}")
+    for record_class in (ZhihuComment, ZhihuContent, ZhihuCreator):
+        pydantic_class = make_pydantic_model(record_class)
+        field_names = set(record_class.field_names())
+        class_values = [{k: v for k, v in item.items() if k in field_names} for item in values]
+        baseline = None
+        for name, model_class, dump in (
+                (pydantic_class.__name__, pydantic_class, pydantic_class.model_dump),
+                (record_class.__name__, record_class, record_class.to_dict),
+        ):
+            seconds = min(timeit.repeat(
+                lambda: [dump(record) for record in build(model_class, class_values)], number=number, repeat=5
+            ))
+            rate = number * len(class_values) / seconds
+            baseline = baseline or rate
+            memory = measure_memory(model_class, class_values, copies)
+            print(f"{name:<28}{rate:>18,.0f}{rate / baseline:>9.2f}x{memory:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
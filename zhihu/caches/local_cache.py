@@ -88,8 +88,10 @@ class ExpiringLocalCache(AbstractCache):
         根据过期时间清理缓存
         :return:
         """
-        for key, (value, expire_time) in self._cache_container.items():
-            if expire_time < time.time():
+        now = time.time()
+        # 遍历副本，删除键时不能直接迭代字典
+        for key, (value, expire_time) in list(self._cache_container.items()):
+            if expire_time < now:
                 del self._cache_container[key]
 
     async def _start_clear_cron(self):
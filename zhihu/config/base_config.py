@@ -1,6 +1,6 @@
 # 基础配置
 PLATFORM = "zhihu"
-KEYWORDS = "教育"  # 关键词搜索配置，每次填写一个关键词。
+KEYWORDS = "教育"  # 关键词搜索配置，多个关键词用英文逗号分隔，在同一个进程中依次搜索。
 
 LOGIN_TYPE = "cookie"  # qrcode or phone or cookie
 COOKIES = "Hm_lpvt_98beee57fd2ef70ccdd5ca52b9740c49=1742824068; Hm_lvt_98beee57fd2ef70ccdd5ca52b9740c49=1742549723,1742788885; tst=r; BEC=5ee33e0856ed13c879689106c041a08d; JOID=VFwRBUsqGZ9ZbeA8QCtdz7pTatxbXX6uaAmmUCZcVPhvCoNfCUt5ej5p4j5EE34148r_nwsxJhXVlL7WmFy1UzQ=; SESSIONID=ug37bDldpOg4aeaIPSEL9BDAA8qgvH7cEbno8OWoCtP; osd=VVkXAkorHJlebOE5Rixczr9Vbd1aWHipaQijViFdVf1pDYJeDE1-ez9s5DlFEnsz5Mv-mg02JxTQkrnXmVmzVDU=; HMACCOUNT=DE6C26B054BF0196; __zse_ck=004_6kPP9Mr0//z/LZbhHrSPxfOI6DlvrBTXNe0trehI=lirSh9ciNe=NPSMIRW27ECvfX5mSduJr3pLp1RFHraQ/oHXvdyge/Kfyzud1pkaec3fnvg/H1n0PNy0IX9VRggz-q7exWxt94u29YQ6lQvYI5t5OscNSugQFco6P3mVxbNl3Oaw5RQBTMC3JGR9VY49WNGx8KVXQuQS/GRt7PYx/psqKISw1zfz87/po754ekYmw1bTitTPHNEOP+mr7kCGu; __utma=51854390.1175779376.1737618520.1742549745.1742788745.3; __utmc=51854390; __utmv=51854390.100-1|2=registration_date=20150429=1^3=entry_date=20150429=1; __utmz=51854390.1742549745.2.2.utmcsr=google|utmccn=(organic)|utmcmd=organic|utmctr=(not%20provided); q_c1=749d7a08122d49b9a28286a706f16d40|1742788812000|1669091382000; _xsrf=TXJUBXHREeQ148UPCmY3flTs78ICROxy; q_c1=749d7a08122d49b9a28286a706f16d40|1732527618000|1669091382000; _zap=02958876-2b56-4c4e-bce4-4d3e1cebc000; d_c0=\"AGBRHPAguRSPTvIkVAz4oLXKaImiHVXnj6s=|1648801158\""
@@ -20,6 +20,26 @@ ENABLE_IP_PROXY = False
 # 单位秒
 CRAWLER_MAX_SLEEP_SEC = 5
 
+# httpx连接池配置，同一个客户端复用连接
+HTTPX_MAX_CONNECTIONS = 10
+HTTPX_MAX_KEEPALIVE_CONNECTIONS = 5
+# 空闲连接保持时间，单位秒
+HTTPX_KEEPALIVE_EXPIRY = 30
+
+# 是否开启HTTP/2，需要安装 h2 (pip install httpx[http2])
+ENABLE_HTTP2 = False
+
+# 响应缓存类型: memory(本次运行内有效) 或 redis(跨运行有效)，设置为 None 关闭缓存
+RESPONSE_CACHE_TYPE = "memory"
+
+# 各接口的响应缓存时间(秒)，按URI前缀匹配，没有列出的接口不缓存
+RESPONSE_CACHE_TTL = {
+    "/people/": 24 * 3600,  # 创作者主页
+    "/question/": 6 * 3600,  # 回答详情页
+    "/p/": 6 * 3600,  # 文章详情页
+    "/zvideo/": 6 * 3600,  # 视频详情页
+}
+
 # 代理IP池数量
 IP_PROXY_POOL_COUNT = 10
 
@@ -36,18 +56,76 @@ SAVE_LOGIN_STATE = True
 # 数据保存类型选项配置,支持三种类型：csv、db、json, 最好保存到DB，有排重的功能。
 SAVE_DATA_OPTION = "csv"  # csv or db or json
 
+# 登录并获取搜索页cookies之后把cookies保存到本地，下次启动时先用httpx检查登录态，有效就不再启动浏览器
+ENABLE_SESSION_CACHE = True
+SESSION_COOKIE_FILE = "browser_data/zhihu_session.json"
+
 # 用户浏览器缓存的浏览器文件配置
 USER_DATA_DIR = "%s_user_data_dir"  # %s will be replaced by platform name
 
+# 日志级别，接口响应和保存的数据只在DEBUG级别输出
+LOG_LEVEL = "INFO"
+# DEBUG级别下接口响应和保存的数据每N条输出一条，1表示全部输出
+LOG_PAYLOAD_SAMPLE_RATE = 100
+# 日志通过队列在单独的线程中格式化和输出，不阻塞事件循环
+ENABLE_QUEUE_LOGGING = True
+
+# 按接口统计请求延迟、状态码、接收字节数和重试次数，爬取结束时在日志中输出汇总
+# 开启 ENABLE_METRICS_EXPORT 后定期导出到 METRICS_FILE，METRICS_FORMAT 为 prometheus 时可以配合 node_exporter 的 textfile collector 采集
+ENABLE_METRICS_EXPORT = False
+METRICS_FORMAT = "prometheus"  # prometheus or json
+METRICS_FILE = "data/zhihu/metrics.prom"
+METRICS_EXPORT_INTERVAL = 60  # 秒
+
 # 爬取开始页数 默认从第一页开始
 START_PAGE = 1
 
 # 爬取数量控制
 CRAWLER_MAX_NOTES_COUNT = 500
 
-# 并发爬虫数量控制
+# 是否记录爬取进度检查点，中断后重新运行从中断的位置继续(搜索页、评论分页、创作者回答、详情)
+# 一次爬取完整结束后检查点会被清除，每种爬取模式(search/detail/creator)单独一个文件，例如 checkpoint_search.json
+ENABLE_CHECKPOINT = True
+CHECKPOINT_FILE = "data/zhihu/checkpoint.json"
+
+# 检查点两次写文件的最小间隔(秒)，结束或中断时会写入最后的状态
+CHECKPOINT_SAVE_INTERVAL = 5
+
+# 搜索模式下按关键词分开保存数据文件(csv/json)，文件名中带上来源关键词
+PARTITION_OUTPUT_BY_KEYWORD = True
+
+# 搜索结果预取的页数，处理当前页时在后台提前请求后面几页，0表示不预取
+SEARCH_PREFETCH_DEPTH = 1
+
+# 并发爬虫数量控制，所有请求(搜索、详情、创作者、评论)共用
 MAX_CONCURRENCY_NUM = 1
 
+# 全局请求频率限制，每秒最大请求数，0表示不限制
+MAX_REQUESTS_PER_SEC = 2
+# 允许的最大突发请求数
+MAX_REQUESTS_BURST = 1
+
+# 请求失败重试，只重试5xx、429和网络超时之类的错误，403和404不重试
+# 按指数退避加随机抖动等待，响应头带 Retry-After 时按它等待，超过最大等待时间时不再重试
+REQUEST_RETRY_TIMES = 3  # 最多请求次数，包含第一次
+REQUEST_RETRY_BASE_DELAY = 1  # 秒
+REQUEST_RETRY_MAX_DELAY = 30  # 秒
+
+# 熔断，某个接口最近的请求中失败比例过高时暂停调度器，所有请求等待一段时间后再继续
+ENABLE_CIRCUIT_BREAKER = True
+CIRCUIT_BREAKER_WINDOW = 20  # 统计最近多少次请求
+CIRCUIT_BREAKER_MIN_REQUESTS = 10  # 至少有多少次请求才判断
+CIRCUIT_BREAKER_FAILURE_RATIO = 0.5
+CIRCUIT_BREAKER_COOLDOWN = 60  # 暂停秒数
+
+# 各类请求的优先级，数值越小越先执行
+CRAWL_TASK_PRIORITY = {
+    "search": 0,
+    "detail": 1,
+    "creator": 2,
+    "comment": 3,
+}
+
 # 是否开启爬图片模式, 默认不开启爬图片
 ENABLE_GET_IMAGES = False
 
@@ -59,6 +137,28 @@ CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES = 5
 
 ENABLE_GET_SUB_COMMENTS = False
 
+# 增量抓取评论: 记录每个内容上次抓取时的评论数和最新评论ID，评论数没变的内容跳过，
+# 变了的按时间倒序只抓新的一级评论
+ENABLE_INCREMENTAL_COMMENTS = True
+SEEN_CONTENT_DB = "data/zhihu/seen_contents.sqlite"
+
+# 指定知乎需要爬取的帖子链接列表(CRAWLER_TYPE = "detail")
+ZHIHU_SPECIFIED_ID_LIST = [
+    # "https://www.zhihu.com/question/826896610/answer/4885821440",
+    # "https://zhuanlan.zhihu.com/p/673461588",
+    # "https://www.zhihu.com/zvideo/1539542068422144000",
+]
+
+# 指定知乎创作者主页链接列表(CRAWLER_TYPE = "creator")
+ZHIHU_CREATOR_URL_LIST = [
+    # "https://www.zhihu.com/people/yd1234567",
+]
+
+# 创作者模式抓取的内容类型，多种类型同时翻页抓取: answer 回答, article 文章, zvideo 视频
+CREATOR_CONTENT_TYPES = ["answer", "article", "zvideo"]
+# 同时抓取的创作者数量，请求仍受 MAX_CONCURRENCY_NUM 和 MAX_REQUESTS_PER_SEC 限制
+MAX_CONCURRENT_CREATORS = 3
+
 # 自定义词语及其分组
 # 添加规则：xx:yy 其中xx为自定义添加的词组，yy为将xx该词组分到的组名。
 CUSTOM_WORDS = {
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import config
+from model.m_zhihu import ZhihuContent
+from tools import utils
+
+
+class CrawlCheckpoint:
+    """
+    爬取进度检查点
+
+    记录每个关键词的搜索页游标、每个内容的评论分页偏移、每个创作者的回答偏移和已完成的详情链接，
+    原子地写入JSON文件，重新运行时从中断的位置继续，不再重复请求已完成的部分。
+    每种爬取模式使用单独的文件，评论抓完的内容从文件中删除，
+    更新后最多每 save_interval 秒写一次文件，结束时调用 flush 写入最后的状态。
+    """
+
+    def __init__(self, file_path: Optional[str] = None, save_interval: float = 0):
+        """
+        Args:
+            file_path: 检查点文件路径，为None时只在内存中记录
+            save_interval: 两次写文件的最小间隔(秒)，0表示每次更新都写
+        """
+        self.file_path = file_path
+        self.save_interval = save_interval
+        self._dirty = False
+        self._last_save = 0.0
+        # 本次运行中评论已经抓完的内容，不写入文件
+        self._comments_done: Set[str] = set()
+        self._state: Dict[str, Dict[str, Any]] = {
+            "search": {},
+            "comments": {},
+            "creators": {},
+            "details": {},
+        }
+        if file_path and os.path.exists(file_path):
+            with open(file_path, "r", encoding="utf-8") as f:
+                self._state.update(json.load(f))
+            utils.logger.info(f"[CrawlCheckpoint] Resume from checkpoint {file_path}")
+
+    @classmethod
+    def from_config(cls, crawler_type: Optional[str] = None) -> "CrawlCheckpoint":
+        """
+        根据配置创建检查点，文件名带上爬取模式，例如 checkpoint_search.json
+        Args:
+            crawler_type: 爬取模式，默认 config.CRAWLER_TYPE
+
+        Returns:
+
+        """
+        if not config.ENABLE_CHECKPOINT:
+            return cls()
+        root, ext = os.path.splitext(config.CHECKPOINT_FILE)
+        return cls(f"{root}_{crawler_type or config.CRAWLER_TYPE}{ext}", config.CHECKPOINT_SAVE_INTERVAL)
+
+    def save(self):
+        """
+        记录状态有更新，距离上次写文件超过 save_interval 时写入
+        Returns:
+
+        """
+        if not self.file_path:
+            return
+        self._dirty = True
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        把还没写入的更新写入检查点文件，先写临时文件再替换，中断时不会留下半个文件
+        Returns:
+
+        """
+        if not self.file_path or not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        tmp_path = self.file_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.file_path)
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def clear(self):
+        """
+        一次爬取完整结束后清除检查点，下次运行重新开始
+        Returns:
+
+        """
+        for value in self._state.values():
+            value.clear()
+        self._comments_done.clear()
+        self._dirty = False
+        if self.file_path and os.path.exists(self.file_path):
+            os.remove(self.file_path)
+            utils.logger.info(f"[CrawlCheckpoint] Crawl finished, checkpoint {self.file_path} removed")
+
+    # 搜索
+    def get_search_page(self, keyword: str) -> int:
+        """关键词下一个要抓取的搜索页，没有记录时返回0"""
+        return self._state["search"].get(keyword, {}).get("next_page", 0)
+
+    def is_search_done(self, keyword: str) -> bool:
+        """关键词的搜索结果是否已经抓到最后一页"""
+        return self._state["search"].get(keyword, {}).get("done", False)
+
+    def set_search_page(self, keyword: str, next_page: int, done: bool = False):
+        self._state["search"][keyword] = {"next_page": next_page, "done": done}
+        self.save()
+
+    # 评论
+    def add_pending_contents(self, contents: List[ZhihuContent]):
+        """
+        记录等待抓取评论的内容，中断后可以从检查点恢复这些内容的评论抓取
+        Args:
+            contents: 内容列表
+
+        Returns:
+
+        """
+        for content in contents:
+            if content.content_id in self._comments_done:
+                continue
+            entry = self._state["comments"].setdefault(content.content_id, {"offset": ""})
+            # 抓评论只需要内容ID、类型、评论数和来源关键词，正文不写入检查点
+            entry["content"] = content.to_dict(
+                include={"content_id", "content_type", "comment_count", "source_keyword"}
+            )
+        self.save()
+
+    def pending_contents(self) -> List[ZhihuContent]:
+        """评论还没有抓完的内容"""
+        return [ZhihuContent(**entry["content"]) for entry in self._state["comments"].values() if entry.get("content")]
+
+    def get_comment_offset(self, content_id: str) -> str:
+        return self._state["comments"].get(content_id, {}).get("offset", "")
+
+    def is_comments_done(self, content_id: str) -> bool:
+        return content_id in self._comments_done
+
+    def set_comment_offset(self, content_id: str, offset: str):
+        entry = self._state["comments"].setdefault(content_id, {"offset": ""})
+        entry["offset"] = offset
+        self.save()
+
+    def set_comments_done(self, content_id: str):
+        # 抓完之后从文件中删除，检查点的大小只和还没抓完的内容数量有关
+        self._state["comments"].pop(content_id, None)
+        self._comments_done.add(content_id)
+        self.save()
+
+    # 创作者，回答、文章、视频分别记录偏移
+    def get_creator_offset(self, url_token: str, content_type: str = "answer") -> int:
+        return self._state["creators"].get(url_token, {}).get(f"{content_type}_offset", 0)
+
+    def is_creator_done(self, url_token: str) -> bool:
+        return self._state["creators"].get(url_token, {}).get("done", False)
+
+    def set_creator_offset(self, url_token: str, offset: int, content_type: str = "answer"):
+        entry = self._state["creators"].setdefault(url_token, {"done": False})
+        entry[f"{content_type}_offset"] = offset
+        self.save()
+
+    def set_creator_done(self, url_token: str):
+        self._state["creators"].setdefault(url_token, {})["done"] = True
+        self.save()
+
+    # 详情
+    def is_detail_done(self, url: str) -> bool:
+        return self._state["details"].get(url, False)
+
+    def set_detail_done(self, url: str):
+        self._state["details"][url] = True
+        self.save()
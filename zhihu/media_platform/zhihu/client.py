@@ -1,23 +1,90 @@
 # -*- coding: utf-8 -*-
 import asyncio
-import json
+import importlib.util
+import time
+from email.utils import parsedate_to_datetime
 from typing import Any, Callable, Dict, List, Optional, Union
-from urllib.parse import urlencode
+from urllib.parse import urlencode, urlsplit
 
 import httpx
 from httpx import Response
 from playwright.async_api import BrowserContext, Page
-from tenacity import retry, stop_after_attempt, wait_fixed
+from tenacity import (RetryCallState, retry, retry_if_exception,
+                      stop_after_attempt, wait_random_exponential)
 
 import config
 from base.base_crawler import AbstractApiClient
+from caches.abs_cache import AbstractCache
+from caches.cache_factory import CacheFactory
 from constant import zhihu as zhihu_constant
 from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
-from tools import utils
+from tools import json_codec, utils
 
-from .exception import DataFetchError, ForbiddenError
+from .exception import DataFetchError, ForbiddenError, ServerBusyError
 from .field import SearchSort, SearchTime, SearchType
+from .checkpoint import CrawlCheckpoint
 from .help import ZhihuExtractor, sign
+from .metrics import RequestMetrics, classify_route
+from .scheduler import CrawlScheduler, classify_uri
+from .seen_index import SeenContentIndex, is_newer_comment
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析响应头 Retry-After
+    Args:
+        value: 秒数或者HTTP日期
+
+    Returns:
+        需要等待的秒数，无法解析时返回None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _is_retryable_error(exc: BaseException) -> bool:
+    """只重试5xx、429和网络错误，Retry-After 超过最大等待时间时不再重试"""
+    if isinstance(exc, ServerBusyError):
+        return exc.retry_after is None or exc.retry_after <= config.REQUEST_RETRY_MAX_DELAY
+    return isinstance(exc, httpx.TransportError)
+
+
+_request_backoff = wait_random_exponential(multiplier=config.REQUEST_RETRY_BASE_DELAY,
+                                           max=config.REQUEST_RETRY_MAX_DELAY)
+
+
+def _request_retry_wait(retry_state: RetryCallState) -> float:
+    """服务端指定了 Retry-After 时按它等待，否则指数退避加随机抖动"""
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, ServerBusyError) and exc.retry_after is not None:
+        return exc.retry_after
+    return _request_backoff(retry_state)
+
+
+def _raise_request_error(retry_state: RetryCallState):
+    """
+    重试次数用完后抛出最后一次的异常，而不是 tenacity 的 RetryError，
+    网络错误转成 DataFetchError，调用方按 DataFetchError 统一处理
+    """
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, httpx.TransportError):
+        raise DataFetchError(f"{type(exc).__name__}: {exc}") from exc
+    raise exc
+
+
+def _record_request_retry(retry_state: RetryCallState):
+    """request重试之前的回调，按接口记录重试次数"""
+    client, *args = retry_state.args
+    url = retry_state.kwargs.get("url") or (args[1] if len(args) > 1 else "")
+    client.metrics.record_retry(classify_route(url))
 
 
 class ZhiHuClient(AbstractApiClient):
@@ -27,14 +94,154 @@ class ZhiHuClient(AbstractApiClient):
             proxies=None,
             *,
             headers: Dict[str, str],
-            playwright_page: Page,
+            playwright_page: Optional[Page] = None,
             cookie_dict: Dict[str, str],
+            scheduler: Optional[CrawlScheduler] = None,
     ):
         self.proxies = proxies
         self.timeout = timeout
         self.default_headers = headers
         self.cookie_dict = cookie_dict
         self._extractor = ZhihuExtractor()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._response_cache: Optional[AbstractCache] = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # close 已经执行过(统计已输出)，重新创建客户端后复位
+        self._closed = False
+        # 所有请求经过同一个调度器，共用并发和请求频率限制
+        self.scheduler = scheduler or CrawlScheduler.from_config()
+        self.metrics = RequestMetrics.from_config()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        获取长连接的httpx客户端，第一次使用或关闭后重新创建
+        Returns:
+
+        """
+        if self._client is None or self._client.is_closed:
+            http2 = config.ENABLE_HTTP2
+            if http2 and importlib.util.find_spec("h2") is None:
+                utils.logger.warning("[ZhiHuClient._get_client] ENABLE_HTTP2 需要安装 h2 (pip install httpx[http2])，使用HTTP/1.1")
+                http2 = False
+            self._client = httpx.AsyncClient(
+                proxies=self.proxies,
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=config.HTTPX_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.HTTPX_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=config.HTTPX_KEEPALIVE_EXPIRY,
+                ),
+            )
+            self._closed = False
+        return self._client
+
+    async def close(self):
+        """
+        关闭httpx客户端，释放连接池，并输出一次统计，重复调用时直接返回
+        Returns:
+
+        """
+        if self._closed:
+            return
+        if self._client is not None:
+            if not self._client.is_closed:
+                await self._client.aclose()
+                utils.logger.info("[ZhiHuClient.close] Httpx client closed ...")
+            self._client = None
+        self._closed = True
+        self.scheduler.log_stats()
+        self.metrics.log_summary()
+        await self.metrics.flush()
+        if self.cache_hits or self.cache_misses:
+            utils.logger.info(
+                f"[ZhiHuClient.close] Response cache hits: {self.cache_hits}, misses: {self.cache_misses}, "
+                f"hit rate: {self.cache_hit_rate():.2%}"
+            )
+
+    def cache_hit_rate(self) -> float:
+        """
+        响应缓存命中率
+        Returns:
+
+        """
+        total = self.cache_hits + self.cache_misses
+        return self.cache_hits / total if total else 0.0
+
+    @staticmethod
+    def _response_cache_ttl(uri: str) -> int:
+        """
+        按URI前缀查找接口的缓存时间，最长的前缀优先，没有配置的接口返回0(不缓存)
+        Args:
+            uri: 请求路由，不含参数
+
+        Returns:
+
+        """
+        if not config.RESPONSE_CACHE_TYPE:
+            return 0
+        prefixes = [prefix for prefix in config.RESPONSE_CACHE_TTL if uri.startswith(prefix)]
+        if not prefixes:
+            return 0
+        return config.RESPONSE_CACHE_TTL[max(prefixes, key=len)]
+
+    @staticmethod
+    def _response_cache_key(uri: str, params: Optional[Dict], return_response: bool) -> str:
+        """
+        响应缓存的键，参数按名称排序，HTML和JSON响应分开缓存
+        Args:
+            uri: 请求路由
+            params: 请求参数
+            return_response: 是否返回原始响应文本
+
+        Returns:
+
+        """
+        key = f"zhihu:response:{'html' if return_response else 'json'}:{uri.rstrip('/')}"
+        if params:
+            key += "?" + urlencode(sorted((k, str(v)) for k, v in params.items()))
+        return key
+
+    def _get_response_cache(self) -> AbstractCache:
+        """
+        获取响应缓存，本地缓存需要在事件循环中创建
+        Returns:
+
+        """
+        if self._response_cache is None:
+            self._response_cache = CacheFactory.create_cache(config.RESPONSE_CACHE_TYPE)
+        return self._response_cache
+
+    async def _cache_get(self, key: str) -> Any:
+        """
+        读取响应缓存，redis 客户端是同步调用，放到线程中执行，避免阻塞事件循环
+        Args:
+            key: 缓存键
+
+        Returns:
+
+        """
+        cache = self._get_response_cache()
+        if config.RESPONSE_CACHE_TYPE == "redis":
+            return await asyncio.to_thread(cache.get, key)
+        return cache.get(key)
+
+    async def _cache_set(self, key: str, value: Any, expire_time: int):
+        """
+        写入响应缓存，redis 同样在线程中执行
+        Args:
+            key: 缓存键
+            value: 响应
+            expire_time: 缓存时间(秒)
+
+        Returns:
+
+        """
+        cache = self._get_response_cache()
+        if config.RESPONSE_CACHE_TYPE == "redis":
+            await asyncio.to_thread(cache.set, key, value, expire_time)
+        else:
+            cache.set(key, value, expire_time)
 
     async def _pre_headers(self, url: str) -> Dict:
         """
@@ -53,10 +260,15 @@ class ZhiHuClient(AbstractApiClient):
         headers['x-zse-96'] = sign_res["x-zse-96"]
         return headers
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
+    @retry(stop=stop_after_attempt(config.REQUEST_RETRY_TIMES), wait=_request_retry_wait,
+           retry=retry_if_exception(_is_retryable_error), before_sleep=_record_request_retry,
+           retry_error_callback=_raise_request_error)
     async def request(self, method, url, **kwargs) -> Union[str, Any]:
         """
         封装httpx的公共请求方法，对请求响应做一些处理
+
+        每次尝试(包括重试)都单独占用调度器的名额和令牌，退避等待期间不占名额，
+        熔断和 Retry-After 的暂停对重试同样生效
         Args:
             method: 请求方法
             url: 请求的URL
@@ -68,30 +280,47 @@ class ZhiHuClient(AbstractApiClient):
         # return response.text
         return_response = kwargs.pop('return_response', False)
 
-        async with httpx.AsyncClient(proxies=self.proxies, ) as client:
-            response = await client.request(
-                method, url, timeout=self.timeout,
-                **kwargs
-            )
-
-        if response.status_code != 200:
+        route = classify_route(url)
+        try:
+            async with self.scheduler.slot(classify_uri(urlsplit(url).path)):
+                start = time.perf_counter()
+                response = await self._get_client().request(
+                    method, url, timeout=self.timeout,
+                    **kwargs
+                )
+        except httpx.HTTPError as e:
+            # 没有拿到响应的请求按异常类型记录
+            self.metrics.observe(route, type(e).__name__, time.perf_counter() - start)
+            self.scheduler.record_result(route, ok=False)
+            raise
+        self.metrics.observe(route, response.status_code, time.perf_counter() - start, len(response.content))
+        status_code = response.status_code
+        self.scheduler.record_result(route, ok=status_code < 500 and status_code not in (403, 429))
+
+        if status_code != 200:
             utils.logger.error(f"[ZhiHuClient.request] Requset Url: {url}, Request error: {response.text}")
-            if response.status_code == 403:
+            if status_code == 403:
                 raise ForbiddenError(response.text)
-            elif response.status_code == 404: # 如果一个content没有评论也是404
+            elif status_code == 404: # 如果一个content没有评论也是404
                 return {}
+            elif status_code == 429 or status_code >= 500:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after:
+                    # 服务端要求等待时所有请求一起等
+                    self.scheduler.pause(retry_after)
+                raise ServerBusyError(response.text, status_code, retry_after)
 
             raise DataFetchError(response.text)
 
         if return_response:
             return response.text
         try:
-            data: Dict = response.json()
+            data: Dict = json_codec.loads(response.content)
             if data.get("error"):
                 utils.logger.error(f"[ZhiHuClient.request] Request error: {data}")
                 raise DataFetchError(data.get("error", {}).get("message"))
             return data
-        except json.JSONDecodeError:
+        except ValueError:
             utils.logger.error(f"[ZhiHuClient.request] Request error: {response.text}")
             raise DataFetchError(response.text)
 
@@ -106,6 +335,15 @@ class ZhiHuClient(AbstractApiClient):
         Returns:
 
         """
+        cache_ttl = self._response_cache_ttl(uri)
+        if cache_ttl > 0:
+            cache_key = self._response_cache_key(uri, params, kwargs.get("return_response", False))
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+            self.cache_misses += 1
+
         final_uri = uri
         if isinstance(params, dict):
             final_uri += '?' + urlencode(params)
@@ -115,7 +353,11 @@ class ZhiHuClient(AbstractApiClient):
             if "/p/" not in uri
             else zhihu_constant.ZHIHU_ZHUANLAN_URL
         )
-        return await self.request(method="GET", url=base_url + final_uri, headers=headers, **kwargs)
+        res = await self.request(method="GET", url=base_url + final_uri, headers=headers, **kwargs)
+        # 404之类的空响应不缓存
+        if cache_ttl > 0 and res:
+            await self._cache_set(cache_key, res, cache_ttl)
+        return res
 
     async def pong(self) -> bool:
         """
@@ -199,7 +441,7 @@ class ZhiHuClient(AbstractApiClient):
             "vertical": note_type.value,
         }
         search_res = await self.get(uri, params)
-        utils.logger.info(f"[ZhiHuClient.get_note_by_keyword] Search result: {search_res}")
+        utils.log_payload("[ZhiHuClient.get_note_by_keyword] Search result: %s", search_res)
         return self._extractor.extract_contents_from_search(search_res)
 
     async def get_root_comments(self, content_id: str, content_type: str, offset: str = "", limit: int = 10,
@@ -249,23 +491,41 @@ class ZhiHuClient(AbstractApiClient):
         return await self.get(uri, params)
 
     async def get_note_all_comments(self, content: ZhihuContent, crawl_interval: float = 1.0,
-                                    callback: Optional[Callable] = None) -> List[ZhihuComment]:
+                                    callback: Optional[Callable] = None,
+                                    checkpoint: Optional[CrawlCheckpoint] = None,
+                                    seen_index: Optional[SeenContentIndex] = None) -> List[ZhihuComment]:
         """
         获取指定帖子下的所有一级评论，该方法会一直查找一个帖子下的所有评论信息
         Args:
             content: 内容详情对象(问题｜文章｜视频)
             crawl_interval: 爬取一次笔记的延迟单位（秒）
             callback: 一次笔记爬取结束后
+            checkpoint: 检查点，从上次中断的分页继续，每页抓完后记录偏移
+            seen_index: 已抓取内容索引，评论数没变的内容跳过，变了的只抓比上次新的一级评论
+                (已有一级评论下新增的子评论不会再抓)
 
         Returns:
 
         """
         result: List[ZhihuComment] = []
+        if checkpoint and checkpoint.is_comments_done(content.content_id):
+            return result
+
+        seen = seen_index.get(content.content_id) if seen_index else None
+        if seen and seen[0] == content.comment_count:
+            utils.logger.info(f"[ZhiHuClient.get_note_all_comments] Content {content.content_id} comments unchanged, skip")
+            return result
+        # 抓过的内容按时间倒序翻页，遇到上次最新的评论就停止
+        order_by: str = "ts" if seen else "score"
+        known_comment_id: str = seen[1] if seen else ""
+        newest_comment_id: str = known_comment_id
+
         is_end: bool = False
-        offset: str = ""
+        offset: str = checkpoint.get_comment_offset(content.content_id) if checkpoint else ""
         limit: int = 10
         while not is_end:
-            root_comment_res = await self.get_root_comments(content.content_id, content.content_type, offset, limit)
+            root_comment_res = await self.get_root_comments(content.content_id, content.content_type, offset, limit,
+                                                            order_by=order_by)
             if not root_comment_res:
                 break
             paging_info = root_comment_res.get("paging", {})
@@ -273,21 +533,43 @@ class ZhiHuClient(AbstractApiClient):
             offset = self._extractor.extract_offset(paging_info)
             comments = self._extractor.extract_comments(content, root_comment_res.get("data"))
 
+            reach_known = False
+            if known_comment_id:
+                new_comments = [c for c in comments if is_newer_comment(c.comment_id, known_comment_id)]
+                reach_known = len(new_comments) < len(comments)
+                comments = new_comments
+
             if not comments:
                 break
 
+            for comment in comments:
+                if is_newer_comment(comment.comment_id, newest_comment_id):
+                    newest_comment_id = comment.comment_id
+
             if callback:
                 await callback(comments)
 
             result.extend(comments)
             await self.get_comments_all_sub_comments(content, comments, crawl_interval=crawl_interval, callback=callback)
+            if checkpoint:
+                checkpoint.set_comment_offset(content.content_id, offset)
+            if reach_known:
+                break
             await asyncio.sleep(crawl_interval)
+
+        if checkpoint:
+            checkpoint.set_comments_done(content.content_id)
+        if seen_index:
+            seen_index.update(content.content_id, content.comment_count, newest_comment_id)
         return result
 
     async def get_comments_all_sub_comments(self, content: ZhihuContent, comments: List[ZhihuComment], crawl_interval: float = 1.0,
                                             callback: Optional[Callable] = None) -> List[ZhihuComment]:
         """
         获取指定评论下的所有子评论
+
+        不同一级评论的子评论分页作为并发任务抓取，请求经过客户端的调度器，共用全局的并发和请求频率限制；
+        回调仍按一级评论和分页的顺序依次调用，保证写入顺序不变。
         Args:
             content: 内容详情对象(问题｜文章｜视频)
             comments: 评论列表
@@ -301,32 +583,53 @@ class ZhiHuClient(AbstractApiClient):
             return []
 
         all_sub_comments: List[ZhihuComment] = []
-        for parment_comment in comments:
-            if parment_comment.sub_comment_count == 0:
-                continue
-
-            is_end: bool = False
-            offset: str = ""
-            limit: int = 10
-            while not is_end:
-                child_comment_res = await self.get_child_comments(parment_comment.comment_id, offset, limit)
-                if not child_comment_res:
-                    break
-                paging_info = child_comment_res.get("paging", {})
-                is_end = paging_info.get("is_end")
-                offset = self._extractor.extract_offset(paging_info)
-                sub_comments = self._extractor.extract_comments(content, child_comment_res.get("data"))
-
-                if not sub_comments:
-                    break
-
-                if callback:
-                    await callback(sub_comments)
-
-                all_sub_comments.extend(sub_comments)
-                await asyncio.sleep(crawl_interval)
+        task_list: List[asyncio.Task] = [
+            asyncio.create_task(self._get_sub_comment_pages(content, parment_comment, crawl_interval))
+            for parment_comment in comments
+            if parment_comment.sub_comment_count != 0
+        ]
+        try:
+            for task in task_list:
+                for sub_comments in await task:
+                    if callback:
+                        await callback(sub_comments)
+                    all_sub_comments.extend(sub_comments)
+        finally:
+            await utils.cancel_and_drain(task_list)
         return all_sub_comments
 
+    async def _get_sub_comment_pages(self, content: ZhihuContent, parment_comment: ZhihuComment,
+                                     crawl_interval: float) -> List[List[ZhihuComment]]:
+        """
+        按顺序抓取一条一级评论下的所有子评论分页
+        Args:
+            content: 内容详情对象(问题｜文章｜视频)
+            parment_comment: 一级评论
+            crawl_interval: 每页之间的等待时间（秒）
+
+        Returns:
+            每一页的子评论列表
+
+        """
+        pages: List[List[ZhihuComment]] = []
+        is_end: bool = False
+        offset: str = ""
+        limit: int = 10
+        while not is_end:
+            child_comment_res = await self.get_child_comments(parment_comment.comment_id, offset, limit)
+            if not child_comment_res:
+                break
+            paging_info = child_comment_res.get("paging", {})
+            is_end = paging_info.get("is_end")
+            offset = self._extractor.extract_offset(paging_info)
+            sub_comments = self._extractor.extract_comments(content, child_comment_res.get("data"))
+
+            if not sub_comments:
+                break
+            pages.append(sub_comments)
+            await asyncio.sleep(crawl_interval)
+        return pages
+
     async def get_creator_info(self, url_token: str) -> Optional[ZhihuCreator]:
         """
         获取创作者信息
@@ -401,27 +704,33 @@ class ZhiHuClient(AbstractApiClient):
         }
         return await self.get(uri, params)
 
-    async def get_all_anwser_by_creator(self, creator: ZhihuCreator, crawl_interval: float = 1.0,
-                                        callback: Optional[Callable] = None) -> List[ZhihuContent]:
+    async def _get_all_contents_by_creator(self, creator: ZhihuCreator, content_type: str,
+                                           get_page: Callable, crawl_interval: float = 1.0,
+                                           callback: Optional[Callable] = None,
+                                           checkpoint: Optional[CrawlCheckpoint] = None) -> List[ZhihuContent]:
         """
-        获取创作者的所有回答
+        按顺序翻页获取创作者的一类内容
         Args:
             creator: 创作者信息
+            content_type: 内容类型(answer | article | zvideo)，用于在检查点中分别记录偏移
+            get_page: 获取一页内容的方法
             crawl_interval: 爬取一次笔记的延迟单位（秒）
-            callback: 一次笔记爬取结束后
+            callback: 每页内容提取后调用
+            checkpoint: 检查点，从上次中断的偏移继续，每页抓完后记录偏移
 
         Returns:
 
         """
         all_contents: List[ZhihuContent] = []
         is_end: bool = False
-        offset: int = 0
+        offset: int = checkpoint.get_creator_offset(creator.url_token, content_type) if checkpoint else 0
         limit: int = 20
         while not is_end:
-            res = await self.get_creator_answers(creator.url_token, offset, limit)
+            res = await get_page(creator.url_token, offset, limit)
             if not res:
                 break
-            utils.logger.info(f"[ZhiHuClient.get_all_anwser_by_creator] Get creator {creator.url_token} answers: {res}")
+            utils.log_payload("[ZhiHuClient._get_all_contents_by_creator] Get creator %s %s list: %s",
+                              creator.url_token, content_type, res)
             paging_info = res.get("paging", {})
             is_end = paging_info.get("is_end")
             contents = self._extractor.extract_content_list_from_creator(res.get("data"))
@@ -429,71 +738,64 @@ class ZhiHuClient(AbstractApiClient):
                 await callback(contents)
             all_contents.extend(contents)
             offset += limit
+            if checkpoint:
+                checkpoint.set_creator_offset(creator.url_token, offset, content_type)
             await asyncio.sleep(crawl_interval)
         return all_contents
 
+    async def get_all_anwser_by_creator(self, creator: ZhihuCreator, crawl_interval: float = 1.0,
+                                        callback: Optional[Callable] = None,
+                                        checkpoint: Optional[CrawlCheckpoint] = None) -> List[ZhihuContent]:
+        """
+        获取创作者的所有回答
+        Args:
+            creator: 创作者信息
+            crawl_interval: 爬取一次笔记的延迟单位（秒）
+            callback: 一次笔记爬取结束后
+            checkpoint: 检查点，从上次中断的偏移继续，每页抓完后记录偏移
+
+        Returns:
+
+        """
+        return await self._get_all_contents_by_creator(
+            creator, zhihu_constant.ANSWER_NAME, self.get_creator_answers, crawl_interval, callback, checkpoint
+        )
 
     async def get_all_articles_by_creator(self, creator: ZhihuCreator, crawl_interval: float = 1.0,
-                                          callback: Optional[Callable] = None) -> List[ZhihuContent]:
+                                          callback: Optional[Callable] = None,
+                                          checkpoint: Optional[CrawlCheckpoint] = None) -> List[ZhihuContent]:
         """
         获取创作者的所有文章
         Args:
             creator:
             crawl_interval:
             callback:
+            checkpoint:
 
         Returns:
 
         """
-        all_contents: List[ZhihuContent] = []
-        is_end: bool = False
-        offset: int = 0
-        limit: int = 20
-        while not is_end:
-            res = await self.get_creator_articles(creator.url_token, offset, limit)
-            if not res:
-                break
-            paging_info = res.get("paging", {})
-            is_end = paging_info.get("is_end")
-            contents = self._extractor.extract_content_list_from_creator(res.get("data"))
-            if callback:
-                await callback(contents)
-            all_contents.extend(contents)
-            offset += limit
-            await asyncio.sleep(crawl_interval)
-        return all_contents
-
+        return await self._get_all_contents_by_creator(
+            creator, zhihu_constant.ARTICLE_NAME, self.get_creator_articles, crawl_interval, callback, checkpoint
+        )
 
     async def get_all_videos_by_creator(self, creator: ZhihuCreator, crawl_interval: float = 1.0,
-                                        callback: Optional[Callable] = None) -> List[ZhihuContent]:
+                                        callback: Optional[Callable] = None,
+                                        checkpoint: Optional[CrawlCheckpoint] = None) -> List[ZhihuContent]:
         """
         获取创作者的所有视频
         Args:
             creator:
             crawl_interval:
             callback:
+            checkpoint:
 
         Returns:
 
         """
-        all_contents: List[ZhihuContent] = []
-        is_end: bool = False
-        offset: int = 0
-        limit: int = 20
-        while not is_end:
-            res = await self.get_creator_videos(creator.url_token, offset, limit)
-            if not res:
-                break
-            paging_info = res.get("paging", {})
-            is_end = paging_info.get("is_end")
-            contents = self._extractor.extract_content_list_from_creator(res.get("data"))
-            if callback:
-                await callback(contents)
-            all_contents.extend(contents)
-            offset += limit
-            await asyncio.sleep(crawl_interval)
-        return all_contents
-
+        return await self._get_all_contents_by_creator(
+            creator, zhihu_constant.VIDEO_NAME, self.get_creator_videos, crawl_interval, callback, checkpoint
+        )
 
     async def get_answer_info(
         self, question_id: str, answer_id: str
@@ -17,13 +17,15 @@ from store import zhihu as zhihu_store
 from tools import utils
 from var import crawler_type_var, source_keyword_var
 
+from .checkpoint import CrawlCheckpoint
 from .client import ZhiHuClient
-from .exception import DataFetchError
+from .exception import DataFetchError, ForbiddenError
 from .help import ZhihuExtractor, judge_zhihu_url
 from .login import ZhiHuLogin
+from .seen_index import SeenContentIndex
+from .session import SessionStore
 
 import random
-import time
 
 from urllib.parse import urlparse
 
@@ -31,15 +33,21 @@ from urllib.parse import urlparse
 class ZhihuCrawler(AbstractCrawler):
     async def crawl(self):
         await asyncio.sleep(5)
-    context_page: Page
-    zhihu_client: ZhiHuClient
-    browser_context: BrowserContext
+    context_page: Optional[Page]
+    zhihu_client: Optional[ZhiHuClient]
+    browser_context: Optional[BrowserContext]
 
     def __init__(self) -> None:
         self.index_url = "https://www.zhihu.com"
         # self.user_agent = utils.get_user_agent()
         self.user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36"
         self._extractor = ZhihuExtractor()
+        self.checkpoint = CrawlCheckpoint.from_config()
+        self.seen_index: Optional[SeenContentIndex] = None
+        self.session_store = SessionStore.from_config()
+        self.zhihu_client = None
+        self.browser_context = None
+        self.context_page = None
 
     async def start(self) -> None:
         """
@@ -53,6 +61,14 @@ class ZhihuCrawler(AbstractCrawler):
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
             playwright_proxy_format, httpx_proxy_format = self.format_proxy_info(ip_proxy_info)
 
+        # 保存的登录态还有效时直接用httpx爬取，不启动浏览器
+        zhihu_client = await self.create_client_from_session(httpx_proxy_format)
+        if zhihu_client:
+            self.zhihu_client = zhihu_client
+            await self.crawl_by_type()
+            utils.logger.info("[ZhihuCrawler.start] Zhihu Crawler finished ...")
+            return
+
         async with async_playwright() as playwright:
             # Launch a browser context.
             chromium = playwright.chromium
@@ -86,24 +102,73 @@ class ZhihuCrawler(AbstractCrawler):
             await self.context_page.goto(f"{self.index_url}/search?q=python&search_source=Guess&utm_content=search_hot&type=content")
             await asyncio.sleep(5)
             await self.zhihu_client.update_cookies(browser_context=self.browser_context)
+            if self.session_store:
+                self.session_store.save(await self.browser_context.cookies())
+
+            await self.crawl_by_type()
+
+            utils.logger.info("[ZhihuCrawler.start] Zhihu Crawler finished ...")
+
+    async def create_client_from_session(self, httpx_proxy: Optional[str]) -> Optional[ZhiHuClient]:
+        """
+        Create zhihu client from the saved session cookies without launching the browser
+        Args:
+            httpx_proxy:
+
+        Returns:
+            None if there is no saved session or the session is invalid
+        """
+        if not self.session_store:
+            return None
+        cookies = self.session_store.load()
+        if not cookies:
+            return None
+        zhihu_client = await self.create_zhihu_client(httpx_proxy, cookies=cookies)
+        if await zhihu_client.pong():
+            utils.logger.info("[ZhihuCrawler.create_client_from_session] Saved session is valid, skip launching browser")
+            return zhihu_client
+        utils.logger.info("[ZhihuCrawler.create_client_from_session] Saved session is invalid, login with browser")
+        await zhihu_client.close()
+        self.session_store.clear()
+        return None
+
+    async def crawl_by_type(self) -> None:
+        """
+        Crawl by the configured crawler type and release the client and index afterwards
+        Returns:
 
-            crawler_type_var.set(config.CRAWLER_TYPE)
+        """
+        crawler_type_var.set(config.CRAWLER_TYPE)
+        self.seen_index = SeenContentIndex.from_config()
+        try:
+            finished = True
             if config.CRAWLER_TYPE == "search":
                 # Search for notes and retrieve their comment information.
-                await self.search()
+                finished = await self.search()
             elif config.CRAWLER_TYPE == "detail":
                 # Get the information and comments of the specified post
                 await self.get_specified_notes()
             elif config.CRAWLER_TYPE == "creator":
                 # Get creator's information and their notes and comments
-                await self.get_creators_and_notes()
+                finished = await self.get_creators_and_notes()
             else:
                 pass
-
-            utils.logger.info("[ZhihuCrawler.start] Zhihu Crawler finished ...")
-
-    async def search(self) -> None:
-        """Search for notes and retrieve their comment information."""
+            # 完整跑完才清除检查点，中断或出错时保留，下次从中断处继续
+            if finished:
+                self.checkpoint.clear()
+        finally:
+            # 中断或出错时写入还没保存的检查点
+            self.checkpoint.flush()
+            await self.zhihu_client.close()
+            if self.seen_index:
+                self.seen_index.close()
+
+    async def search(self) -> bool:
+        """
+        Search for notes and retrieve their comment information.
+        Returns:
+            False if the search or a comment batch stopped on an error
+        """
         utils.logger.info("[ZhihuCrawler.search] Begin search zhihu keywords")
 
         zhihu_limit_count = 20 # 知乎限制页面固定值
@@ -111,36 +176,132 @@ class ZhihuCrawler(AbstractCrawler):
         if config.CRAWLER_MAX_NOTES_COUNT < zhihu_limit_count:
             config.CRAWLER_MAX_NOTES_COUNT = zhihu_limit_count
         start_page = config.START_PAGE
-        for keyword in config.KEYWORDS.split(","):
+        # 评论在后台抓取，搜索请求优先级更高，翻页不用等评论抓完
+        # 上次中断时还没抓完评论的内容先恢复
+        comment_task_list: List[Task] = [asyncio.create_task(self.resume_pending_comments())]
+        try:
+            finished = await self._search_keywords(start_page, zhihu_limit_count, comment_task_list)
+        finally:
+            # 单批评论出错只记录日志，不影响其他批次，也不打断搜索的返回
+            results = await asyncio.gather(*comment_task_list, return_exceptions=True)
+            for result in results:
+                if isinstance(result, BaseException):
+                    utils.logger.error(f"[ZhihuCrawler.search] Get comments error: {result!r}")
+        # 评论没有抓完时保留检查点，下次恢复
+        return finished and not any(isinstance(result, BaseException) for result in results)
+
+    async def _search_keywords(self, start_page: int, zhihu_limit_count: int, comment_task_list: List[Task]) -> bool:
+        """
+        Search keywords page by page and submit comment batches
+        Args:
+            start_page:
+            zhihu_limit_count:
+            comment_task_list:
+
+        Returns:
+            False if the search stopped on a fetch error
+        """
+        for keyword in self.parse_keywords(config.KEYWORDS):
+            # 浏览器、客户端和登录态在所有关键词之间复用，
+            # 关键词写入上下文，保存数据时按关键词分开文件，后台评论任务也会带上创建时的关键词
             source_keyword_var.set(keyword)
             utils.logger.info(f"[ZhihuCrawler.search] Current search keyword: {keyword}")
-            page = 1
-            while (page - start_page + 1) * zhihu_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
-                if page < start_page:
-                    time.sleep(10)
-                    utils.logger.info(f"[ZhihuCrawler.search] Skip page {page}")
-                    page += 1
-                    continue
-
-                try:
-                    utils.logger.info(f"[ZhihuCrawler.search] search zhihu keyword: {keyword}, page: {page}")
-                    content_list: List[ZhihuContent]  = await self.zhihu_client.get_note_by_keyword(
-                        keyword=keyword,
-                        page=page,
-                    )
-                    utils.logger.info(f"[ZhihuCrawler.search] Search contents :{content_list}")
-                    if not content_list:
-                        utils.logger.info("No more content!")
-                        break
-
-                    page += 1
-                    for content in content_list:
-                        await zhihu_store.update_zhihu_content(content)
-
-                    await self.batch_get_content_comments(content_list)
-                except DataFetchError:
-                    utils.logger.error("[ZhihuCrawler.search] Search content error")
-                    return
+            if self.checkpoint.is_search_done(keyword):
+                utils.logger.info(f"[ZhihuCrawler.search] Keyword {keyword} finished in checkpoint, skip")
+                continue
+
+            # 要抓取的页码，最多 CRAWLER_MAX_NOTES_COUNT 条内容，检查点中已抓过的页直接跳过
+            resume_page = max(start_page, self.checkpoint.get_search_page(keyword))
+            search_pages = [
+                page for page in range(start_page, start_page + config.CRAWLER_MAX_NOTES_COUNT // zhihu_limit_count)
+                if page >= resume_page
+            ]
+            if resume_page > start_page:
+                utils.logger.info(f"[ZhihuCrawler.search] Resume keyword {keyword} from page {resume_page}")
+
+            # 后面的搜索页在后台预取，处理当前页的内容和评论时请求不停
+            prefetch_tasks: Dict[int, Task] = {}
+            try:
+                for index, page in enumerate(search_pages):
+                    for next_page in search_pages[index:index + 1 + config.SEARCH_PREFETCH_DEPTH]:
+                        if next_page not in prefetch_tasks:
+                            prefetch_tasks[next_page] = asyncio.create_task(
+                                self.zhihu_client.get_note_by_keyword(keyword=keyword, page=next_page)
+                            )
+
+                    try:
+                        utils.logger.info(f"[ZhihuCrawler.search] search zhihu keyword: {keyword}, page: {page}")
+                        content_list: List[ZhihuContent] = await prefetch_tasks.pop(page)
+                        utils.log_payload("[ZhihuCrawler.search] Search contents: %s", content_list)
+                        if not content_list:
+                            utils.logger.info("No more content!")
+                            self.checkpoint.set_search_page(keyword, page, done=True)
+                            break
+
+                        await self.store_contents(content_list)
+                        self.checkpoint.set_search_page(keyword, page + 1)
+
+                        comment_task_list.append(asyncio.create_task(self.batch_get_content_comments(content_list)))
+                    except DataFetchError:
+                        utils.logger.error("[ZhihuCrawler.search] Search content error")
+                        return False
+            finally:
+                # 到达最后一页或出错时取消多预取的页面
+                await utils.cancel_and_drain(prefetch_tasks.values())
+        return True
+
+    @staticmethod
+    def parse_keywords(keywords: str) -> List[str]:
+        """
+        Split comma separated keywords, drop blanks and duplicates but keep the order
+        Args:
+            keywords: eg: "科学,科研, 人工智能"
+
+        Returns:
+
+        """
+        keyword_list: List[str] = []
+        for keyword in keywords.replace("，", ",").split(","):
+            keyword = keyword.strip()
+            if keyword and keyword not in keyword_list:
+                keyword_list.append(keyword)
+        return keyword_list
+
+    async def store_contents(self, content_list: List[ZhihuContent]):
+        """
+        Store contents and record them in the checkpoint as waiting for comments
+        Args:
+            content_list:
+
+        Returns:
+
+        """
+        await zhihu_store.batch_update_zhihu_contents(content_list)
+        if config.ENABLE_GET_COMMENTS:
+            self.checkpoint.add_pending_contents(content_list)
+
+    async def resume_pending_comments(self):
+        """
+        Resume comments of contents that were stored but not finished in the last run
+        Returns:
+
+        """
+        pending_contents = self.checkpoint.pending_contents()
+        if not pending_contents:
+            return
+        utils.logger.info(f"[ZhihuCrawler.resume_pending_comments] Resume comments of {len(pending_contents)} contents")
+        # 按来源关键词分组，恢复的评论仍然保存到对应关键词的文件中
+        keyword_contents: Dict[str, List[ZhihuContent]] = {}
+        for content in pending_contents:
+            keyword_contents.setdefault(content.source_keyword, []).append(content)
+        task_list: List[Task] = []
+        for keyword, contents in keyword_contents.items():
+            source_keyword_var.set(keyword)
+            task_list.append(asyncio.create_task(self.batch_get_content_comments(contents)))
+        try:
+            await asyncio.gather(*task_list)
+        finally:
+            await utils.cancel_and_drain(task_list)
 
     async def batch_get_content_comments(self, content_list: List[ZhihuContent]):
         """
@@ -155,116 +316,152 @@ class ZhihuCrawler(AbstractCrawler):
             utils.logger.info(f"[ZhihuCrawler.batch_get_content_comments] Crawling comment mode is not enabled")
             return
 
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        # 并发由客户端的调度器统一控制
         task_list: List[Task] = []
         for content_item in content_list:
-            task = asyncio.create_task(self.get_comments(content_item, semaphore), name=content_item.content_id)
+            task = asyncio.create_task(self.get_comments(content_item), name=content_item.content_id)
             task_list.append(task)
-        await asyncio.gather(*task_list)
+        try:
+            await asyncio.gather(*task_list)
+        finally:
+            await utils.cancel_and_drain(task_list)
 
-    async def get_comments(self, content_item: ZhihuContent, semaphore: asyncio.Semaphore):
+    async def get_comments(self, content_item: ZhihuContent):
         """
         Get note comments with keyword filtering and quantity limitation
         Args:
             content_item:
-            semaphore:
 
         Returns:
 
         """
-        async with semaphore:
-            utils.logger.info(f"[ZhihuCrawler.get_comments] Begin get note id comments {content_item.content_id}")
-            await self.zhihu_client.get_note_all_comments(
-                content=content_item,
-                crawl_interval=random.random(),
-                callback=zhihu_store.batch_update_zhihu_note_comments
-            )
+        utils.logger.info(f"[ZhihuCrawler.get_comments] Begin get note id comments {content_item.content_id}")
+        await self.zhihu_client.get_note_all_comments(
+            content=content_item,
+            crawl_interval=random.random(),
+            callback=zhihu_store.batch_update_zhihu_note_comments,
+            checkpoint=self.checkpoint,
+            seen_index=self.seen_index,
+        )
 
-    async def get_creators_and_notes(self) -> None:
+    async def get_creators_and_notes(self) -> bool:
         """
-        Get creator's information and their notes and comments
+        Get creator's information and their notes and comments, creators are crawled concurrently
         Returns:
-
+            False if any creator stopped on a fetch error
         """
-        utils.logger.info("[ZhihuCrawler.get_creators_and_notes] Begin get xiaohongshu creators")
-        for user_link in config.ZHIHU_CREATOR_URL_LIST:
-            utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Begin get creator {user_link}")
-            user_url_token = user_link.split("/")[-1]
-            # get creator detail info from web html content
-            createor_info: ZhihuCreator = await self.zhihu_client.get_creator_info(url_token=user_url_token)
-            if not createor_info:
-                utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Creator {user_url_token} not found")
-                continue
-
-            utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Creator info: {createor_info}")
-            await zhihu_store.save_creator(creator=createor_info)
-
-            # 默认只提取回答信息，如果需要文章和视频，把下面的注释打开即可
-
-            # Get all anwser information of the creator
-            all_content_list = await self.zhihu_client.get_all_anwser_by_creator(
-                creator=createor_info,
-                crawl_interval=random.random(),
-                callback=zhihu_store.batch_update_zhihu_contents
-            )
-
-
-            # Get all articles of the creator's contents
-            # all_content_list = await self.zhihu_client.get_all_articles_by_creator(
-            #     creator=createor_info,
-            #     crawl_interval=random.random(),
-            #     callback=zhihu_store.batch_update_zhihu_contents
-            # )
-
-            # Get all videos of the creator's contents
-            # all_content_list = await self.zhihu_client.get_all_videos_by_creator(
-            #     creator=createor_info,
-            #     crawl_interval=random.random(),
-            #     callback=zhihu_store.batch_update_zhihu_contents
-            # )
+        utils.logger.info("[ZhihuCrawler.get_creators_and_notes] Begin get zhihu creators")
+        await self.resume_pending_comments()
+        # 多个创作者同时抓取，请求由客户端的调度器统一限流
+        semaphore = asyncio.Semaphore(max(1, config.MAX_CONCURRENT_CREATORS))
+        task_list: List[Task] = [
+            asyncio.create_task(self.get_creator_and_notes(user_link, semaphore))
+            for user_link in config.ZHIHU_CREATOR_URL_LIST
+        ]
+        # 单个创作者的意外错误只记录日志，不影响其他创作者
+        results = await asyncio.gather(*task_list, return_exceptions=True)
+        for user_link, result in zip(config.ZHIHU_CREATOR_URL_LIST, results):
+            if isinstance(result, BaseException):
+                utils.logger.error(f"[ZhihuCrawler.get_creators_and_notes] Get creator {user_link} failed: {result!r}")
+        return all(result is True for result in results)
+
+    async def get_creator_and_notes(self, user_link: str, semaphore: asyncio.Semaphore) -> bool:
+        """
+        Get one creator's information, contents of all configured types and their comments
+        Args:
+            user_link: creator home page url
+            semaphore: limits the number of creators crawled at the same time
 
-            # Get all comments of the creator's contents
-            await self.batch_get_content_comments(all_content_list)
+        Returns:
+            False if the creator stopped on a fetch error
+        """
+        user_url_token = user_link.rstrip("/").split("/")[-1]
+        if self.checkpoint.is_creator_done(user_url_token):
+            utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Creator {user_url_token} finished in checkpoint, skip")
+            return True
 
-    async def get_note_detail(
-        self, full_note_url: str, semaphore: asyncio.Semaphore
-    ) -> Optional[ZhihuContent]:
+        async with semaphore:
+            utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Begin get creator {user_link}")
+            collector_task_list: List[Task] = []
+            comment_task_list: List[Task] = []
+            try:
+                # get creator detail info from web html content
+                createor_info: ZhihuCreator = await self.zhihu_client.get_creator_info(url_token=user_url_token)
+                if not createor_info:
+                    utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Creator {user_url_token} not found")
+                    self.checkpoint.set_creator_done(user_url_token)
+                    return True
+
+                utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Creator info: {createor_info}")
+                await zhihu_store.save_creator(creator=createor_info)
+
+                async def on_contents(contents: List[ZhihuContent]):
+                    # 每页内容抓到后马上保存，评论在后台抓取，翻页不用等评论抓完
+                    await self.store_contents(contents)
+                    comment_task_list.append(asyncio.create_task(self.batch_get_content_comments(contents)))
+
+                # 回答、文章、视频同时翻页
+                collectors = {
+                    constant.ANSWER_NAME: self.zhihu_client.get_all_anwser_by_creator,
+                    constant.ARTICLE_NAME: self.zhihu_client.get_all_articles_by_creator,
+                    constant.VIDEO_NAME: self.zhihu_client.get_all_videos_by_creator,
+                }
+                collector_task_list = [
+                    asyncio.create_task(collectors[content_type](
+                        creator=createor_info,
+                        crawl_interval=random.random(),
+                        callback=on_contents,
+                        checkpoint=self.checkpoint,
+                    ))
+                    for content_type in config.CREATOR_CONTENT_TYPES
+                ]
+                await asyncio.gather(*collector_task_list)
+                await asyncio.gather(*comment_task_list)
+            except (DataFetchError, ForbiddenError) as e:
+                # 检查点中保留已抓取的偏移，下次从中断处继续
+                utils.logger.error(f"[ZhihuCrawler.get_creators_and_notes] Get creator {user_url_token} error: {e!r}")
+                return False
+            finally:
+                await utils.cancel_and_drain(collector_task_list + comment_task_list)
+
+            self.checkpoint.set_creator_done(user_url_token)
+            return True
+
+    async def get_note_detail(self, full_note_url: str) -> Optional[ZhihuContent]:
         """
         Get note detail
         Args:
             full_note_url: str
-            semaphore:
 
         Returns:
 
         """
-        async with semaphore:
+        utils.logger.info(
+            f"[ZhihuCrawler.get_specified_notes] Begin get specified note {full_note_url}"
+        )
+        # judge note type
+        note_type: str = judge_zhihu_url(full_note_url)
+        if note_type == constant.ANSWER_NAME:
+            question_id = full_note_url.split("/")[-3]
+            answer_id = full_note_url.split("/")[-1]
             utils.logger.info(
-                f"[ZhihuCrawler.get_specified_notes] Begin get specified note {full_note_url}"
+                f"[ZhihuCrawler.get_specified_notes] Get answer info, question_id: {question_id}, answer_id: {answer_id}"
             )
-            # judge note type
-            note_type: str = judge_zhihu_url(full_note_url)
-            if note_type == constant.ANSWER_NAME:
-                question_id = full_note_url.split("/")[-3]
-                answer_id = full_note_url.split("/")[-1]
-                utils.logger.info(
-                    f"[ZhihuCrawler.get_specified_notes] Get answer info, question_id: {question_id}, answer_id: {answer_id}"
-                )
-                return await self.zhihu_client.get_answer_info(question_id, answer_id)
+            return await self.zhihu_client.get_answer_info(question_id, answer_id)
 
-            elif note_type == constant.ARTICLE_NAME:
-                article_id = full_note_url.split("/")[-1]
-                utils.logger.info(
-                    f"[ZhihuCrawler.get_specified_notes] Get article info, article_id: {article_id}"
-                )
-                return await self.zhihu_client.get_article_info(article_id)
+        elif note_type == constant.ARTICLE_NAME:
+            article_id = full_note_url.split("/")[-1]
+            utils.logger.info(
+                f"[ZhihuCrawler.get_specified_notes] Get article info, article_id: {article_id}"
+            )
+            return await self.zhihu_client.get_article_info(article_id)
 
-            elif note_type == constant.VIDEO_NAME:
-                video_id = full_note_url.split("/")[-1]
-                utils.logger.info(
-                    f"[ZhihuCrawler.get_specified_notes] Get video info, video_id: {video_id}"
-                )
-                return await self.zhihu_client.get_video_info(video_id)
+        elif note_type == constant.VIDEO_NAME:
+            video_id = full_note_url.split("/")[-1]
+            utils.logger.info(
+                f"[ZhihuCrawler.get_specified_notes] Get video info, video_id: {video_id}"
+            )
+            return await self.zhihu_client.get_video_info(video_id)
 
     async def get_specified_notes(self):
         """
@@ -272,22 +469,26 @@ class ZhihuCrawler(AbstractCrawler):
         Returns:
 
         """
-        get_note_detail_task_list = []
+        await self.resume_pending_comments()
+        note_url_list: List[str] = []
         for full_note_url in config.ZHIHU_SPECIFIED_ID_LIST:
             # remove query params
             full_note_url = full_note_url.split("?")[0]
-            crawler_task = self.get_note_detail(
-                full_note_url=full_note_url,
-                semaphore=asyncio.Semaphore(config.MAX_CONCURRENCY_NUM),
-            )
-            get_note_detail_task_list.append(crawler_task)
+            if self.checkpoint.is_detail_done(full_note_url):
+                utils.logger.info(f"[ZhihuCrawler.get_specified_notes] Note {full_note_url} finished in checkpoint, skip")
+                continue
+            note_url_list.append(full_note_url)
+
+        get_note_detail_task_list = [
+            self.get_note_detail(full_note_url=full_note_url) for full_note_url in note_url_list
+        ]
 
         need_get_comment_notes: List[ZhihuContent] = []
         note_details = await asyncio.gather(*get_note_detail_task_list)
         for index, note_detail in enumerate(note_details):
             if not note_detail:
                 utils.logger.info(
-                    f"[ZhihuCrawler.get_specified_notes] Note {config.ZHIHU_SPECIFIED_ID_LIST[index]} not found"
+                    f"[ZhihuCrawler.get_specified_notes] Note {note_url_list[index]} not found"
                 )
                 continue
 
@@ -296,6 +497,8 @@ class ZhihuCrawler(AbstractCrawler):
             await zhihu_store.update_zhihu_content(note_detail)
 
         await self.batch_get_content_comments(need_get_comment_notes)
+        for full_note_url in note_url_list:
+            self.checkpoint.set_detail_done(full_note_url)
 
     @staticmethod
     def format_proxy_info(ip_proxy_info: IpInfoModel) -> Tuple[Optional[Dict], Optional[Dict]]:
@@ -310,10 +513,12 @@ class ZhihuCrawler(AbstractCrawler):
         }
         return playwright_proxy, httpx_proxy
 
-    async def create_zhihu_client(self, httpx_proxy: Optional[str]) -> ZhiHuClient:
-        """Create zhihu client"""
+    async def create_zhihu_client(self, httpx_proxy: Optional[str], cookies: Optional[List[Dict]] = None) -> ZhiHuClient:
+        """Create zhihu client, use the browser context cookies if cookies is not given"""
         utils.logger.info("[ZhihuCrawler.create_zhihu_client] Begin create zhihu API client ...")
-        cookie_str, cookie_dict = utils.convert_cookies(await self.browser_context.cookies())
+        if cookies is None:
+            cookies = await self.browser_context.cookies()
+        cookie_str, cookie_dict = utils.convert_cookies(cookies)
         zhihu_client_obj = ZhiHuClient(
             proxies=httpx_proxy,
             headers={
@@ -365,6 +570,10 @@ class ZhihuCrawler(AbstractCrawler):
             return browser_context
 
     async def close(self):
-        """Close browser context"""
-        await self.browser_context.close()
-        utils.logger.info("[ZhihuCrawler.close] Browser context closed ...")
+        """Close httpx client and browser context"""
+        # 登录或者启动浏览器失败时还没有创建客户端
+        if self.zhihu_client:
+            await self.zhihu_client.close()
+        if self.browser_context:
+            await self.browser_context.close()
+            utils.logger.info("[ZhihuCrawler.close] Browser context closed ...")
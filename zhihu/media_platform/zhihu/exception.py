@@ -1,3 +1,5 @@
+from typing import Optional
+
 from httpx import RequestError
 
 
@@ -5,6 +7,16 @@ class DataFetchError(RequestError):
     """something error when fetch"""
 
 
+class ServerBusyError(DataFetchError):
+    """server error (5xx) or too many requests (429), can be retried later"""
+
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        # 响应头 Retry-After 指定的等待秒数
+        self.retry_after = retry_after
+
+
 class IPBlockError(RequestError):
     """fetch so fast that the server block us ip"""
 
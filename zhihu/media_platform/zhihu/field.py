@@ -34,3 +34,13 @@ class SearchSort(Enum):
     DEFAULT = ""  # 综合排序
     UPVOTED_COUNT = "upvoted_count"  # 最多赞同
     CREATE_TIME = "created_time"  # 最新发布
+
+
+class CrawlTaskType(Enum):
+    """
+    调度器中的请求类型
+    """
+    SEARCH = "search"  # 搜索结果页
+    DETAIL = "detail"  # 回答、文章、视频详情
+    CREATOR = "creator"  # 创作者主页及其内容列表
+    COMMENT = "comment"  # 一级评论和子评论
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import bisect
+import os
+import time
+from typing import Dict, List, Optional, Union
+from urllib.parse import urlparse
+
+import config
+from tools import json_codec, utils
+
+# 延迟直方图的桶上界(秒)，和Prometheus的histogram一样是累计计数
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+def classify_route(url: str) -> str:
+    """
+    把请求地址归到接口类型上，ID之类的变化部分不作为指标的标签
+    Args:
+        url: 请求地址
+
+    Returns:
+        search_v3 | root_comment | child_comment | members | me | answer_page | article_page | zvideo_page | people_page | other
+    """
+    path = urlparse(url).path
+    if "/search_v3" in path:
+        return "search_v3"
+    if path.endswith("/root_comment"):
+        return "root_comment"
+    if path.endswith("/child_comment"):
+        return "child_comment"
+    if path.startswith("/api/v4/members/"):
+        return "members"
+    if path == "/api/v4/me":
+        return "me"
+    if "/answer/" in path:
+        return "answer_page"
+    if path.startswith("/p/"):
+        return "article_page"
+    if path.startswith("/zvideo/"):
+        return "zvideo_page"
+    if path.startswith("/people/"):
+        return "people_page"
+    return "other"
+
+
+class RouteStats:
+    """单个接口的统计"""
+    __slots__ = ("bucket_counts", "latency_sum", "latency_max", "status_counts", "bytes_received", "retries")
+
+    def __init__(self):
+        self.bucket_counts: List[int] = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.status_counts: Dict[str, int] = {}
+        self.bytes_received = 0
+        self.retries = 0
+
+    @property
+    def count(self) -> int:
+        return sum(self.bucket_counts)
+
+    def latency_quantile(self, quantile: float) -> float:
+        """按直方图估算延迟分位数，返回所在桶的上界，最后一个桶返回最大值"""
+        total = self.count
+        if not total:
+            return 0.0
+        target = quantile * total
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS, self.bucket_counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return min(bound, self.latency_max)
+        return self.latency_max
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "latency_sum": round(self.latency_sum, 6),
+            "latency_max": round(self.latency_max, 6),
+            "latency_buckets": {str(bound): count for bound, count in zip(LATENCY_BUCKETS, self.bucket_counts)},
+            "status": dict(self.status_counts),
+            "bytes_received": self.bytes_received,
+            "retries": self.retries,
+        }
+
+
+class RequestMetrics:
+    """
+    按接口统计请求的延迟直方图、状态码、接收字节数和重试次数
+
+    定期把统计写到JSON文件或者Prometheus的textfile(node_exporter textfile collector)，
+    爬取结束时在日志里输出汇总。
+    """
+
+    def __init__(self, file_path: Optional[str] = None, file_format: str = "prometheus", export_interval: float = 60):
+        """
+        Args:
+            file_path: 导出文件路径，为None时不导出
+            file_format: prometheus 或 json
+            export_interval: 导出间隔(秒)
+        """
+        if file_format not in ("prometheus", "json"):
+            raise ValueError(f"[RequestMetrics] Invalid metrics format {file_format}, only supported prometheus or json")
+        self.file_path = file_path
+        self.file_format = file_format
+        self.export_interval = export_interval
+        self.routes: Dict[str, RouteStats] = {}
+        self._last_export = time.monotonic()
+        # 后台线程中正在进行的导出
+        self._export_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls) -> "RequestMetrics":
+        """根据配置创建"""
+        return cls(
+            config.METRICS_FILE if config.ENABLE_METRICS_EXPORT else None,
+            config.METRICS_FORMAT,
+            config.METRICS_EXPORT_INTERVAL,
+        )
+
+    def _route(self, route: str) -> RouteStats:
+        stats = self.routes.get(route)
+        if stats is None:
+            stats = self.routes[route] = RouteStats()
+        return stats
+
+    def observe(self, route: str, status: Union[int, str], seconds: float, bytes_received: int = 0):
+        """
+        记录一次请求
+        Args:
+            route: 接口类型
+            status: HTTP状态码，请求没有响应时为异常类名
+            seconds: 耗时
+            bytes_received: 响应体字节数
+
+        Returns:
+
+        """
+        stats = self._route(route)
+        stats.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        stats.latency_sum += seconds
+        stats.latency_max = max(stats.latency_max, seconds)
+        status = str(status)
+        stats.status_counts[status] = stats.status_counts.get(status, 0) + 1
+        stats.bytes_received += bytes_received
+        if self.file_path and time.monotonic() - self._last_export >= self.export_interval:
+            self._export_in_background()
+
+    def record_retry(self, route: str):
+        self._route(route).retries += 1
+
+    def to_dict(self) -> Dict:
+        return {"updated_at": int(time.time()), "routes": {route: stats.to_dict() for route, stats in self.routes.items()}}
+
+    def to_prometheus(self) -> str:
+        """
+        Prometheus文本格式
+        Returns:
+
+        """
+        lines = [
+            "# HELP zhihu_request_duration_seconds Zhihu request latency in seconds",
+            "# TYPE zhihu_request_duration_seconds histogram",
+        ]
+        for route, stats in self.routes.items():
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.bucket_counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'zhihu_request_duration_seconds_bucket{{route="{route}",le="{le}"}} {cumulative}')
+            lines.append(f'zhihu_request_duration_seconds_sum{{route="{route}"}} {stats.latency_sum:.6f}')
+            lines.append(f'zhihu_request_duration_seconds_count{{route="{route}"}} {cumulative}')
+
+        lines += ["# HELP zhihu_requests_total Zhihu requests by status code",
+                  "# TYPE zhihu_requests_total counter"]
+        for route, stats in self.routes.items():
+            for status, count in stats.status_counts.items():
+                lines.append(f'zhihu_requests_total{{route="{route}",status="{status}"}} {count}')
+
+        lines += ["# HELP zhihu_response_bytes_total Zhihu response body bytes received",
+                  "# TYPE zhihu_response_bytes_total counter"]
+        lines += [f'zhihu_response_bytes_total{{route="{route}"}} {stats.bytes_received}'
+                  for route, stats in self.routes.items()]
+
+        lines += ["# HELP zhihu_request_retries_total Zhihu request retries",
+                  "# TYPE zhihu_request_retries_total counter"]
+        lines += [f'zhihu_request_retries_total{{route="{route}"}} {stats.retries}'
+                  for route, stats in self.routes.items()]
+        return "\n".join(lines) + "\n"
+
+    def _render(self) -> Optional[str]:
+        if not self.file_path or not self.routes:
+            return None
+        if self.file_format == "json":
+            return json_codec.dumps(self.to_dict(), pretty=True)
+        return self.to_prometheus()
+
+    def _export_in_background(self):
+        """
+        在事件循环中记录请求时，文件在线程中写入，不阻塞事件循环，上一次导出还没完成时跳过
+        Returns:
+
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.export()
+            return
+        self._last_export = time.monotonic()
+        if self._export_task is not None and not self._export_task.done():
+            return
+        content = self._render()
+        if content is not None:
+            self._export_task = loop.create_task(asyncio.to_thread(self._write, content))
+            self._export_task.add_done_callback(self._log_export_error)
+
+    @staticmethod
+    def _log_export_error(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            utils.logger.error(f"[RequestMetrics.export] Export metrics failed: {task.exception()}")
+
+    async def flush(self):
+        """
+        等待后台导出完成，再在线程中导出最终结果
+        Returns:
+
+        """
+        if self._export_task is not None:
+            await asyncio.gather(self._export_task, return_exceptions=True)
+            self._export_task = None
+        await asyncio.to_thread(self.export)
+
+    def export(self):
+        """
+        写入导出文件
+        Returns:
+
+        """
+        self._last_export = time.monotonic()
+        content = self._render()
+        if content is not None:
+            self._write(content)
+
+    def _write(self, content: str):
+        """先写临时文件再替换，采集端不会读到半个文件"""
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        tmp_path = self.file_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, self.file_path)
+
+    def log_summary(self):
+        """
+        在日志中输出每个接口的汇总
+        Returns:
+
+        """
+        for route, stats in sorted(self.routes.items(), key=lambda item: -item[1].count):
+            count = stats.count
+            if not count:
+                continue
+            status = ", ".join(f"{code}: {num}" for code, num in sorted(stats.status_counts.items()))
+            utils.logger.info(
+                f"[RequestMetrics] {route}: {count} requests, avg {stats.latency_sum / count * 1000:.0f}ms, "
+                f"p95 {stats.latency_quantile(0.95) * 1000:.0f}ms, max {stats.latency_max * 1000:.0f}ms, "
+                f"status {{{status}}}, {stats.bytes_received / 1024:.1f} KiB, {stats.retries} retries"
+            )
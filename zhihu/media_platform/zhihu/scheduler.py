@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, List, Optional, Tuple
+
+import config
+from tools import utils
+
+from .field import CrawlTaskType
+
+
+def classify_uri(uri: str) -> CrawlTaskType:
+    """
+    根据请求路由判断请求类型
+    Args:
+        uri: 请求路由
+
+    Returns:
+
+    """
+    if uri.startswith("/api/v4/search_v3"):
+        return CrawlTaskType.SEARCH
+    if uri.startswith("/people/") or uri.startswith("/api/v4/members/"):
+        return CrawlTaskType.CREATOR
+    if "comment" in uri:
+        return CrawlTaskType.COMMENT
+    return CrawlTaskType.DETAIL
+
+
+class AsyncTokenBucket:
+    """
+    协程版令牌桶，限制请求频率
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate: 每秒生成的令牌数
+            burst: 桶容量，即允许的最大突发请求数
+        """
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+
+    async def acquire(self) -> float:
+        """
+        取一个令牌，不足时等待
+        Returns:
+            实际等待的秒数
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        # 先预留令牌再等待，多个协程排队时总速率不会超过 rate
+        self._tokens -= 1
+        wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """
+    按接口统计最近请求的失败比例，超过阈值时熔断
+    """
+
+    def __init__(self, window: int = 20, min_requests: int = 10, failure_ratio: float = 0.5,
+                 cooldown: float = 60):
+        """
+        Args:
+            window: 统计最近多少次请求
+            min_requests: 请求数达到多少次才判断
+            failure_ratio: 失败比例阈值
+            cooldown: 熔断后暂停的秒数
+        """
+        self.window = max(1, int(window))
+        self.min_requests = max(1, min(int(min_requests), self.window))
+        self.failure_ratio = failure_ratio
+        self.cooldown = cooldown
+        self._failures: Dict[str, Deque[bool]] = {}
+
+    def failure_rate(self, key: str) -> float:
+        failures = self._failures.get(key)
+        return sum(failures) / len(failures) if failures else 0.0
+
+    def record(self, key: str, ok: bool) -> bool:
+        """
+        记录一次请求结果
+        Args:
+            key: 接口
+            ok: 请求是否成功
+
+        Returns:
+            是否触发熔断，触发后清空这个接口的统计，暂停结束后重新计算
+        """
+        failures = self._failures.get(key)
+        if failures is None:
+            failures = self._failures[key] = deque(maxlen=self.window)
+        failures.append(not ok)
+        if len(failures) >= self.min_requests and sum(failures) / len(failures) >= self.failure_ratio:
+            failures.clear()
+            return True
+        return False
+
+
+class CrawlScheduler:
+    """
+    爬虫请求的全局调度器
+
+    所有请求共用一个并发上限和一个请求频率限制，等待中的请求放在优先队列里，
+    有空闲名额时优先级高(数值小)的请求先执行，同一优先级按提交顺序执行。
+    熔断或者服务端要求等待时暂停，暂停期间拿到名额的请求等到暂停结束再执行。
+    """
+
+    def __init__(self, max_concurrency: int = 1, rate_per_sec: float = 0, burst: int = 1,
+                 priorities: Optional[Dict[str, int]] = None, breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            max_concurrency: 同时执行的最大请求数
+            rate_per_sec: 每秒最大请求数，0表示不限制
+            burst: 允许的最大突发请求数
+            priorities: 请求类型 -> 优先级，数值越小越优先
+            breaker: 熔断器，为None时不熔断
+        """
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.priorities = priorities or {}
+        self._bucket = AsyncTokenBucket(rate_per_sec, burst) if rate_per_sec > 0 else None
+        self._running = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        # 还在等待的请求数，取消的等待者留在堆里直到被弹出，不计入
+        self._waiting = 0
+        self._seq = itertools.count()
+        self.request_counts: Dict[str, int] = {t.value: 0 for t in CrawlTaskType}
+        self.breaker = breaker
+        self.pause_count = 0
+        self._paused_until = 0.0
+
+    @classmethod
+    def from_config(cls) -> "CrawlScheduler":
+        """根据配置创建调度器"""
+        breaker = None
+        if config.ENABLE_CIRCUIT_BREAKER:
+            breaker = CircuitBreaker(
+                window=config.CIRCUIT_BREAKER_WINDOW,
+                min_requests=config.CIRCUIT_BREAKER_MIN_REQUESTS,
+                failure_ratio=config.CIRCUIT_BREAKER_FAILURE_RATIO,
+                cooldown=config.CIRCUIT_BREAKER_COOLDOWN,
+            )
+        return cls(
+            max_concurrency=config.MAX_CONCURRENCY_NUM,
+            rate_per_sec=config.MAX_REQUESTS_PER_SEC,
+            burst=config.MAX_REQUESTS_BURST,
+            priorities=config.CRAWL_TASK_PRIORITY,
+            breaker=breaker,
+        )
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    @property
+    def paused_for(self) -> float:
+        """剩余的暂停秒数"""
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def pause(self, seconds: float):
+        """
+        暂停调度，已经在暂停时取较晚的结束时间
+        Args:
+            seconds: 暂停秒数
+
+        Returns:
+
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def record_result(self, key: str, ok: bool):
+        """
+        记录请求结果，接口的失败比例过高时熔断，暂停调度
+        Args:
+            key: 接口
+            ok: 请求是否成功
+
+        Returns:
+
+        """
+        if self.breaker is None:
+            return
+        if self.breaker.record(key, ok):
+            self.pause_count += 1
+            self.pause(self.breaker.cooldown)
+            utils.logger.warning(
+                f"[CrawlScheduler.record_result] Circuit breaker tripped on {key}, failure rate reached "
+                f"{self.breaker.failure_ratio:.0%}, pause all requests for {self.breaker.cooldown}s"
+            )
+
+    async def _acquire(self, task_type: CrawlTaskType):
+        if self._running < self.max_concurrency and not self.waiting:
+            self._running += 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        priority = self.priorities.get(task_type.value, len(self.priorities))
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        self._waiting += 1
+        try:
+            await fut
+        except asyncio.CancelledError:
+            # 名额已经交给当前请求时要归还
+            if fut.done() and not fut.cancelled():
+                self._release()
+            else:
+                fut.cancel()
+                self._waiting -= 1
+            raise
+
+    def _release(self):
+        # 直接把名额交给优先级最高的等待者，运行数不变
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                self._waiting -= 1
+                fut.set_result(None)
+                return
+        self._running -= 1
+
+    @asynccontextmanager
+    async def slot(self, task_type: CrawlTaskType):
+        """
+        占用一个请求名额
+        Args:
+            task_type: 请求类型
+
+        Returns:
+
+        """
+        await self._acquire(task_type)
+        try:
+            # 等待期间可能再次暂停
+            while self.paused_for > 0:
+                await asyncio.sleep(self.paused_for)
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            self.request_counts[task_type.value] += 1
+            yield
+        finally:
+            self._release()
+
+    def log_stats(self):
+        """输出各类请求的数量"""
+        utils.logger.info(f"[CrawlScheduler] Requests by type: {self.request_counts}, paused {self.pause_count} times")
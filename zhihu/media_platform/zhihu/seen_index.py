@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import os
+import sqlite3
+from typing import Optional, Tuple
+
+import config
+
+
+def is_newer_comment(comment_id: str, other_id: str) -> bool:
+    """
+    评论ID是否比另一个新，知乎评论ID是递增的数字
+    Args:
+        comment_id: 评论ID
+        other_id: 另一个评论ID
+
+    Returns:
+
+    """
+    if not other_id:
+        return True
+    try:
+        return int(comment_id) > int(other_id)
+    except ValueError:
+        return comment_id > other_id
+
+
+class SeenContentIndex:
+    """
+    已抓取内容的评论索引
+
+    按 content_id 记录上次抓完评论时的 comment_count 和最新的一级评论ID，
+    评论数没有变化的内容直接跳过，有变化的按时间倒序抓取，遇到已有的评论就停止。
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        """
+        Args:
+            db_path: SQLite文件路径，默认只在内存中记录
+        """
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_contents ("
+            "content_id TEXT PRIMARY KEY, comment_count INTEGER, newest_comment_id TEXT)"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls) -> Optional["SeenContentIndex"]:
+        """根据配置创建索引，没有开启增量抓取时返回None"""
+        if not config.ENABLE_INCREMENTAL_COMMENTS:
+            return None
+        return cls(config.SEEN_CONTENT_DB)
+
+    def get(self, content_id: str) -> Optional[Tuple[int, str]]:
+        """
+        查询内容上次抓取时的评论数和最新评论ID
+        Args:
+            content_id: 内容ID
+
+        Returns:
+            (comment_count, newest_comment_id)，没有抓过时返回None
+        """
+        return self._conn.execute(
+            "SELECT comment_count, newest_comment_id FROM seen_contents WHERE content_id = ?", (content_id,)
+        ).fetchone()
+
+    def update(self, content_id: str, comment_count: int, newest_comment_id: str):
+        """
+        记录内容的评论数和最新评论ID
+        Args:
+            content_id: 内容ID
+            comment_count: 评论数
+            newest_comment_id: 最新的一级评论ID
+
+        Returns:
+
+        """
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO seen_contents (content_id, comment_count, newest_comment_id) VALUES (?, ?, ?)",
+                (content_id, comment_count, newest_comment_id),
+            )
+
+    def close(self):
+        self._conn.close()
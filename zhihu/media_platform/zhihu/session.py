@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import config
+from tools import utils
+
+
+class SessionStore:
+    """
+    登录态cookies的本地缓存
+
+    登录并打开搜索页拿到完整cookies之后保存下来，下次启动时先用这些cookies直接创建客户端，
+    pong通过就不再启动浏览器，失效时才走浏览器登录流程。
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Args:
+            file_path: cookies文件路径
+        """
+        self.file_path = file_path
+
+    @classmethod
+    def from_config(cls) -> Optional["SessionStore"]:
+        """根据配置创建，没有开启时返回None"""
+        if not config.ENABLE_SESSION_CACHE:
+            return None
+        return cls(config.SESSION_COOKIE_FILE)
+
+    def load(self) -> List[Dict]:
+        """
+        读取保存的cookies，过期的cookie会被去掉
+        Returns:
+            playwright格式的cookie列表，没有保存过时返回空列表
+        """
+        if not os.path.exists(self.file_path):
+            return []
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                cookies = json.load(f).get("cookies", [])
+        except (OSError, ValueError) as e:
+            utils.logger.warning(f"[SessionStore.load] Invalid session file {self.file_path}: {e}")
+            return []
+        now = time.time()
+        # expires为-1的是会话cookie，没有过期时间
+        return [cookie for cookie in cookies if not 0 < cookie.get("expires", -1) < now]
+
+    def save(self, cookies: List[Dict]):
+        """
+        保存cookies，先写临时文件再替换，文件只对当前用户可读写
+        Args:
+            cookies: playwright格式的cookie列表
+
+        Returns:
+
+        """
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        tmp_path = self.file_path + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": int(time.time()), "cookies": cookies}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.file_path)
+        utils.logger.info(f"[SessionStore.save] Saved {len(cookies)} cookies to {self.file_path}")
+
+    def clear(self):
+        """登录态失效时删除保存的cookies"""
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
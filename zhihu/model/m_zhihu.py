@@ -1,72 +1,132 @@
 # -*- coding: utf-8 -*-
-from typing import Optional
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Optional, Tuple
 
-from pydantic import BaseModel, Field
 
+class CompactRecord:
+    """
+    用 __slots__ 保存字段的轻量记录
 
-class ZhihuContent(BaseModel):
+    评论抓取时会创建大量记录，创建后马上转换成dict保存，这里不做类型校验，
+    关键字参数也不像pydantic那样做类型转换(例如 "12" 不会转换成 12)，调用方需要传入正确的类型，
+    创建和转换都比pydantic模型快很多，占用的内存也小。
+    子类在 FIELDS 中按顺序声明 (字段名, 默认值, 说明)，__slots__ 由 FIELDS 生成。
+    """
+    __slots__ = ()
+    FIELDS: Tuple[Tuple[str, Any, str], ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._defaults = tuple((name, default) for name, default, _ in cls.FIELDS)
+        cls._getter = attrgetter(*cls.__slots__)
+
+    def __init__(self, **kwargs):
+        if not kwargs:
+            for name, default in self._defaults:
+                setattr(self, name, default)
+            return
+        for name, default in self._defaults:
+            setattr(self, name, kwargs.pop(name, default))
+        if kwargs:
+            raise TypeError(f"{type(self).__name__} got unexpected fields: {', '.join(kwargs)}")
+
+    @classmethod
+    def field_names(cls) -> Tuple[str, ...]:
+        return cls.__slots__
+
+    def to_dict(self, include: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        转换成dict
+        Args:
+            include: 只包含这些字段，默认包含所有字段
+
+        Returns:
+
+        """
+        if include is None:
+            return dict(zip(self.__slots__, self._getter(self)))
+        return {name: getattr(self, name) for name in self.__slots__ if name in include}
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._getter(self) == other._getter(other)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in zip(self.__slots__, self._getter(self)))
+        return f"{type(self).__name__}({fields})"
+
+
+class ZhihuContent(CompactRecord):
     """
     知乎内容（回答、文章、视频）
     """
-    content_id: str = Field(default="", description="内容ID")
-    content_type: str = Field(default="", description="内容类型(article | answer | zvideo)")
-    content_text: str = Field(default="", description="内容文本, 如果是视频类型这里为空")
-    content_url: str = Field(default="", description="内容落地链接")
-    question_id: str = Field(default="", description="问题ID, type为answer时有值")
-    title: str = Field(default="", description="内容标题")
-    desc: str = Field(default="", description="内容描述")
-    created_time: int = Field(default=0, description="创建时间")
-    updated_time: int = Field(default=0, description="更新时间")
-    voteup_count: int = Field(default=0, description="赞同人数")
-    comment_count: int = Field(default=0, description="评论数量")
-    source_keyword: str = Field(default="", description="来源关键词")
-
-    user_id: str = Field(default="", description="用户ID")
-    user_link: str = Field(default="", description="用户主页链接")
-    user_nickname: str = Field(default="", description="用户昵称")
-    user_avatar: str = Field(default="", description="用户头像地址")
-    user_url_token: str = Field(default="", description="用户url_token")
-
-
-class ZhihuComment(BaseModel):
+    FIELDS = (
+        ("content_id", "", "内容ID"),
+        ("content_type", "", "内容类型(article | answer | zvideo)"),
+        ("content_text", "", "内容文本, 如果是视频类型这里为空"),
+        ("content_url", "", "内容落地链接"),
+        ("question_id", "", "问题ID, type为answer时有值"),
+        ("title", "", "内容标题"),
+        ("desc", "", "内容描述"),
+        ("created_time", 0, "创建时间"),
+        ("updated_time", 0, "更新时间"),
+        ("voteup_count", 0, "赞同人数"),
+        ("comment_count", 0, "评论数量"),
+        ("source_keyword", "", "来源关键词"),
+
+        ("user_id", "", "用户ID"),
+        ("user_link", "", "用户主页链接"),
+        ("user_nickname", "", "用户昵称"),
+        ("user_avatar", "", "用户头像地址"),
+        ("user_url_token", "", "用户url_token"),
+    )
+    __slots__ = tuple(name for name, _, _ in FIELDS)
+
+
+class ZhihuComment(CompactRecord):
     """
     知乎评论
     """
+    FIELDS = (
+        ("comment_id", "", "评论ID"),
+        ("parent_comment_id", "", "父评论ID"),
+        ("content", "", "评论内容"),
+        ("publish_time", 0, "发布时间"),
+        ("ip_location", "", "IP地理位置"),
+        ("sub_comment_count", 0, "子评论数"),
+        ("like_count", 0, "点赞数"),
+        ("dislike_count", 0, "踩数"),
+        ("content_id", "", "内容ID"),
+        ("content_type", "", "内容类型(article | answer | zvideo)"),
 
-    comment_id: str = Field(default="", description="评论ID")
-    parent_comment_id: str = Field(default="", description="父评论ID")
-    content: str = Field(default="", description="评论内容")
-    publish_time: int = Field(default=0, description="发布时间")
-    ip_location: Optional[str] = Field(default="", description="IP地理位置")
-    sub_comment_count: int = Field(default=0, description="子评论数")
-    like_count: int = Field(default=0, description="点赞数")
-    dislike_count: int = Field(default=0, description="踩数")
-    content_id: str = Field(default="", description="内容ID")
-    content_type: str = Field(default="", description="内容类型(article | answer | zvideo)")
+        ("user_id", "", "用户ID"),
+        ("user_link", "", "用户主页链接"),
+        ("user_nickname", "", "用户昵称"),
+        ("user_avatar", "", "用户头像地址"),
+    )
+    __slots__ = tuple(name for name, _, _ in FIELDS)
 
-    user_id: str = Field(default="", description="用户ID")
-    user_link: str = Field(default="", description="用户主页链接")
-    user_nickname: str = Field(default="", description="用户昵称")
-    user_avatar: str = Field(default="", description="用户头像地址")
 
-
-class ZhihuCreator(BaseModel):
+class ZhihuCreator(CompactRecord):
     """
     知乎创作者
     """
-    user_id: str = Field(default="", description="用户ID")
-    user_link: str = Field(default="", description="用户主页链接")
-    user_nickname: str = Field(default="", description="用户昵称")
-    user_avatar: str = Field(default="", description="用户头像地址")
-    url_token: str = Field(default="", description="用户url_token")
-    gender: str = Field(default="", description="用户性别")
-    ip_location: Optional[str] = Field(default="", description="IP地理位置")
-    follows: int = Field(default=0, description="关注数")
-    fans: int = Field(default=0, description="粉丝数")
-    anwser_count: int = Field(default=0, description="回答数")
-    video_count: int = Field(default=0, description="视频数")
-    question_count: int = Field(default=0, description="提问数")
-    article_count: int = Field(default=0, description="文章数")
-    column_count: int = Field(default=0, description="专栏数")
-    get_voteup_count: int = Field(default=0, description="获得的赞同数")
-
+    FIELDS = (
+        ("user_id", "", "用户ID"),
+        ("user_link", "", "用户主页链接"),
+        ("user_nickname", "", "用户昵称"),
+        ("user_avatar", "", "用户头像地址"),
+        ("url_token", "", "用户url_token"),
+        ("gender", "", "用户性别"),
+        ("ip_location", "", "IP地理位置"),
+        ("follows", 0, "关注数"),
+        ("fans", 0, "粉丝数"),
+        ("anwser_count", 0, "回答数"),
+        ("video_count", 0, "视频数"),
+        ("question_count", 0, "提问数"),
+        ("article_count", 0, "文章数"),
+        ("column_count", 0, "专栏数"),
+        ("get_voteup_count", 0, "获得的赞同数"),
+    )
+    __slots__ = tuple(name for name, _, _ in FIELDS)
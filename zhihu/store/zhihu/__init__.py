@@ -50,9 +50,9 @@ async def update_zhihu_content(content_item: ZhihuContent):
 
     """
     content_item.source_keyword = source_keyword_var.get()
-    local_db_item = content_item.model_dump()
+    local_db_item = content_item.to_dict()
     local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.zhihu.update_zhihu_content] zhihu content: {local_db_item}")
+    utils.log_payload("[store.zhihu.update_zhihu_content] zhihu content: %s", local_db_item)
     await ZhihuStoreFactory.create_store().store_content(local_db_item)
 
 
@@ -82,9 +82,9 @@ async def update_zhihu_content_comment(comment_item: ZhihuComment):
     Returns:
 
     """
-    local_db_item = comment_item.model_dump()
+    local_db_item = comment_item.to_dict()
     local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.zhihu.update_zhihu_note_comment] zhihu content comment:{local_db_item}")
+    utils.log_payload("[store.zhihu.update_zhihu_note_comment] zhihu content comment: %s", local_db_item)
     await ZhihuStoreFactory.create_store().store_comment(local_db_item)
 
 
@@ -99,6 +99,6 @@ async def save_creator(creator: ZhihuCreator):
     """
     if not creator:
         return
-    local_db_item = creator.model_dump()
+    local_db_item = creator.to_dict()
     local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
     await ZhihuStoreFactory.create_store().store_creator(local_db_item)
\ No newline at end of file
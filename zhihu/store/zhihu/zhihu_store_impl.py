@@ -1,17 +1,20 @@
 # -*- coding: utf-8 -*-
 import asyncio
 import csv
-import json
 import os
 import pathlib
+import re
 from typing import Dict
 
 import aiofiles
 
 import config
 from base.base_crawler import AbstractStore
-from tools import utils, words
-from var import crawler_type_var
+from tools import json_codec, utils, words
+from var import crawler_type_var, source_keyword_var
+
+# 关键词中不能出现在文件名里的字符
+UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|\s]+')
 
 
 def calculate_number_of_files(file_store_path: str) -> int:
@@ -29,6 +32,19 @@ def calculate_number_of_files(file_store_path: str) -> int:
         return 1
 
 
+def make_file_tag() -> str:
+    """
+    数据文件名中的爬取类型部分，开启按关键词分区时带上当前的来源关键词
+    Returns:
+        eg: search_人工智能
+    """
+    crawler_type = crawler_type_var.get()
+    keyword = source_keyword_var.get()
+    if not config.PARTITION_OUTPUT_BY_KEYWORD or not keyword:
+        return crawler_type
+    return f"{crawler_type}_{UNSAFE_FILENAME_CHARS.sub('-', keyword)}"
+
+
 class ZhihuCsvStoreImplement(AbstractStore):
     csv_store_path: str = "data/zhihu"
     file_count: int = calculate_number_of_files(csv_store_path)
@@ -39,10 +55,10 @@ class ZhihuCsvStoreImplement(AbstractStore):
         Args:
             store_type: contents or comments
 
-        Returns: eg: data/zhihu/search_comments_20240114.csv ...
+        Returns: eg: data/zhihu/1_search_人工智能_comments_20240114.csv ...
 
         """
-        return f"{self.csv_store_path}/{self.file_count}_{crawler_type_var.get()}_{store_type}_{utils.get_current_date()}.csv"
+        return f"{self.csv_store_path}/{self.file_count}_{make_file_tag()}_{store_type}_{utils.get_current_date()}.csv"
 
     async def save_data_to_csv(self, save_item: Dict, store_type: str):
         """
@@ -176,9 +192,10 @@ class ZhihuJsonStoreImplement(AbstractStore):
 
         """
 
+        file_tag = make_file_tag()
         return (
-            f"{self.json_store_path}/{crawler_type_var.get()}_{store_type}_{utils.get_current_date()}.json",
-            f"{self.words_store_path}/{crawler_type_var.get()}_{store_type}_{utils.get_current_date()}"
+            f"{self.json_store_path}/{file_tag}_{store_type}_{utils.get_current_date()}.json",
+            f"{self.words_store_path}/{file_tag}_{store_type}_{utils.get_current_date()}"
         )
 
     async def save_data_to_json(self, save_item: Dict, store_type: str):
@@ -199,11 +216,12 @@ class ZhihuJsonStoreImplement(AbstractStore):
         async with self.lock:
             if os.path.exists(save_file_name):
                 async with aiofiles.open(save_file_name, 'r', encoding='utf-8') as file:
-                    save_data = json.loads(await file.read())
+                    save_data = json_codec.loads(await file.read())
 
             save_data.append(save_item)
+            # 安装了orjson时文件缩进2个空格，否则4个空格，见 tools/json_codec.py
             async with aiofiles.open(save_file_name, 'w', encoding='utf-8') as file:
-                await file.write(json.dumps(save_data, ensure_ascii=False, indent=4))
+                await file.write(json_codec.dumps(save_data, pretty=True))
 
             if config.ENABLE_GET_COMMENTS and config.ENABLE_GET_WORDCLOUD:
                 try:
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import config
+from media_platform.zhihu.checkpoint import CrawlCheckpoint
+from model.m_zhihu import ZhihuContent
+
+
+class TestCrawlCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp_dir.name, "zhihu", "checkpoint.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_resume_after_restart(self):
+        checkpoint = CrawlCheckpoint(self.file_path)
+        checkpoint.set_search_page("python", 3)
+        checkpoint.add_pending_contents([
+            ZhihuContent(content_id="1", content_type="answer", content_text="long text", comment_count=12),
+            ZhihuContent(content_id="2", content_type="article"),
+        ])
+        checkpoint.set_comment_offset("1", "offset-1")
+        checkpoint.set_comments_done("2")
+        checkpoint.set_creator_offset("creator", 40)
+        checkpoint.set_creator_offset("creator", 20, "zvideo")
+        checkpoint.set_detail_done("https://zhuanlan.zhihu.com/p/1")
+
+        restored = CrawlCheckpoint(self.file_path)
+        self.assertEqual(restored.get_search_page("python"), 3)
+        self.assertFalse(restored.is_search_done("python"))
+        self.assertEqual(restored.get_comment_offset("1"), "offset-1")
+        self.assertEqual(
+            [(c.content_id, c.content_type, c.content_text, c.comment_count) for c in restored.pending_contents()],
+            [("1", "answer", "", 12)],
+        )
+        self.assertEqual(restored.get_creator_offset("creator"), 40)
+        self.assertEqual(restored.get_creator_offset("creator", "zvideo"), 20)
+        self.assertEqual(restored.get_creator_offset("creator", "article"), 0)
+        self.assertFalse(restored.is_creator_done("creator"))
+        self.assertTrue(restored.is_detail_done("https://zhuanlan.zhihu.com/p/1"))
+        self.assertFalse(os.path.exists(self.file_path + ".tmp"))
+
+    def test_finished_comments_pruned(self):
+        checkpoint = CrawlCheckpoint(self.file_path)
+        contents = [ZhihuContent(content_id=str(i), content_type="answer") for i in range(3)]
+        checkpoint.add_pending_contents(contents)
+        checkpoint.set_comments_done("0")
+        checkpoint.set_comments_done("1")
+        self.assertTrue(checkpoint.is_comments_done("0"))
+        # 同一次运行中再次遇到抓完的内容不会重新加入
+        checkpoint.add_pending_contents(contents[:1])
+
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            self.assertEqual(list(json.load(f)["comments"]), ["2"])
+        self.assertEqual([c.content_id for c in CrawlCheckpoint(self.file_path).pending_contents()], ["2"])
+
+    def test_save_interval(self):
+        checkpoint = CrawlCheckpoint(self.file_path, save_interval=60)
+        checkpoint.set_search_page("python", 1)
+        checkpoint.set_search_page("python", 2)
+        checkpoint.set_search_page("python", 3)
+        # 第一次更新立即写入，之后的更新等到间隔之后或者 flush
+        self.assertEqual(CrawlCheckpoint(self.file_path).get_search_page("python"), 1)
+        with mock.patch("media_platform.zhihu.checkpoint.open", wraps=open) as patched_open:
+            checkpoint.flush()
+            checkpoint.flush()
+        self.assertEqual(patched_open.call_count, 1)
+        self.assertEqual(CrawlCheckpoint(self.file_path).get_search_page("python"), 3)
+
+    def test_file_per_crawler_type(self):
+        with mock.patch.object(config, "CHECKPOINT_FILE", self.file_path), \
+                mock.patch.object(config, "ENABLE_CHECKPOINT", True):
+            search = CrawlCheckpoint.from_config("search")
+            creator = CrawlCheckpoint.from_config("creator")
+        search.set_search_page("python", 3)
+        creator.set_creator_done("u1")
+        # 创作者模式跑完清除检查点，不影响中断的搜索
+        creator.clear()
+        self.assertTrue(search.file_path.endswith("checkpoint_search.json"))
+        self.assertEqual(CrawlCheckpoint(search.file_path).get_search_page("python"), 3)
+        self.assertFalse(os.path.exists(creator.file_path))
+
+    def test_clear(self):
+        checkpoint = CrawlCheckpoint(self.file_path)
+        checkpoint.set_search_page("python", 3)
+        checkpoint.clear()
+        self.assertFalse(os.path.exists(self.file_path))
+        self.assertEqual(checkpoint.get_search_page("python"), 0)
+
+    def test_memory_only(self):
+        checkpoint = CrawlCheckpoint()
+        checkpoint.set_creator_offset("creator", 20)
+        checkpoint.set_creator_done("creator")
+        self.assertTrue(checkpoint.is_creator_done("creator"))
+        self.assertEqual(checkpoint.get_creator_offset("creator"), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,6 +25,13 @@ class TestExpiringLocalCache(unittest.TestCase):
         time.sleep(12)
         self.assertIsNone(self.cache.get('key'))
 
+    def test_clear_expired_keys(self):
+        self.cache.set('key1', 'value', -1)
+        self.cache.set('key2', 'value', -1)
+        self.cache.set('key3', 'value', 10)
+        self.cache._clear()
+        self.assertEqual(self.cache.keys('*'), ['key3'])
+
     def tearDown(self):
         del self.cache
 
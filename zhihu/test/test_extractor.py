@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from benchmark import bench_extractor
+from media_platform.zhihu.help import ZhihuExtractor
+
+
+class TestExtractorFixtures(unittest.TestCase):
+
+    def setUp(self):
+        self.cases = bench_extractor.build_cases(ZhihuExtractor())
+
+    def test_every_method_has_records(self):
+        self.assertEqual(self.cases["extract_contents_from_search"][1], 20)
+        self.assertEqual(self.cases["extract_comments"][1], 20)
+        for name, (_, record_count) in self.cases.items():
+            with self.subTest(method=name):
+                self.assertGreater(record_count, 0)
+
+    def test_extracted_fields(self):
+        contents = self.cases["extract_contents_from_search"][0]()
+        self.assertEqual(contents[0].content_type, "answer")
+        self.assertNotIn("<p", contents[0].content_text)
+        self.assertIn("<3", contents[0].content_text)
+        self.assertIn("&", contents[0].content_text)
+        comments = self.cases["extract_comments"][0]()
+        self.assertEqual(comments[0].content_id, "3100000000")
+        self.assertTrue(comments[0].ip_location)
+        creator = self.cases["extract_creator"][0]()[0]
+        self.assertEqual(creator.url_token, "user-3")
+        self.assertEqual(creator.anwser_count, 88)
+        zvideo = self.cases["extract_zvideo_content_from_html"][0]()[0]
+        self.assertEqual(zvideo.user_url_token, "user-2")
+
+    def test_compare_with_baseline(self):
+        baseline = {"a": 100.0, "b": 100.0}
+        results = {"a": 71.0, "b": 69.0, "c": 1.0}
+        self.assertEqual(bench_extractor.compare_with_baseline(results, baseline, 0.3), ["b"])
+        self.assertEqual(bench_extractor.compare_with_baseline(results, {}, 0.3), [])
+
+    def test_environment_mismatch(self):
+        baseline = dict(bench_extractor.environment(), results={})
+        self.assertEqual(bench_extractor.environment_mismatch(baseline), [])
+        baseline["json_codec"] = "other"
+        mismatch = bench_extractor.environment_mismatch(baseline)
+        self.assertEqual(len(mismatch), 1)
+        self.assertTrue(mismatch[0].startswith("json_codec: other != "))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import html
+import os
+import re
+import time
+import unittest
+
+from tools import json_codec, utils
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmark", "fixtures")
+
+
+def legacy_extract_text_from_html(html_text: str) -> str:
+    if not html_text:
+        return ""
+    clean_html = re.sub(r'<(script|style)[^>]*>.*?</\1>', '', html_text, flags=re.DOTALL)
+    return re.sub(r'<[^>]+>', '', clean_html).strip()
+
+
+class TestExtractTextFromHtml(unittest.TestCase):
+
+    def test_basic(self):
+        self.assertEqual(utils.extract_text_from_html(""), "")
+        self.assertEqual(utils.extract_text_from_html(None), "")
+        self.assertEqual(utils.extract_text_from_html("<p>如何看待<em>教育</em>？</p>"), "如何看待教育？")
+        self.assertEqual(utils.extract_text_from_html("a<br/>b"), "ab")
+
+    def test_script_and_style(self):
+        self.assertEqual(utils.extract_text_from_html("a<script type='x'>var b = 1 > 0;</script>c<STYLE>p{}</STYLE>d"), "acd")
+        # 没有闭合的script之后都是脚本内容
+        self.assertEqual(utils.extract_text_from_html("a<script>var b;<p>c</p>"), "a")
+
+    def test_entities(self):
+        self.assertEqual(utils.extract_text_from_html("<p>1 &lt; 2 &amp;&amp; 3 &gt; 2&nbsp;&#20013;</p>"), "1 < 2 && 3 > 2\xa0中")
+        # 解码出来的标签不再当作标签处理
+        self.assertEqual(utils.extract_text_from_html("&lt;b&gt;x&lt;/b&gt;"), "<b>x</b>")
+
+    def test_unclosed_tag_kept_as_text(self):
+        self.assertEqual(utils.extract_text_from_html("<b>x</b> a < b"), "x a < b")
+
+    def test_equivalent_to_legacy_on_fixtures(self):
+        with open(os.path.join(FIXTURES_DIR, "search_result.json"), "rb") as f:
+            data = json_codec.loads(f.read())["data"]
+        checked = 0
+        for item in data:
+            content = item.get("object") or {}
+            for key in ("content", "title", "excerpt", "description"):
+                if content.get(key):
+                    self.assertEqual(utils.extract_text_from_html(content[key]),
+                                     html.unescape(legacy_extract_text_from_html(content[key])))
+                    checked += 1
+        self.assertGreater(checked, 20)
+
+    def test_pathological_input_is_linear(self):
+        for html_text in ("<" * 200000, "<a " * 100000, "<script>" * 20000 + "a" * 20000, "<b>x</b><" * 50000):
+            start = time.perf_counter()
+            utils.extract_text_from_html(html_text)
+            self.assertLess(time.perf_counter() - start, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
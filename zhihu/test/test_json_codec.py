@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+
+from tools import json_codec
+
+DATA = {"data": [{"id": "1", "title": "教育", "voteup_count": 12, "author": None, "hot": True, "score": 1.5}]}
+
+
+class TestJsonCodec(unittest.TestCase):
+
+    def test_codecs_consistent(self):
+        for name, (loads, dumps) in json_codec.CODECS.items():
+            with self.subTest(codec=name):
+                text = dumps(DATA)
+                self.assertIsInstance(text, str)
+                self.assertIn("教育", text)
+                self.assertEqual(loads(text), DATA)
+                self.assertEqual(loads(text.encode("utf-8")), DATA)
+                self.assertEqual(json.loads(dumps(DATA, pretty=True)), DATA)
+                self.assertIn("\n", dumps(DATA, pretty=True))
+
+    def test_invalid_json(self):
+        for name, (loads, _) in json_codec.CODECS.items():
+            with self.subTest(codec=name):
+                with self.assertRaises(ValueError):
+                    loads(b"<html>403</html>")
+
+    def test_default_backend(self):
+        self.assertEqual(json_codec.BACKEND, next(iter(json_codec.CODECS)))
+        self.assertIn("json", json_codec.CODECS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import httpx
+from tenacity import wait_none
+
+from media_platform.zhihu.client import ZhiHuClient
+from media_platform.zhihu.exception import DataFetchError
+from media_platform.zhihu.metrics import RequestMetrics, classify_route
+
+
+class TestClassifyRoute(unittest.TestCase):
+
+    def test_classify(self):
+        base = "https://www.zhihu.com"
+        self.assertEqual(classify_route(f"{base}/api/v4/search_v3?q=python"), "search_v3")
+        self.assertEqual(classify_route(f"{base}/api/v4/comment_v5/answers/1/root_comment?offset="), "root_comment")
+        self.assertEqual(classify_route(f"{base}/api/v4/comment_v5/comment/1/child_comment"), "child_comment")
+        self.assertEqual(classify_route(f"{base}/api/v4/members/abc/answers"), "members")
+        self.assertEqual(classify_route(f"{base}/api/v4/me"), "me")
+        self.assertEqual(classify_route(f"{base}/question/1/answer/2"), "answer_page")
+        self.assertEqual(classify_route("https://zhuanlan.zhihu.com/p/1"), "article_page")
+        self.assertEqual(classify_route(f"{base}/zvideo/1"), "zvideo_page")
+        self.assertEqual(classify_route(f"{base}/people/abc"), "people_page")
+        self.assertEqual(classify_route(f"{base}/unknown"), "other")
+
+
+class TestRequestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_observe(self):
+        metrics = RequestMetrics()
+        metrics.observe("search_v3", 200, 0.03, 100)
+        metrics.observe("search_v3", 200, 0.3, 200)
+        metrics.observe("search_v3", 403, 20, 10)
+        metrics.record_retry("search_v3")
+        stats = metrics.routes["search_v3"]
+        self.assertEqual(stats.count, 3)
+        self.assertEqual(stats.status_counts, {"200": 2, "403": 1})
+        self.assertEqual(stats.bytes_received, 310)
+        self.assertEqual(stats.retries, 1)
+        self.assertEqual(stats.latency_quantile(0.5), 0.5)
+        self.assertEqual(stats.latency_quantile(1), 20)
+
+        text = metrics.to_prometheus()
+        self.assertIn('zhihu_request_duration_seconds_bucket{route="search_v3",le="0.05"} 1', text)
+        self.assertIn('zhihu_request_duration_seconds_bucket{route="search_v3",le="+Inf"} 3', text)
+        self.assertIn('zhihu_requests_total{route="search_v3",status="403"} 1', text)
+        self.assertIn('zhihu_request_retries_total{route="search_v3"} 1', text)
+
+    def test_export(self):
+        file_path = os.path.join(self.tmp_dir.name, "metrics", "metrics.json")
+        metrics = RequestMetrics(file_path, "json", export_interval=0)
+        metrics.export()
+        self.assertFalse(os.path.exists(file_path))
+        # 到达导出间隔时在记录请求时导出
+        metrics.observe("me", 200, 0.1, 10)
+        with open(file_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["routes"]["me"]["count"], 1)
+
+    def test_default_export_off(self):
+        self.assertIsNone(RequestMetrics.from_config().file_path)
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            RequestMetrics(None, "csv")
+
+
+class TestMetricsExportInLoop(unittest.IsolatedAsyncioTestCase):
+
+    async def test_export_in_thread(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "metrics.json")
+            metrics = RequestMetrics(file_path, "json", export_interval=0)
+            with mock.patch.object(metrics, "_write", wraps=metrics._write) as write:
+                metrics.observe("me", 200, 0.1, 10)
+                # 记录请求时不在事件循环中写文件
+                write.assert_not_called()
+                metrics.observe("me", 200, 0.1, 10)
+                await metrics.flush()
+            self.assertGreaterEqual(write.call_count, 2)
+            with open(file_path, encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["routes"]["me"]["count"], 2)
+
+
+class TestClientMetrics(unittest.IsolatedAsyncioTestCase):
+
+    async def test_request_is_instrumented(self):
+        responses = iter([httpx.Response(500, text="busy"), httpx.Response(200, content=b'{"data":[]}')])
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: next(responses)))
+        client = ZhiHuClient(headers={}, cookie_dict={})
+        client._get_client = lambda: http_client
+
+        with mock.patch.object(ZhiHuClient.request.retry, "wait", wait_none()):
+            data = await client.request("GET", "https://www.zhihu.com/api/v4/search_v3?q=python")
+        self.assertEqual(data, {"data": []})
+
+        stats = client.metrics.routes["search_v3"]
+        self.assertEqual(stats.status_counts, {"500": 1, "200": 1})
+        self.assertEqual(stats.retries, 1)
+        self.assertEqual(stats.bytes_received, len(b"busy") + len(b'{"data":[]}'))
+        await http_client.aclose()
+
+    async def test_transport_error(self):
+        def raise_error(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(raise_error))
+        client = ZhiHuClient(headers={}, cookie_dict={})
+        client._get_client = lambda: http_client
+
+        with mock.patch.object(ZhiHuClient.request.retry, "wait", wait_none()):
+            with self.assertRaises(DataFetchError):
+                await client.request("GET", "https://www.zhihu.com/api/v4/me")
+        stats = client.metrics.routes["me"]
+        self.assertEqual(stats.status_counts, {"ConnectError": 3})
+        self.assertEqual(stats.retries, 2)
+        await http_client.aclose()
+
+
+if __name__ == '__main__':
+    unittest.main()
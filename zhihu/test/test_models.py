@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import pickle
+import unittest
+
+from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
+
+
+class TestCompactRecord(unittest.TestCase):
+
+    def test_defaults(self):
+        content = ZhihuContent()
+        self.assertEqual(content.content_id, "")
+        self.assertEqual(content.voteup_count, 0)
+        self.assertFalse(hasattr(content, "__dict__"))
+        self.assertEqual(ZhihuCreator().ip_location, "")
+
+    def test_keyword_arguments(self):
+        comment = ZhihuComment(comment_id="1", like_count=3)
+        self.assertEqual(comment.comment_id, "1")
+        self.assertEqual(comment.like_count, 3)
+        self.assertEqual(comment.content, "")
+        with self.assertRaises(TypeError):
+            ZhihuComment(unknown_field=1)
+        with self.assertRaises(AttributeError):
+            comment.unknown_field = 1
+
+    def test_to_dict(self):
+        content = ZhihuContent(content_id="1", content_type="answer", title="教育")
+        data = content.to_dict()
+        self.assertEqual(list(data), list(ZhihuContent.field_names()))
+        self.assertEqual(data["title"], "教育")
+        self.assertEqual(content.to_dict(include={"content_id", "content_type"}),
+                         {"content_id": "1", "content_type": "answer"})
+        self.assertEqual(ZhihuContent(**data), content)
+
+    def test_equality_and_pickle(self):
+        comment = ZhihuComment(comment_id="1", content="hello")
+        self.assertEqual(comment, ZhihuComment(comment_id="1", content="hello"))
+        self.assertNotEqual(comment, ZhihuComment(comment_id="2", content="hello"))
+        self.assertEqual(pickle.loads(pickle.dumps(comment)), comment)
+        self.assertIn("comment_id='1'", repr(comment))
+
+
+if __name__ == '__main__':
+    unittest.main()
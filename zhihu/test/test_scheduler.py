@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+import unittest
+
+from media_platform.zhihu.field import CrawlTaskType
+from media_platform.zhihu.scheduler import CircuitBreaker, CrawlScheduler, classify_uri
+
+PRIORITIES = {"search": 0, "detail": 1, "creator": 2, "comment": 3}
+
+
+class TestCrawlScheduler(unittest.IsolatedAsyncioTestCase):
+
+    async def test_priority_order(self):
+        scheduler = CrawlScheduler(max_concurrency=1, priorities=PRIORITIES)
+        order = []
+
+        async def job(name, task_type):
+            async with scheduler.slot(task_type):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        async with scheduler.slot(CrawlTaskType.DETAIL):
+            tasks = [
+                asyncio.create_task(job("comment-1", CrawlTaskType.COMMENT)),
+                asyncio.create_task(job("creator", CrawlTaskType.CREATOR)),
+                asyncio.create_task(job("comment-2", CrawlTaskType.COMMENT)),
+                asyncio.create_task(job("search", CrawlTaskType.SEARCH)),
+            ]
+            await asyncio.sleep(0.01)
+            self.assertEqual(scheduler.waiting, 4)
+        await asyncio.gather(*tasks)
+
+        self.assertEqual(order, ["search", "creator", "comment-1", "comment-2"])
+        self.assertEqual(scheduler.running, 0)
+
+    async def test_max_concurrency(self):
+        scheduler = CrawlScheduler(max_concurrency=3, priorities=PRIORITIES)
+        peak = 0
+
+        async def job():
+            nonlocal peak
+            async with scheduler.slot(CrawlTaskType.COMMENT):
+                peak = max(peak, scheduler.running)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[job() for _ in range(10)])
+        self.assertEqual(peak, 3)
+        self.assertEqual(scheduler.request_counts["comment"], 10)
+
+    async def test_rate_limit(self):
+        scheduler = CrawlScheduler(max_concurrency=5, rate_per_sec=50, priorities=PRIORITIES)
+
+        async def job():
+            async with scheduler.slot(CrawlTaskType.DETAIL):
+                pass
+
+        start = time.monotonic()
+        await asyncio.gather(*[job() for _ in range(6)])
+        # 第一个请求用掉初始令牌，之后每个间隔 1/50 秒
+        self.assertGreaterEqual(time.monotonic() - start, 5 / 50 - 0.01)
+
+    async def test_cancelled_waiter_releases_slot(self):
+        scheduler = CrawlScheduler(max_concurrency=1, priorities=PRIORITIES)
+
+        async def job():
+            async with scheduler.slot(CrawlTaskType.COMMENT):
+                pass
+
+        async with scheduler.slot(CrawlTaskType.DETAIL):
+            task = asyncio.create_task(job())
+            await asyncio.sleep(0)
+            task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(scheduler.running, 0)
+        self.assertEqual(scheduler.waiting, 0)
+        await job()
+
+
+    async def test_pause(self):
+        scheduler = CrawlScheduler(max_concurrency=2, priorities=PRIORITIES)
+        scheduler.pause(0.1)
+        scheduler.pause(0.05)
+        start = time.monotonic()
+        async with scheduler.slot(CrawlTaskType.SEARCH):
+            pass
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+        self.assertEqual(scheduler.paused_for, 0)
+
+    async def test_record_result_without_breaker(self):
+        scheduler = CrawlScheduler(priorities=PRIORITIES)
+        for _ in range(50):
+            scheduler.record_result("search_v3", ok=False)
+        self.assertEqual(scheduler.pause_count, 0)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_trip(self):
+        breaker = CircuitBreaker(window=10, min_requests=4, failure_ratio=0.5)
+        self.assertFalse(breaker.record("search_v3", ok=False))
+        self.assertFalse(breaker.record("search_v3", ok=False))
+        self.assertFalse(breaker.record("search_v3", ok=False))
+        self.assertEqual(breaker.failure_rate("search_v3"), 1)
+        self.assertTrue(breaker.record("search_v3", ok=True))
+        # 触发后重新统计
+        self.assertEqual(breaker.failure_rate("search_v3"), 0)
+
+    def test_window(self):
+        breaker = CircuitBreaker(window=4, min_requests=4, failure_ratio=0.5)
+        for ok in (False, True, True, True, True, False):
+            self.assertFalse(breaker.record("root_comment", ok=ok))
+        self.assertEqual(breaker.failure_rate("root_comment"), 0.25)
+
+    def test_routes_are_separate(self):
+        breaker = CircuitBreaker(window=4, min_requests=2, failure_ratio=0.5)
+        self.assertFalse(breaker.record("search_v3", ok=False))
+        self.assertFalse(breaker.record("members", ok=True))
+        self.assertFalse(breaker.record("members", ok=True))
+        self.assertTrue(breaker.record("search_v3", ok=False))
+
+
+class TestClassifyUri(unittest.TestCase):
+
+    def test_classify(self):
+        self.assertEqual(classify_uri("/api/v4/search_v3"), CrawlTaskType.SEARCH)
+        self.assertEqual(classify_uri("/api/v4/comment_v5/answers/1/root_comment"), CrawlTaskType.COMMENT)
+        self.assertEqual(classify_uri("/api/v4/comment_v5/comment/1/child_comment"), CrawlTaskType.COMMENT)
+        self.assertEqual(classify_uri("/people/abc"), CrawlTaskType.CREATOR)
+        self.assertEqual(classify_uri("/api/v4/members/abc/answers"), CrawlTaskType.CREATOR)
+        self.assertEqual(classify_uri("/question/1/answer/2"), CrawlTaskType.DETAIL)
+        self.assertEqual(classify_uri("/p/1"), CrawlTaskType.DETAIL)
+
+
+if __name__ == '__main__':
+    unittest.main()
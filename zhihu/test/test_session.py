@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import config
+from media_platform.zhihu import ZhihuCrawler
+from media_platform.zhihu import core as zhihu_core
+from media_platform.zhihu.checkpoint import CrawlCheckpoint
+from media_platform.zhihu.client import ZhiHuClient
+from media_platform.zhihu.session import SessionStore
+
+COOKIES = [
+    {"name": "d_c0", "value": "d_c0_value", "expires": -1},
+    {"name": "z_c0", "value": "z_c0_value", "expires": time.time() + 3600},
+    {"name": "old", "value": "old_value", "expires": time.time() - 3600},
+]
+
+
+class TestSessionStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp_dir.name, "browser_data", "zhihu_session.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_save_and_load(self):
+        store = SessionStore(self.file_path)
+        self.assertEqual(store.load(), [])
+        store.save(COOKIES)
+        # 过期的cookie不再使用
+        self.assertEqual([cookie["name"] for cookie in SessionStore(self.file_path).load()], ["d_c0", "z_c0"])
+        if os.name == "posix":
+            self.assertEqual(os.stat(self.file_path).st_mode & 0o777, 0o600)
+        store.clear()
+        self.assertFalse(os.path.exists(self.file_path))
+
+    def test_invalid_file(self):
+        os.makedirs(os.path.dirname(self.file_path))
+        with open(self.file_path, "w") as f:
+            f.write("{")
+        self.assertEqual(SessionStore(self.file_path).load(), [])
+
+
+class TestWarmStart(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.session_store = SessionStore(os.path.join(self.tmp_dir.name, "zhihu_session.json"))
+        self.session_store.save(COOKIES)
+
+        self.crawler = ZhihuCrawler()
+        self.crawler.checkpoint = CrawlCheckpoint()
+        self.crawler.session_store = self.session_store
+        self.search = mock.AsyncMock(return_value=True)
+        self.crawler.search = self.search
+
+        patches = [
+            mock.patch.object(config, "ENABLE_IP_PROXY", False),
+            mock.patch.object(config, "CRAWLER_TYPE", "search"),
+            mock.patch.object(config, "ENABLE_INCREMENTAL_COMMENTS", False),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def test_skip_browser_with_valid_session(self):
+        with mock.patch.object(ZhiHuClient, "pong", mock.AsyncMock(return_value=True)), \
+                mock.patch.object(zhihu_core, "async_playwright") as playwright:
+            await self.crawler.start()
+
+        playwright.assert_not_called()
+        self.search.assert_awaited_once()
+        self.assertEqual(self.crawler.zhihu_client.cookie_dict, {"d_c0": "d_c0_value", "z_c0": "z_c0_value"})
+        self.assertIsNone(self.crawler.browser_context)
+
+    async def test_invalid_session_falls_back_to_browser(self):
+        with mock.patch.object(ZhiHuClient, "pong", mock.AsyncMock(return_value=False)), \
+                mock.patch.object(zhihu_core, "async_playwright", side_effect=RuntimeError("browser")):
+            with self.assertRaises(RuntimeError):
+                await self.crawler.start()
+
+        self.search.assert_not_awaited()
+        self.assertEqual(self.session_store.load(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
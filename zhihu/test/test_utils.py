@@ -1,4 +1,11 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import itertools
+import logging
+import queue
+from unittest import mock
+
+import config
 from tools import utils
 
 
@@ -7,3 +14,74 @@ def test_convert_cookies():
     cookie_dict = utils.convert_str_cookie_to_dict(xhs_cookies)
     assert cookie_dict.get("webId") == "1190c4d3cxxxx125xxx"
     assert cookie_dict.get("a1") == "x000101360"
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__(level=logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_log_payload_sampled_and_lazy():
+    handler = _ListHandler()
+    utils.logger.addHandler(handler)
+    level = utils.logger.level
+    calls = []
+
+    class Payload:
+        def __repr__(self):
+            calls.append(1)
+            return "payload"
+
+    try:
+        with mock.patch.object(config, "LOG_PAYLOAD_SAMPLE_RATE", 3), \
+                mock.patch.object(utils, "_payload_counter", itertools.count()):
+            # INFO级别下不输出也不格式化
+            utils.logger.setLevel(logging.INFO)
+            utils.log_payload("data: %r", Payload())
+            assert handler.records == []
+            assert calls == []
+
+            utils.logger.setLevel(logging.DEBUG)
+            for _ in range(7):
+                utils.log_payload("data: %r", Payload())
+    finally:
+        utils.logger.setLevel(level)
+        utils.logger.removeHandler(handler)
+
+    assert len(handler.records) == 3
+    assert handler.records[0].getMessage() == "data: payload"
+    assert handler.records[0].filename == "test_utils.py"
+
+
+def test_deferred_queue_handler_keeps_args():
+    log_queue = queue.SimpleQueue()
+    handler = utils.DeferredQueueHandler(log_queue)
+    payload = {"a": 1}
+    record = logging.LogRecord("MediaCrawler", logging.DEBUG, __file__, 1, "%s: %s", ("data", payload), None)
+    handler.handle(record)
+    queued = log_queue.get_nowait()
+    # 消息在队列的另一端才格式化
+    assert queued.msg == "%s: %s"
+    assert queued.args[1] is payload
+    assert queued.getMessage() == "data: {'a': 1}"
+
+
+def test_cancel_and_drain():
+    async def fail():
+        raise ValueError("boom")
+
+    async def run():
+        failed = asyncio.create_task(fail())
+        pending = asyncio.create_task(asyncio.sleep(10))
+        await asyncio.sleep(0)
+        await utils.cancel_and_drain([failed, pending])
+        return failed, pending
+
+    failed, pending = asyncio.run(run())
+    assert pending.cancelled()
+    # 失败任务的异常已经被取回
+    assert isinstance(failed.exception(), ValueError)
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import httpx
+
+import config
+from media_platform.zhihu.client import ZhiHuClient, parse_retry_after
+from media_platform.zhihu.exception import DataFetchError, ForbiddenError, ServerBusyError
+from media_platform.zhihu.scheduler import CircuitBreaker, CrawlScheduler
+from media_platform.zhihu.seen_index import SeenContentIndex
+from model.m_zhihu import ZhihuComment, ZhihuContent
+
+
+class TestZhiHuClientPool(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.client = ZhiHuClient(headers={}, playwright_page=None, cookie_dict={})
+
+    async def test_client_is_reused(self):
+        http_client = self.client._get_client()
+        self.assertIs(self.client._get_client(), http_client)
+
+    async def test_close_and_recreate(self):
+        http_client = self.client._get_client()
+        await self.client.close()
+        self.assertTrue(http_client.is_closed)
+        self.assertIsNot(self.client._get_client(), http_client)
+
+    async def test_close_without_client(self):
+        await self.client.close()
+        self.assertIsNone(self.client._client)
+
+    async def test_close_is_idempotent(self):
+        self.client._get_client()
+        with mock.patch.object(self.client.metrics, "export") as export, \
+                mock.patch.object(self.client.scheduler, "log_stats") as log_stats:
+            await self.client.close()
+            await self.client.close()
+            self.assertEqual((export.call_count, log_stats.call_count), (1, 1))
+
+            # 重新使用后再次关闭会输出新的统计
+            self.client._get_client()
+            await self.client.close()
+            self.assertEqual(export.call_count, 2)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+
+class TestZhiHuClientResponseCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.client = ZhiHuClient(headers={}, playwright_page=None, cookie_dict={})
+        self.client._pre_headers = mock.AsyncMock(return_value={})
+        self.client.request = mock.AsyncMock(return_value="<html>creator</html>")
+
+    async def test_cached_endpoint(self):
+        first = await self.client.get("/people/abc", return_response=True)
+        second = await self.client.get("/people/abc/", return_response=True)
+        self.assertEqual(first, second)
+        self.assertEqual(self.client.request.await_count, 1)
+        self.assertEqual((self.client.cache_hits, self.client.cache_misses), (1, 1))
+        self.assertEqual(self.client.cache_hit_rate(), 0.5)
+
+    async def test_params_are_normalized(self):
+        self.assertEqual(
+            ZhiHuClient._response_cache_key("/p/1", {"b": 2, "a": 1}, False),
+            ZhiHuClient._response_cache_key("/p/1", {"a": 1, "b": 2}, False),
+        )
+
+    async def test_uncached_endpoint(self):
+        self.client.request.return_value = {"data": []}
+        await self.client.get("/api/v4/search_v3", {"q": "python"})
+        await self.client.get("/api/v4/search_v3", {"q": "python"})
+        self.assertEqual(self.client.request.await_count, 2)
+        self.assertEqual(self.client.cache_hits + self.client.cache_misses, 0)
+
+    async def test_empty_response_not_cached(self):
+        self.client.request.return_value = {}
+        await self.client.get("/question/1/answer/2")
+        await self.client.get("/question/1/answer/2")
+        self.assertEqual(self.client.request.await_count, 2)
+
+    async def test_redis_cache_runs_in_thread(self):
+        calls = []
+
+        class FakeRedisCache:
+            def __init__(self):
+                self.values = {}
+
+            def get(self, key):
+                calls.append(("get", threading.get_ident()))
+                return self.values.get(key)
+
+            def set(self, key, value, expire_time):
+                calls.append(("set", threading.get_ident()))
+                self.values[key] = value
+
+        self.client._response_cache = FakeRedisCache()
+        with mock.patch.object(config, "RESPONSE_CACHE_TYPE", "redis"):
+            await self.client.get("/people/abc", return_response=True)
+            await self.client.get("/people/abc", return_response=True)
+        self.assertEqual([name for name, _ in calls], ["get", "set", "get"])
+        self.assertNotIn(threading.get_ident(), [ident for _, ident in calls])
+        self.assertEqual(self.client.request.await_count, 1)
+
+
+class TestZhiHuClientRetry(unittest.IsolatedAsyncioTestCase):
+    URL = "https://www.zhihu.com/api/v4/search_v3?q=python"
+
+    async def asyncSetUp(self):
+        self.responses = []
+        self.http_client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        breaker = CircuitBreaker(window=4, min_requests=4, failure_ratio=0.5, cooldown=30)
+        self.client = ZhiHuClient(headers={}, cookie_dict={}, scheduler=CrawlScheduler(breaker=breaker))
+        self.client._get_client = lambda: self.http_client
+        self.sleep = mock.AsyncMock()
+        patcher = mock.patch.object(ZhiHuClient.request.retry, "sleep", self.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def handler(self, request):
+        return self.responses.pop(0)
+
+    async def test_forbidden_not_retried(self):
+        self.responses = [httpx.Response(403, text="forbidden")]
+        with self.assertRaises(ForbiddenError):
+            await self.client.request("GET", self.URL)
+        self.sleep.assert_not_awaited()
+
+    async def test_not_found_not_retried(self):
+        self.responses = [httpx.Response(404, text="")]
+        self.assertEqual(await self.client.request("GET", self.URL), {})
+        self.sleep.assert_not_awaited()
+
+    async def test_client_error_not_retried(self):
+        self.responses = [httpx.Response(400, text="bad request")]
+        with self.assertRaises(DataFetchError):
+            await self.client.request("GET", self.URL)
+        self.sleep.assert_not_awaited()
+
+    async def test_server_error_backoff(self):
+        self.responses = [httpx.Response(502, text="bad gateway"), httpx.Response(503, text="busy"),
+                          httpx.Response(200, content=b'{"data":[]}')]
+        running = []
+        self.sleep.side_effect = lambda seconds: running.append(self.client.scheduler.running)
+        self.assertEqual(await self.client.request("GET", self.URL), {"data": []})
+        self.assertEqual(self.sleep.await_count, 2)
+        waits = [call.args[0] for call in self.sleep.await_args_list]
+        self.assertTrue(all(0 <= wait <= config.REQUEST_RETRY_MAX_DELAY for wait in waits))
+        # 退避等待时不占名额，每次尝试都单独计数
+        self.assertEqual(running, [0, 0])
+        self.assertEqual(self.client.scheduler.request_counts["search"], 3)
+
+    async def test_server_error_exhausted(self):
+        self.responses = [httpx.Response(503, text="busy") for _ in range(config.REQUEST_RETRY_TIMES)]
+        with self.assertRaises(ServerBusyError) as cm:
+            await self.client.request("GET", self.URL)
+        self.assertEqual(cm.exception.status_code, 503)
+        self.assertEqual(self.sleep.await_count, config.REQUEST_RETRY_TIMES - 1)
+
+    async def test_retry_after(self):
+        self.responses = [httpx.Response(429, headers={"Retry-After": "7"}, text="too many requests"),
+                          httpx.Response(200, content=b'{"data":[]}')]
+        paused = []
+
+        def fake_sleep(seconds):
+            # 其他请求也要等待，模拟等待结束后暂停也结束
+            paused.append(self.client.scheduler.paused_for)
+            self.client.scheduler._paused_until -= seconds
+
+        self.sleep.side_effect = fake_sleep
+        await self.client.request("GET", self.URL)
+        self.sleep.assert_awaited_once_with(7.0)
+        self.assertGreater(paused[0], 6)
+
+    async def test_retry_after_too_long(self):
+        self.responses = [httpx.Response(503, headers={"Retry-After": "3600"}, text="maintenance")]
+        with self.assertRaises(DataFetchError):
+            await self.client.request("GET", self.URL)
+        self.sleep.assert_not_awaited()
+
+    async def test_transport_error_retried(self):
+        def raise_timeout(request):
+            raise httpx.ReadTimeout("timeout", request=request)
+
+        self.http_client = httpx.AsyncClient(transport=httpx.MockTransport(raise_timeout))
+        with self.assertRaises(DataFetchError) as cm:
+            await self.client.request("GET", self.URL)
+        self.assertIsInstance(cm.exception.__cause__, httpx.ReadTimeout)
+        self.assertEqual(self.sleep.await_count, config.REQUEST_RETRY_TIMES - 1)
+
+    async def test_circuit_breaker_pauses_scheduler(self):
+        self.responses = [httpx.Response(200, content=b'{"data":[]}'), httpx.Response(200, content=b'{"data":[]}'),
+                          httpx.Response(403, text="forbidden"), httpx.Response(403, text="forbidden")]
+        await self.client.request("GET", self.URL)
+        await self.client.request("GET", self.URL)
+        with self.assertRaises(ForbiddenError):
+            await self.client.request("GET", self.URL)
+        self.assertEqual(self.client.scheduler.paused_for, 0)
+        with self.assertRaises(ForbiddenError):
+            await self.client.request("GET", self.URL)
+        self.assertGreater(self.client.scheduler.paused_for, 29)
+        self.assertEqual(self.client.scheduler.pause_count, 1)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("120"), 120)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0)
+        retry_at = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 100))
+        self.assertAlmostEqual(parse_retry_after(retry_at), 100, delta=2)
+
+    async def asyncTearDown(self):
+        await self.http_client.aclose()
+
+
+class TestZhiHuClientSubComments(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.client = ZhiHuClient(headers={}, playwright_page=None, cookie_dict={})
+        self.client.get_child_comments = self.fake_child_comments
+        self.client._extractor = mock.Mock()
+        self.client._extractor.extract_offset = lambda paging: paging["next"]
+        self.client._extractor.extract_comments = lambda content, data: data
+
+    @staticmethod
+    async def fake_child_comments(root_comment_id, offset="", limit=10):
+        # 每条一级评论有两页子评论，第一条最慢
+        await asyncio.sleep(0.2 if root_comment_id == "c0" else 0.05)
+        page = int(offset or 0)
+        return {
+            "paging": {"is_end": page == 1, "next": str(page + 1)},
+            "data": [f"{root_comment_id}-p{page}"],
+        }
+
+    async def test_callbacks_keep_order(self):
+        comments = [SimpleNamespace(comment_id=f"c{i}", sub_comment_count=1) for i in range(4)]
+        comments.append(SimpleNamespace(comment_id="c4", sub_comment_count=0))
+        received = []
+
+        async def callback(sub_comments):
+            received.extend(sub_comments)
+
+        with mock.patch.object(config, "ENABLE_GET_SUB_COMMENTS", True), \
+                mock.patch.object(config, "MAX_CONCURRENCY_NUM", 4):
+            start = time.monotonic()
+            result = await self.client.get_comments_all_sub_comments(
+                None, comments, crawl_interval=0, callback=callback
+            )
+            elapsed = time.monotonic() - start
+
+        expected = [f"c{i}-p{p}" for i in range(4) for p in range(2)]
+        self.assertEqual(received, expected)
+        self.assertEqual(result, expected)
+        # 四条一级评论并发抓取，总时间接近最慢的一条
+        self.assertLess(elapsed, 0.6)
+
+    async def test_failure_waits_for_cancelled_tasks(self):
+        async def failing_child_comments(root_comment_id, offset="", limit=10):
+            delay = {"c0": 0.05, "c1": 0.01}.get(root_comment_id, 1)
+            await asyncio.sleep(delay)
+            raise DataFetchError(root_comment_id)
+
+        self.client.get_child_comments = failing_child_comments
+        comments = [SimpleNamespace(comment_id=f"c{i}", sub_comment_count=1) for i in range(3)]
+        with mock.patch.object(config, "ENABLE_GET_SUB_COMMENTS", True):
+            with self.assertRaises(DataFetchError):
+                await self.client.get_comments_all_sub_comments(None, comments, crawl_interval=0)
+        # 取消的任务已经结束，先失败的 c1 的异常也已取回
+        self.assertEqual(asyncio.all_tasks(), {asyncio.current_task()})
+
+
+class TestZhiHuClientIncrementalComments(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.client = ZhiHuClient(headers={}, playwright_page=None, cookie_dict={})
+        self.client.get_root_comments = mock.AsyncMock(side_effect=self.fake_root_comments)
+        self.client._extractor = mock.Mock()
+        self.client._extractor.extract_offset = lambda paging: paging["next"]
+        self.client._extractor.extract_comments = lambda content, data: [
+            ZhihuComment(comment_id=comment_id) for comment_id in data
+        ]
+        self.seen_index = SeenContentIndex()
+        # 按时间倒序共25条评论，ID 125 到 101
+        self.comment_ids = [str(i) for i in range(125, 100, -1)]
+
+    async def fake_root_comments(self, content_id, content_type, offset="", limit=10, order_by="score"):
+        start = int(offset or 0)
+        page = self.comment_ids[start:start + limit]
+        return {
+            "paging": {"is_end": start + limit >= len(self.comment_ids), "next": str(start + limit)},
+            "data": page,
+        }
+
+    async def crawl(self, comment_count):
+        content = ZhihuContent(content_id="1", content_type="answer", comment_count=comment_count)
+        return await self.client.get_note_all_comments(content, crawl_interval=0, seen_index=self.seen_index)
+
+    async def test_first_crawl_records_newest(self):
+        result = await self.crawl(25)
+        self.assertEqual(len(result), 25)
+        self.assertEqual(self.seen_index.get("1"), (25, "125"))
+
+    async def test_unchanged_content_skipped(self):
+        self.seen_index.update("1", 25, "125")
+        result = await self.crawl(25)
+        self.assertEqual(result, [])
+        self.client.get_root_comments.assert_not_awaited()
+
+    async def test_stop_at_known_comment(self):
+        self.seen_index.update("1", 22, "122")
+        self.comment_ids = [str(i) for i in range(125, 100, -1)]
+        result = await self.crawl(25)
+        self.assertEqual([c.comment_id for c in result], ["125", "124", "123"])
+        self.assertEqual(self.client.get_root_comments.await_count, 1)
+        self.assertEqual(self.client.get_root_comments.await_args.kwargs["order_by"], "ts")
+        self.assertEqual(self.seen_index.get("1"), (25, "125"))
+
+    def tearDown(self):
+        self.seen_index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
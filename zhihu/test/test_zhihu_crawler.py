@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+import config
+from media_platform.zhihu import ZhihuCrawler
+from media_platform.zhihu import core as zhihu_core
+from media_platform.zhihu.checkpoint import CrawlCheckpoint
+from media_platform.zhihu.client import ZhiHuClient
+from media_platform.zhihu.exception import DataFetchError, ForbiddenError
+from model.m_zhihu import ZhihuContent, ZhihuCreator
+from store.zhihu.zhihu_store_impl import ZhihuCsvStoreImplement
+from var import crawler_type_var, source_keyword_var
+
+
+class FakeSearchClient:
+    """按页返回假的搜索结果，记录请求顺序"""
+
+    def __init__(self, num_pages):
+        self.num_pages = num_pages
+        self.events = []
+
+    async def get_note_by_keyword(self, keyword, page):
+        self.events.append(("fetch", keyword, page))
+        await asyncio.sleep(0.05)
+        if page > self.num_pages:
+            return []
+        return [f"{keyword}-p{page}"]
+
+
+class TestZhihuCrawlerSearch(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.crawler = ZhihuCrawler()
+        self.client = FakeSearchClient(num_pages=3)
+        self.crawler.zhihu_client = self.client
+        self.crawler.checkpoint = CrawlCheckpoint()
+        self.stored = []
+
+        self.stored_keywords = []
+
+        async def store(contents):
+            self.client.events.append(("store", contents[0]))
+            self.stored_keywords.append(source_keyword_var.get())
+            await asyncio.sleep(0.1)
+            self.stored.extend(contents)
+
+        patches = [
+            mock.patch.object(zhihu_core.zhihu_store, "batch_update_zhihu_contents", store),
+            mock.patch.object(config, "KEYWORDS", "python"),
+            mock.patch.object(config, "START_PAGE", 1),
+            mock.patch.object(config, "CRAWLER_MAX_NOTES_COUNT", 100),
+            mock.patch.object(config, "ENABLE_GET_COMMENTS", False),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def test_prefetch_next_page(self):
+        with mock.patch.object(config, "SEARCH_PREFETCH_DEPTH", 1):
+            await self.crawler.search()
+
+        self.assertEqual(self.stored, ["python-p1", "python-p2", "python-p3"])
+        # 第二页在第一页保存之前就已经请求
+        events = self.client.events
+        self.assertLess(events.index(("fetch", "python", 2)), events.index(("store", "python-p1")))
+        # 第四页为空时停止，预取的第五页被取消
+        self.assertNotIn(("fetch", "python", 6), events)
+        # 取消的预取任务在 search 返回前已经结束
+        self.assertEqual(asyncio.all_tasks(), {asyncio.current_task()})
+
+    async def test_without_prefetch(self):
+        with mock.patch.object(config, "SEARCH_PREFETCH_DEPTH", 0):
+            await self.crawler.search()
+
+        self.assertEqual(self.stored, ["python-p1", "python-p2", "python-p3"])
+        events = self.client.events
+        self.assertGreater(events.index(("fetch", "python", 2)), events.index(("store", "python-p1")))
+
+    async def test_resume_from_checkpoint(self):
+        self.crawler.checkpoint.set_search_page("python", 3)
+        with mock.patch.object(config, "SEARCH_PREFETCH_DEPTH", 0):
+            finished = await self.crawler.search()
+
+        self.assertTrue(finished)
+        self.assertEqual(self.stored, ["python-p3"])
+        self.assertEqual(self.client.events[0], ("fetch", "python", 3))
+        self.assertTrue(self.crawler.checkpoint.is_search_done("python"))
+
+    async def test_skip_finished_keyword(self):
+        self.crawler.checkpoint.set_search_page("python", 4, done=True)
+        await self.crawler.search()
+        self.assertEqual(self.client.events, [])
+
+    async def test_multiple_keywords(self):
+        with mock.patch.object(config, "KEYWORDS", "python, java,,python"), \
+                mock.patch.object(config, "SEARCH_PREFETCH_DEPTH", 1):
+            await self.crawler.search()
+
+        self.assertEqual(self.stored, ["python-p1", "python-p2", "python-p3", "java-p1", "java-p2", "java-p3"])
+        self.assertEqual(self.stored_keywords, ["python"] * 3 + ["java"] * 3)
+        self.assertTrue(self.crawler.checkpoint.is_search_done("python"))
+        self.assertTrue(self.crawler.checkpoint.is_search_done("java"))
+
+    async def test_comment_error_keeps_search_going(self):
+        fetch = self.client.get_note_by_keyword
+        commented = []
+
+        async def get_note_by_keyword(keyword, page):
+            return [ZhihuContent(content_id=content_id) for content_id in await fetch(keyword, page)]
+
+        async def get_comments(content):
+            await asyncio.sleep(0.05)
+            if content.content_id == "python-p2":
+                raise ForbiddenError("forbidden")
+            commented.append(content.content_id)
+
+        with mock.patch.object(config, "ENABLE_GET_COMMENTS", True), \
+                mock.patch.object(config, "SEARCH_PREFETCH_DEPTH", 1), \
+                mock.patch.object(self.client, "get_note_by_keyword", get_note_by_keyword), \
+                mock.patch.object(self.crawler, "get_comments", get_comments):
+            finished = await self.crawler.search()
+
+        # 评论出错不会从 search 抛出，返回 False 保留检查点
+        self.assertFalse(finished)
+        self.assertEqual([content.content_id for content in self.stored], ["python-p1", "python-p2", "python-p3"])
+        self.assertEqual(sorted(commented), ["python-p1", "python-p3"])
+        self.assertIn("python-p2", [content.content_id for content in self.crawler.checkpoint.pending_contents()])
+        self.assertEqual(asyncio.all_tasks(), {asyncio.current_task()})
+
+    def test_parse_keywords(self):
+        self.assertEqual(ZhihuCrawler.parse_keywords("科学，科研, 人工智能,,科学"), ["科学", "科研", "人工智能"])
+
+
+class TestZhihuCrawlerClose(unittest.IsolatedAsyncioTestCase):
+
+    async def test_close_before_start(self):
+        crawler = ZhihuCrawler()
+        self.assertIsNone(crawler.zhihu_client)
+        await crawler.close()
+
+
+class TestZhihuCrawlerCreator(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.crawler = ZhihuCrawler()
+        self.client = ZhiHuClient(headers={}, cookie_dict={})
+        self.client._extractor = mock.Mock()
+        self.client._extractor.extract_content_list_from_creator = lambda data: data
+        self.client.get_creator_info = self.fake_creator_info
+        self.client.get_creator_answers = self.fake_page("answer")
+        self.client.get_creator_articles = self.fake_page("article")
+        self.client.get_creator_videos = self.fake_page("zvideo")
+        self.crawler.zhihu_client = self.client
+        self.crawler.checkpoint = CrawlCheckpoint()
+        self.stored = []
+        self.failed_creators = set()
+
+        async def store(contents):
+            self.stored.extend(contents)
+
+        patches = [
+            mock.patch.object(zhihu_core.zhihu_store, "batch_update_zhihu_contents", store),
+            mock.patch.object(zhihu_core.zhihu_store, "save_creator", mock.AsyncMock()),
+            mock.patch.object(zhihu_core.random, "random", return_value=0),
+            mock.patch.object(config, "ZHIHU_CREATOR_URL_LIST",
+                              ["https://www.zhihu.com/people/u1", "https://www.zhihu.com/people/u2"]),
+            mock.patch.object(config, "CREATOR_CONTENT_TYPES", ["answer", "article", "zvideo"]),
+            mock.patch.object(config, "MAX_CONCURRENT_CREATORS", 2),
+            mock.patch.object(config, "ENABLE_GET_COMMENTS", False),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    @staticmethod
+    async def fake_creator_info(url_token):
+        return ZhihuCreator(url_token=url_token)
+
+    def fake_page(self, content_type):
+        # 每种内容两页，每页耗时0.05秒
+        async def get_page(url_token, offset, limit):
+            await asyncio.sleep(0.05)
+            if url_token in self.failed_creators:
+                raise DataFetchError("fetch error")
+            return {
+                "paging": {"is_end": offset >= limit},
+                "data": [f"{url_token}-{content_type}-{offset}"],
+            }
+        return get_page
+
+    async def test_creators_and_types_concurrent(self):
+        start = time.monotonic()
+        self.assertTrue(await self.crawler.get_creators_and_notes())
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(len(self.stored), 12)
+        self.assertIn("u2-zvideo-20", self.stored)
+        # 2个创作者 x 3种内容 x 2页 顺序抓取需要0.6秒
+        self.assertLess(elapsed, 0.3)
+        self.assertTrue(self.crawler.checkpoint.is_creator_done("u1"))
+        self.assertEqual(self.crawler.checkpoint.get_creator_offset("u1", "article"), 40)
+
+    async def test_failed_creator_not_done(self):
+        self.failed_creators.add("u1")
+        self.assertFalse(await self.crawler.get_creators_and_notes())
+        self.assertFalse(self.crawler.checkpoint.is_creator_done("u1"))
+        self.assertTrue(self.crawler.checkpoint.is_creator_done("u2"))
+        self.assertEqual(len(self.stored), 6)
+
+    async def test_forbidden_creator_does_not_stop_others(self):
+        async def forbidden_articles(url_token, offset, limit):
+            if url_token == "u1":
+                raise ForbiddenError("forbidden")
+            return await self.fake_page("article")(url_token, offset, limit)
+
+        self.client.get_creator_articles = forbidden_articles
+        self.assertFalse(await self.crawler.get_creators_and_notes())
+        self.assertFalse(self.crawler.checkpoint.is_creator_done("u1"))
+        self.assertTrue(self.crawler.checkpoint.is_creator_done("u2"))
+        self.assertEqual(len([c for c in self.stored if c.startswith("u2-")]), 6)
+
+    async def test_unexpected_error_logged(self):
+        async def broken_creator_info(url_token):
+            if url_token == "u1":
+                raise KeyError("url_token")
+            return ZhihuCreator(url_token=url_token)
+
+        self.client.get_creator_info = broken_creator_info
+        self.assertFalse(await self.crawler.get_creators_and_notes())
+        self.assertTrue(self.crawler.checkpoint.is_creator_done("u2"))
+
+    async def test_not_found_creator_done(self):
+        async def missing_creator_info(url_token):
+            return None if url_token == "u1" else ZhihuCreator(url_token=url_token)
+
+        self.client.get_creator_info = missing_creator_info
+        self.assertTrue(await self.crawler.get_creators_and_notes())
+        self.assertTrue(self.crawler.checkpoint.is_creator_done("u1"))
+
+    async def test_only_configured_types(self):
+        with mock.patch.object(config, "CREATOR_CONTENT_TYPES", ["answer"]):
+            await self.crawler.get_creators_and_notes()
+        self.assertEqual(sorted(self.stored), ["u1-answer-0", "u1-answer-20", "u2-answer-0", "u2-answer-20"])
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+
+class TestKeywordPartition(unittest.TestCase):
+
+    def setUp(self):
+        self.tokens = [(crawler_type_var, crawler_type_var.set("search"))]
+
+    def tearDown(self):
+        for var, token in self.tokens:
+            var.reset(token)
+
+    def test_file_name_with_keyword(self):
+        self.tokens.append((source_keyword_var, source_keyword_var.set("人工 智能/AI")))
+        file_name = ZhihuCsvStoreImplement().make_save_file_name("contents")
+        self.assertIn("_search_人工-智能-AI_contents_", file_name)
+
+    def test_file_name_without_keyword(self):
+        with mock.patch.object(config, "PARTITION_OUTPUT_BY_KEYWORD", False):
+            self.tokens.append((source_keyword_var, source_keyword_var.set("python")))
+            file_name = ZhihuCsvStoreImplement().make_save_file_name("contents")
+        self.assertIn("_search_contents_", file_name)
+
+
+if __name__ == '__main__':
+    unittest.main()
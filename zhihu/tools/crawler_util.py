@@ -1,13 +1,15 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import base64
+import html as html_lib
 import json
 import random
 import re
 import urllib
 import urllib.parse
 from io import BytesIO
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import httpx
 from PIL import Image, ImageDraw
@@ -170,16 +172,42 @@ def format_proxy_info(ip_proxy_info) -> Tuple[Optional[Dict], Optional[Dict]]:
     return playwright_proxy, httpx_proxy
 
 
+# script/style 元素连同内容一起去掉，没有闭合时去掉后面所有内容；其他标签只去掉标签本身
+HTML_TAG_PATTERN = re.compile(r'<(script|style)\b[^>]*>(?:.*?</\1\s*>|.*)|<[^>]+>', re.DOTALL | re.IGNORECASE)
+
+
 def extract_text_from_html(html: str) -> str:
-    """Extract text from HTML, removing all tags."""
+    """
+    Extract text from HTML, removing all tags and decoding entities.
+
+    One regex pass over the text before the last '>'. '<' after the last '>' can never
+    start a tag, so it is kept as text without being rescanned, which keeps the cost
+    linear on unclosed tags.
+    """
     if not html:
         return ""
 
-    # Remove script and style elements
-    clean_html = re.sub(r'<(script|style)[^>]*>.*?</\1>', '', html, flags=re.DOTALL)
-    # Remove all other tags
-    clean_text = re.sub(r'<[^>]+>', '', clean_html).strip()
-    return clean_text
+    tags_end = html.rfind(">") + 1
+    text = HTML_TAG_PATTERN.sub("", html[:tags_end]) + html[tags_end:] if tags_end else html
+    if "&" in text:
+        text = html_lib.unescape(text)
+    return text.strip()
+
+async def cancel_and_drain(tasks: Iterable[asyncio.Task]) -> None:
+    """
+    取消还没有完成的任务，并等待所有任务结束
+    已经失败的任务的异常在这里取回，不会出现 "Task exception was never retrieved"
+    Args:
+        tasks: 任务列表
+
+    Returns:
+
+    """
+    tasks = list(tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
 
 def extract_url_params_to_dict(url: str) -> Dict:
     """Extract URL parameters to dict"""
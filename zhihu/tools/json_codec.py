@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+JSON编解码
+
+安装了 orjson 或 msgspec 时使用它们，否则使用标准库json，接口在几种实现之间保持一致：
+    loads: 接收 str 或 bytes，解析失败抛出 ValueError
+    dumps: 返回 str，不转义中文，pretty=True 时缩进输出
+
+pretty=True 的缩进取决于实现：标准库json和msgspec缩进4个空格，orjson只支持2个空格。
+JSON存储的文件因此在安装了orjson的环境中是2个空格缩进，内容和解析结果相同，只有空白不同。
+"""
+import json
+from typing import Any, Callable, Dict, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any, pretty: bool = False) -> str:
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=4)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _orjson_loads(data: Union[str, bytes]) -> Any:
+    # orjson.JSONDecodeError 是 ValueError 的子类
+    return orjson.loads(data)
+
+
+def _orjson_dumps(obj: Any, pretty: bool = False) -> str:
+    option = orjson.OPT_NON_STR_KEYS
+    if pretty:
+        # orjson只支持两个空格的缩进，不再转换成4个空格，否则比标准库还慢
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, option=option).decode("utf-8")
+
+
+def _msgspec_loads(data: Union[str, bytes]) -> Any:
+    try:
+        return msgspec.json.decode(data)
+    except msgspec.DecodeError as e:
+        raise ValueError(str(e)) from e
+
+
+def _msgspec_dumps(obj: Any, pretty: bool = False) -> str:
+    data = msgspec.json.encode(obj)
+    if pretty:
+        data = msgspec.json.format(data, indent=4)
+    return data.decode("utf-8")
+
+
+# 可用的实现，按速度从快到慢
+CODECS: Dict[str, Tuple[Callable[[Union[str, bytes]], Any], Callable[..., str]]] = {}
+if orjson is not None:
+    CODECS["orjson"] = (_orjson_loads, _orjson_dumps)
+if msgspec is not None:
+    CODECS["msgspec"] = (_msgspec_loads, _msgspec_dumps)
+CODECS["json"] = (_json_loads, _json_dumps)
+
+BACKEND: str = next(iter(CODECS))
+loads, dumps = CODECS[BACKEND]
@@ -1,24 +1,78 @@
 import argparse
+import atexit
+import copy
+import itertools
 import logging
+import logging.handlers
+import queue
+
+import config
 
 from .crawler_util import *
 from .slider_util import *
 from .time_util import *
 
+LOG_FORMAT = "%(asctime)s %(name)s %(levelname)s (%(filename)s:%(lineno)d) - %(message)s"
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    只把日志记录放进队列，消息的格式化和输出都在 QueueListener 的线程中完成，不占用事件循环
+    传给日志的参数在放入队列之后不要再修改
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info:
+            # 异常的traceback只能在当前线程中格式化
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
 
 def init_loging_config():
-    level = logging.INFO
+    level = getattr(logging, config.LOG_LEVEL.upper(), logging.INFO)
     logging.basicConfig(
         level=level,
-        format="%(asctime)s %(name)s %(levelname)s (%(filename)s:%(lineno)d) - %(message)s",
-        datefmt='%Y-%m-%d %H:%M:%S'
+        format=LOG_FORMAT,
+        datefmt=LOG_DATE_FORMAT
     )
     _logger = logging.getLogger("MediaCrawler")
     _logger.setLevel(level)
+    if config.ENABLE_QUEUE_LOGGING:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT))
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        listener.start()
+        # 退出时把队列中剩下的日志输出完
+        atexit.register(listener.stop)
+        _logger.addHandler(DeferredQueueHandler(log_queue))
+        _logger.propagate = False
     return _logger
 
 
 logger = init_loging_config()
+_payload_counter = itertools.count()
+
+
+def log_payload(msg: str, *args):
+    """
+    记录接口响应、保存的数据这类大块内容，DEBUG级别，每 LOG_PAYLOAD_SAMPLE_RATE 条记录一条，
+    参数在真正输出时才格式化
+    Args:
+        msg: %s 格式的日志消息
+        *args: 消息参数
+
+    Returns:
+
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if next(_payload_counter) % max(config.LOG_PAYLOAD_SAMPLE_RATE, 1):
+        return
+    logger.debug(msg, *args, stacklevel=2)
 
 def str2bool(v):
     if isinstance(v, bool):
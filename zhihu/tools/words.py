@@ -1,5 +1,4 @@
 import asyncio
-import json
 import logging
 from collections import Counter
 
@@ -9,7 +8,7 @@ import matplotlib.pyplot as plt
 from wordcloud import WordCloud
 
 import config
-from tools import utils
+from tools import json_codec, utils
 
 plot_lock = asyncio.Lock()
 
@@ -35,7 +34,7 @@ class AsyncWordCloudGenerator:
         # Save word frequency to file
         freq_file = f"{save_words_prefix}_word_freq.json"
         async with aiofiles.open(freq_file, 'w', encoding='utf-8') as file:
-            await file.write(json.dumps(word_freq, ensure_ascii=False, indent=4))
+            await file.write(json_codec.dumps(word_freq, pretty=True))
 
         # Try to acquire the plot lock without waiting
         if plot_lock.locked():